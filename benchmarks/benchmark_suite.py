@@ -0,0 +1,358 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    benchmark suite : synthesis of the protocols in tests/DB-QASM (steane, golay)
+    on the generated chips (2-d rectangular, 2-d triangular, 3-d cubic) with fixed seeds
+    and, on request (--codes synthetic), of the synthetic protocols of protocolgenerator
+
+    each case runs in a fresh interpreter (fixed PYTHONHASHSEED) and records
+        wall time, traversal time, peak rss, trials (killed), swaps, gates, depth, KQ
+
+    the records are saved as a baseline (json), and the later runs are compared with
+    the baseline : the benchmark fails (exit code 1) if a case regresses
+'''
+
+import os
+import sys
+import time
+import signal
+import tempfile
+import argparse
+import subprocess
+
+import simplejson as json
+
+path_benchmarks = os.path.dirname(os.path.abspath(__file__))
+path_src = os.path.join(path_benchmarks, "../src")
+path_db_qasm = os.path.join(path_benchmarks, "../tests/DB-QASM")
+path_synthetic = os.path.join(tempfile.gettempdir(), "ftsynthesis-synthetic")
+
+sys.path.insert(0, path_src)
+import protocolgenerator
+
+# baseline (default)
+BASELINE = os.path.join(path_benchmarks, "baseline.json")
+
+# chips per code and architecture (large enough for the protocols of the code)
+SUITE = {"steane": {2: (6, 6), 23: (5, 6), 3: (4, 3, 3)},
+         "golay": {2: (8, 9), 23: (8, 9), 3: (5, 4, 4)},
+         "synthetic": {2: (9, 9), 23: (9, 9), 3: (5, 5, 4)}}
+
+# codes of the suite by default
+DEFAULT_CODES = ["steane", "golay"]
+
+# synthetic protocols (kwargs of protocolgenerator.iterate_protocol_lines)
+SYNTHETIC = {"steane_b1_r8": {"code": "steane", "blocks": 1, "rounds": 8, "seed": 0},
+             "steane_b2_r4": {"code": "steane", "blocks": 2, "rounds": 4, "seed": 0}}
+
+# options for the synthesis of the cases
+SUITE_OPTION = {"iteration": 1,
+                "moveback": True,
+                "allowable_data_interaction": 0,
+                "optimal_criterion": "circuit_depth",
+                "cost": "lap",
+                "lap_depth": 1,
+                "decay_factor": 0.1,
+                "extended_set_weight": 0.5,
+                "initial_mapping_option": "periodic_random",
+                "seed": 0}
+
+# options of the protocols different from SUITE_OPTION
+PROTOCOL_OPTION = {"Prepare_Magic_State": {"moveback": False}}
+
+# chips of the protocols different from SUITE (per architecture), so that no trial of a case
+# is killed by the time limit (the metrics of a killed trial depend on the timing)
+PROTOCOL_LAYOUT = {"Prepare_Zero_State": {2: (9, 9)},
+                   "Stabilizer_Measure_steaneEC": {2: (7, 7)}}
+
+# hash seed of the interpreters running the cases (the order of the qubit sets)
+HASH_SEED = "0"
+
+# metrics compared with the baseline : (kind, key)
+#   time : regression if it exceeds the baseline by the time tolerance (relative)
+#          and by the time slack (seconds, against the noise of short cases)
+#   memory : regression if it exceeds the baseline by the memory tolerance (relative)
+#   quality : regression if it exceeds the baseline by the quality tolerance (relative),
+#             not compared for a case with a killed trial (the result depends on the timing)
+METRICS = [("time", "wall"), ("time", "traversal"), ("memory", "peak_rss_mb"),
+           ("quality", "swaps"), ("quality", "depth"), ("quality", "KQ")]
+
+MEASURE_CODE = """
+import sys, resource
+sys.path.insert(0, {path!r})
+import simplejson as json
+import ftsynthesis, layoutbuilder, synthesisevents
+
+case = json.loads(sys.argv[1])
+qchip = layoutbuilder.generate_qchip(tuple(case["layout_size"]),
+                                     architecture=case["architecture"])
+
+metrics = synthesisevents.new_metrics()
+result = ftsynthesis.synthesize(case["protocol"], qchip,
+                                synthesis_option=case["synthesis_option"],
+                                listeners=[synthesisevents.collect_metrics(metrics)])
+
+analysis = result["analysis"]
+peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+print(json.dumps({{"wall": metrics["wall"],
+                   "traversal": sum(metrics["phases"].get(phase, {{}}).get("wall", 0.0)
+                                    for phase in ["forward", "backward", "forward_write"]),
+                   "peak_rss_mb": peak_rss / 1024,
+                   "trials": metrics["trials"],
+                   "killed": metrics["killed"],
+                   "swaps": analysis["Function List"].get("SWAP", 0),
+                   "gates": sum(analysis["Function List"].values()),
+                   "depth": analysis["Circuit Depth"],
+                   "KQ": analysis["KQ"]}}))
+"""
+
+
+def list_cases(**kwargs):
+    """
+        function to list the cases of the suite
+        kwargs:
+            codes: codes of the protocols (default : DEFAULT_CODES)
+            architectures: architectures of the chips (default : 2, 23, 3)
+            protocols: names of the protocols (default : all the protocols of the codes)
+            iteration: SABRE iteration (default : SUITE_OPTION)
+            seed: seed for the initial mappings (default : SUITE_OPTION)
+    """
+    list_codes = kwargs.get("codes")
+    if list_codes is None:
+        list_codes = DEFAULT_CODES
+
+    list_architectures = kwargs.get("architectures")
+    if list_architectures is None:
+        list_architectures = [2, 23, 3]
+
+    list_protocols = kwargs.get("protocols")
+
+    synthesis_option = dict(SUITE_OPTION)
+    for key in ["iteration", "seed"]:
+        if kwargs.get(key) is not None:
+            synthesis_option[key] = kwargs.get(key)
+
+    list_cases_suite = []
+    for code in list_codes:
+        directory = os.path.join(path_db_qasm, code)
+        if code == "synthetic":
+            directory = write_synthetic_protocols()
+
+        for file_name in sorted(os.listdir(directory)):
+            protocol, extension = os.path.splitext(file_name)
+            if extension != ".qasmf":
+                continue
+
+            if list_protocols is not None and protocol not in list_protocols:
+                continue
+
+            if code == "synthetic" and protocol not in SYNTHETIC:
+                continue
+
+            for architecture in list_architectures:
+                layout_size = PROTOCOL_LAYOUT.get(protocol, {}).get(architecture,
+                                                                    SUITE[code][architecture])
+                list_cases_suite.append({
+                    "name": f"{code}/{protocol}/{architecture}_"
+                            + "x".join(str(size) for size in layout_size),
+                    "protocol": os.path.abspath(os.path.join(directory, file_name)),
+                    "layout_size": layout_size,
+                    "architecture": architecture,
+                    "synthesis_option": dict(synthesis_option,
+                                             **PROTOCOL_OPTION.get(protocol, {}))})
+
+    return list_cases_suite
+
+
+def write_synthetic_protocols():
+    """
+        function to write the synthetic protocols of the suite (deterministic by the seeds)
+        return: the directory of the protocols
+    """
+    os.makedirs(path_synthetic, exist_ok=True)
+
+    for protocol, kwargs in SYNTHETIC.items():
+        protocolgenerator.write_protocol(os.path.join(path_synthetic, f"{protocol}.qasmf"),
+                                         **kwargs)
+
+    return path_synthetic
+
+
+def run_case(case, **kwargs):
+    """
+        function to run a case in a fresh interpreter and return its record
+        kwargs:
+            timeout: time limit of the case in seconds (default : 600)
+    """
+    timeout = kwargs.get("timeout")
+    if timeout is None:
+        timeout = 600
+
+    code = MEASURE_CODE.format(path=path_src)
+    environment = dict(os.environ, PYTHONHASHSEED=HASH_SEED)
+
+    # the case runs in its own session, so that its traversal processes are killed
+    # together with it at the timeout
+    process = subprocess.Popen([sys.executable, "-c", code, json.dumps(case)],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                               env=environment, start_new_session=True)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+        return {"error": f"timeout ({timeout} s)"}
+
+    if process.returncode != 0:
+        return {"error": (stderr.strip().splitlines() or ["exit code "
+                                                          f"{process.returncode}"])[-1]}
+
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def compare_records(records, baseline, **kwargs):
+    """
+        function to compare the records with the baseline and return the regressions
+        kwargs:
+            time_tolerance: relative tolerance of the time (default : 0.25)
+            memory_tolerance: relative tolerance of the peak rss (default : 0.2)
+            quality_tolerance: relative tolerance of swaps, depth and KQ (default : 0.0)
+            time_slack: absolute tolerance of the time in seconds (default : 0.5)
+
+        the quality is not compared when a trial was killed by the time limit in the record
+        or in the baseline, since the surviving trials then depend on the timing
+    """
+    tolerance = {"time": kwargs.get("time_tolerance"),
+                 "memory": kwargs.get("memory_tolerance"),
+                 "quality": kwargs.get("quality_tolerance")}
+
+    for kind, default in [("time", 0.25), ("memory", 0.2), ("quality", 0.0)]:
+        if tolerance[kind] is None:
+            tolerance[kind] = default
+
+    time_slack = kwargs.get("time_slack")
+    if time_slack is None:
+        time_slack = 0.5
+
+    list_regressions = []
+    for name, record in records.items():
+        reference = baseline.get("cases", {}).get(name)
+        if reference is None or "error" in reference:
+            continue
+
+        if "error" in record:
+            list_regressions.append(f"{name} : {record['error']}")
+            continue
+
+        flag_killed = record.get("killed", 0) > 0 or reference.get("killed", 0) > 0
+
+        for kind, key in METRICS:
+            if kind == "quality" and flag_killed:
+                continue
+
+            bound = reference[key] * (1 + tolerance[kind])
+            if kind == "time":
+                bound = max(bound, reference[key] + time_slack)
+
+            if record[key] > bound:
+                list_regressions.append(f"{name} : {key} {record[key]:.4g} > "
+                                        f"{reference[key]:.4g} (+{tolerance[kind]:.0%})")
+
+    return list_regressions
+
+
+def run_suite(list_cases_suite, **kwargs):
+    """
+        function to run the cases and return {"cases": {name: record}, ..}
+        kwargs are passed to run_case
+    """
+    records = {}
+    for case in list_cases_suite:
+        record = run_case(case, **kwargs)
+        records[case["name"]] = record
+
+        if "error" in record:
+            print(f"{case['name']:44s} error : {record['error']}")
+        else:
+            print(f"{case['name']:44s} wall {record['wall']:7.2f} s  "
+                  f"traversal {record['traversal']:7.2f} s  "
+                  f"rss {record['peak_rss_mb']:6.1f} MB  swaps {record['swaps']:5d}  "
+                  f"depth {record['depth']:5d}  KQ {record['KQ']:7d}  "
+                  f"killed {record['killed']}")
+
+    return {"created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "synthesis_option": SUITE_OPTION,
+            "cases": records}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark suite of ftsynthesis")
+    parser.add_argument("--codes", nargs="+", choices=list(SUITE.keys()))
+    parser.add_argument("--architectures", nargs="+", type=int, choices=[2, 23, 3])
+    parser.add_argument("--protocols", nargs="+")
+    parser.add_argument("--iteration", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--timeout", type=int, default=600)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write the records as the baseline instead of comparing")
+    parser.add_argument("--output", help="file to write the records (json)")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.2)
+    parser.add_argument("--quality-tolerance", type=float, default=0.0)
+    parser.add_argument("--time-slack", type=float, default=0.5)
+    arguments = parser.parse_args()
+
+    cases = list_cases(codes=arguments.codes, architectures=arguments.architectures,
+                       protocols=arguments.protocols, iteration=arguments.iteration,
+                       seed=arguments.seed)
+
+    suite_result = run_suite(cases, timeout=arguments.timeout)
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as outfile:
+            json.dump(suite_result, outfile, sort_keys=True, indent=4, separators=(',', ':'))
+
+    if arguments.update_baseline:
+        # the cases not run this time are kept in the baseline
+        baseline = {"cases": {}}
+        if os.path.exists(arguments.baseline):
+            with open(arguments.baseline, "r", encoding="utf-8") as infile:
+                baseline = json.load(infile)
+
+        baseline["cases"].update(suite_result["cases"])
+        baseline.update({key: value for key, value in suite_result.items() if key != "cases"})
+
+        with open(arguments.baseline, "w", encoding="utf-8") as outfile:
+            json.dump(baseline, outfile, sort_keys=True, indent=4, separators=(',', ':'))
+
+        print(f"baseline : {arguments.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(arguments.baseline):
+        print(f"no baseline : {arguments.baseline} (run with --update-baseline)")
+        sys.exit(0)
+
+    with open(arguments.baseline, "r", encoding="utf-8") as infile:
+        baseline_data = json.load(infile)
+
+    regressions = compare_records(suite_result["cases"], baseline_data,
+                                  time_tolerance=arguments.time_tolerance,
+                                  memory_tolerance=arguments.memory_tolerance,
+                                  quality_tolerance=arguments.quality_tolerance,
+                                  time_slack=arguments.time_slack)
+
+    for regression in regressions:
+        print(f"regression : {regression}")
+
+    sys.exit(1 if regressions else 0)
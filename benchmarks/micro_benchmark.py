@@ -0,0 +1,350 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    micro benchmark : time of the components of the synthesis over increasing input sizes
+        distance_matrix : DistanceMatrix.generateDM over the qubits of a chip
+        analyze_qasm : SABRE_utility.analyze_qasm_lines over the gates of a circuit
+        create_dag : DirectedAcyclicGraph.createDAG over the gates of a circuit
+        lap_cost, nnc_cost : cost of a swap candidate over the size of the front layer
+        cancel_redundancy : formatconversion.cancel_redundancy over the instructions of a syscode
+
+    the inputs are synthetic (regular chips, random circuits and syscodes with a fixed seed)
+    and the scaling exponent (the slope of log time over log size) is reported per component,
+    so that a super-linear component is visible
+'''
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import collections
+
+import simplejson as json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+
+import DirectedAcyclicGraph
+import DistanceMatrix
+import SABRE_utility
+import formatconversion
+import ftsynthesis
+import globalVariable as g
+import layoutbuilder
+
+# seed of the synthetic inputs
+SEED = 0
+
+# exponent above which a component is reported as super-linear
+SUPER_LINEAR = 1.2
+
+# sizes of the inputs and the expected exponent per component
+COMPONENTS = {"distance_matrix": {"sizes": [9, 25, 49, 100, 196, 400, 1024],
+                                  "unit": "qubits", "expected": 3},
+              "analyze_qasm": {"sizes": [500, 1000, 2000, 4000, 8000, 16000],
+                               "unit": "gates", "expected": 1},
+              "create_dag": {"sizes": [500, 1000, 2000, 4000, 8000, 16000],
+                             "unit": "gates", "expected": 1},
+              "lap_cost": {"sizes": [2, 4, 8, 16, 32, 64],
+                           "unit": "front layer", "expected": 1},
+              "nnc_cost": {"sizes": [2, 4, 8, 16, 32, 64],
+                           "unit": "front layer", "expected": 1},
+              "cancel_redundancy": {"sizes": [1000, 4000, 16000, 64000],
+                                    "unit": "instructions", "expected": 1}}
+
+
+def generate_square_qchip(qubits):
+    """
+        function to generate a 2-d rectangular chip with about the given number of qubits
+    """
+    height = max(int(math.sqrt(qubits)), 1)
+    width = max(int(math.ceil(qubits / height)), 1)
+
+    return layoutbuilder.generate_qchip((height, width))
+
+
+def generate_qasm_lines(qubits, gates, **kwargs):
+    """
+        function to generate a random protocol (qasm lines) of the qubits and the gates
+        : declarations, preparations, then random H and CNOT gates, and measurements
+        kwargs:
+            seed: seed of the random gates (default : SEED)
+    """
+    seed = kwargs.get("seed")
+    if seed is None:
+        seed = SEED
+
+    generator = random.Random(seed)
+    list_qubits = [f"data{idx}" for idx in range(qubits)]
+
+    list_lines = [f"Qubit {qubit}" for qubit in list_qubits]
+    list_lines.extend(f"Cbit bit{idx}" for idx in range(qubits))
+    list_lines.extend(f"PrepZ {qubit}" for qubit in list_qubits)
+
+    for _ in range(max(gates - 2 * qubits, 0)):
+        if generator.random() < 0.25:
+            list_lines.append(f"H {generator.choice(list_qubits)}")
+        else:
+            ctrl, trgt = generator.sample(list_qubits, 2)
+            list_lines.append(f"CNOT {ctrl},{trgt}")
+
+    list_lines.extend(f"MeasZ {qubit} bit{idx}" for idx, qubit in enumerate(list_qubits))
+
+    return list_lines
+
+
+def generate_syscode(instructions, qubits, **kwargs):
+    """
+        function to generate a random syscode (list of instructions on the physical qubits)
+        a part of the instructions is repeated right away, so that it cancels out
+        kwargs:
+            seed: seed of the random instructions (default : SEED)
+    """
+    seed = kwargs.get("seed")
+    if seed is None:
+        seed = SEED
+
+    generator = random.Random(seed)
+
+    syscode = []
+    while len(syscode) < instructions:
+        if generator.random() < 0.3:
+            inst = [g.str_gate_h, generator.randrange(qubits)]
+        else:
+            inst = [g.str_gate_cnot] + generator.sample(range(qubits), 2)
+
+        syscode.append(inst)
+        if generator.random() < 0.2:
+            syscode.append(list(inst))
+
+    return syscode[:instructions]
+
+
+def generate_cost_input(front_layer_size, **kwargs):
+    """
+        function to generate the input of the cost functions : a circuit whose front layer
+        has front_layer_size CNOT gates on disjoint qubits, its DAG, a chip, a random mapping
+        and the swap candidates
+        kwargs:
+            seed: seed of the mapping (default : SEED)
+            layers: number of the layers of the circuit (default : 8)
+    """
+    seed = kwargs.get("seed")
+    if seed is None:
+        seed = SEED
+
+    layers = kwargs.get("layers")
+    if layers is None:
+        layers = 8
+
+    generator = random.Random(seed)
+    qubits = 2 * front_layer_size
+    list_qubits = [f"data{idx}" for idx in range(qubits)]
+
+    list_qasm_commands = []
+    for _ in range(layers):
+        shuffled = generator.sample(list_qubits, qubits)
+        list_qasm_commands.extend([g.str_gate_cnot, shuffled[2 * idx], shuffled[2 * idx + 1]]
+                                  for idx in range(front_layer_size))
+
+    dag = DirectedAcyclicGraph.createDAG(list_qasm_commands)
+
+    qchip = ftsynthesis.prepare_qchip(generate_square_qchip(max(2 * qubits, 9)))
+    qchip_size = len(qchip["qubit_connectivity"])
+
+    positions = generator.sample(range(qchip_size), qchip_size)
+    qubit_mapping = {qubit: position for qubit, position in zip(list_qubits, positions)}
+    qubit_mapping.update({f"dummy{idx}": position
+                          for idx, position in enumerate(positions[qubits:])})
+    inverse_mapping = {position: qubit for qubit, position in qubit_mapping.items()}
+
+    list_swaps = [(node["ctrl"], inverse_mapping[neighbor])
+                  for node in dag["roots"]
+                  for neighbor in qchip["qubit_connectivity"][qubit_mapping[node["ctrl"]]]]
+
+    return {"dag": dag["DAG"], "front_layer": dag["roots"], "qchip": qchip,
+            "qubit_mapping": qubit_mapping, "swaps": list_swaps}
+
+
+def time_call(function, **kwargs):
+    """
+        function to measure the time of a call : the call is repeated until min_time elapses,
+        and the best time per call over the repeats is returned
+        kwargs:
+            min_time: minimal time of a repeat in seconds (default : 0.2)
+            repeats: number of the repeats (default : 3)
+    """
+    min_time = kwargs.get("min_time")
+    if min_time is None:
+        min_time = 0.2
+
+    repeats = kwargs.get("repeats")
+    if repeats is None:
+        repeats = 3
+
+    best = math.inf
+    for _ in range(repeats):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            function()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+
+        best = min(best, elapsed / calls)
+
+        # a slow call is not repeated
+        if elapsed > 10 * min_time and calls == 1:
+            break
+
+    return best
+
+
+def measure_component(component, size, **kwargs):
+    """
+        function to measure the time of a component for an input size (seconds per call)
+        the cost functions are measured per swap candidate
+        kwargs are passed to time_call
+    """
+    if component == "distance_matrix":
+        qchip = generate_square_qchip(size)
+        return time_call(lambda: DistanceMatrix.generateDM(qchip, "distance"), **kwargs)
+
+    if component in ["analyze_qasm", "create_dag"]:
+        list_lines = generate_qasm_lines(max(size // 50, 4), size)
+        if component == "analyze_qasm":
+            return time_call(lambda: SABRE_utility.analyze_qasm_lines(list_lines), **kwargs)
+
+        list_qasm_commands = SABRE_utility.analyze_qasm_lines(list_lines)[0]
+        return time_call(lambda: DirectedAcyclicGraph.createDAG(list_qasm_commands), **kwargs)
+
+    if component in ["lap_cost", "nnc_cost"]:
+        cost_input = generate_cost_input(size)
+        distance = cost_input["qchip"]["distance_matrix"]
+        qubit_mapping = cost_input["qubit_mapping"]
+        list_decay = collections.defaultdict(lambda: 1)
+
+        def score_candidates():
+            for swap in cost_input["swaps"]:
+                if component == "lap_cost":
+                    ftsynthesis.calculate_lap_cost(swap, cost_input["dag"],
+                                                   cost_input["front_layer"], distance,
+                                                   qubit_mapping, list_decay, 2, 0.5)
+                else:
+                    ftsynthesis.calculate_nnc_cost(cost_input["front_layer"], distance,
+                                                   qubit_mapping)
+
+        return time_call(score_candidates, **kwargs) / len(cost_input["swaps"])
+
+    if component == "cancel_redundancy":
+        syscode = generate_syscode(size, 64)
+        return time_call(lambda: formatconversion.cancel_redundancy(
+            [list(inst) for inst in syscode]), **kwargs)
+
+    raise Exception(f"Error ! Component {component} is not supported.")
+
+
+def fit_exponent(list_sizes, list_times):
+    """
+        function to fit the scaling exponent : slope of log(time) over log(size)
+    """
+    xs = [math.log(size) for size in list_sizes]
+    ys = [math.log(max(elapsed, 1e-12)) for elapsed in list_times]
+
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return math.nan
+
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def run_benchmark(**kwargs):
+    """
+        function to run the micro benchmark and return {component: result}
+        kwargs:
+            components: names of the components (default : all in COMPONENTS)
+            max_qubits: the largest chip for distance_matrix (default : 400)
+            scale: factor applied to the sizes of the other components (default : 1.0)
+            min_time, repeats: see time_call
+    """
+    list_components = kwargs.get("components")
+    if list_components is None:
+        list_components = list(COMPONENTS.keys())
+
+    max_qubits = kwargs.get("max_qubits")
+    if max_qubits is None:
+        max_qubits = 400
+
+    scale = kwargs.get("scale")
+    if scale is None:
+        scale = 1.0
+
+    g.ensure_globals()
+
+    results = {}
+    for component in list_components:
+        spec = COMPONENTS[component]
+        if component == "distance_matrix":
+            list_sizes = [size for size in spec["sizes"] if size <= max_qubits]
+        elif spec["unit"] == "front layer":
+            list_sizes = spec["sizes"]
+        else:
+            list_sizes = [max(int(size * scale), 1) for size in spec["sizes"]]
+
+        list_times = []
+        for size in list_sizes:
+            list_times.append(measure_component(component, size,
+                                                min_time=kwargs.get("min_time"),
+                                                repeats=kwargs.get("repeats")))
+            print(f"{component:18s} {size:8d} {spec['unit']:13s} "
+                  f"{list_times[-1] * 1e3:12.4f} ms")
+
+        exponent = fit_exponent(list_sizes, list_times)
+        results[component] = {"unit": spec["unit"],
+                              "sizes": list_sizes,
+                              "times": list_times,
+                              "exponent": exponent,
+                              "expected": spec["expected"],
+                              "super_linear": exponent > SUPER_LINEAR}
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="micro benchmark of ftsynthesis")
+    parser.add_argument("--components", nargs="+", choices=list(COMPONENTS.keys()))
+    parser.add_argument("--max-qubits", type=int, default=400,
+                        help="the largest chip for distance_matrix (up to 1024)")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="file to write the results (json)")
+    arguments = parser.parse_args()
+
+    benchmark_results = run_benchmark(components=arguments.components,
+                                      max_qubits=arguments.max_qubits,
+                                      scale=arguments.scale, min_time=arguments.min_time,
+                                      repeats=arguments.repeats)
+
+    print()
+    for name, result in benchmark_results.items():
+        status = "super-linear" if result["super_linear"] else "linear or better"
+        print(f"{name:18s} exponent {result['exponent']:5.2f} "
+              f"(expected {result['expected']}) {status}")
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as outfile:
+            json.dump(benchmark_results, outfile, sort_keys=True, indent=4,
+                      separators=(',', ':'))
@@ -0,0 +1,131 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    startup benchmark : import time of the modules in a fresh interpreter
+    the benchmark fails (exit code 1) if a module exceeds its import-time budget
+    or loads a heavy package that should be imported lazily
+'''
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+import simplejson as json
+
+path_src = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src")
+path_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# import-time budget per module (milliseconds, median over the runs)
+IMPORT_BUDGET = {"ftsynthesis": 100,
+                 "formatconversion": 50,
+                 "checkup": 50,
+                 "SABRE_utility": 50,
+                 "DirectedAcyclicGraph": 50,
+                 "util": 60}
+
+# import-time budget of the console script (src.cli:main, setup.py) imported as a package
+# from the root of the repository (milliseconds)
+ENTRY_POINT_BUDGET = {"src.cli": 120}
+
+# packages that must not be loaded by importing the modules above
+LAZY_PACKAGES = ["numpy", "networkx", "pandas", "parse", "qubitmapping",
+                 "progress", "icecream"]
+
+MEASURE_CODE = """
+import sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+import simplejson as json
+print(json.dumps({{"elapsed": elapsed,
+                   "loaded": [p for p in {packages!r} if p in sys.modules]}}))
+"""
+
+
+def measure_import(module, **kwargs):
+    """
+        function to measure the import time of a module in fresh interpreters
+        kwargs:
+            runs: number of the measurements (default : 5)
+            path: directory added to the module search path (default : src)
+    """
+    runs = kwargs.get("runs")
+    if runs is None:
+        runs = 5
+
+    path = kwargs.get("path")
+    if path is None:
+        path = path_src
+
+    code = MEASURE_CODE.format(path=path, module=module, packages=LAZY_PACKAGES)
+
+    list_elapsed = []
+    loaded = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], check=True,
+                                capture_output=True, text=True).stdout
+        measurement = json.loads(output.strip().splitlines()[-1])
+        list_elapsed.append(measurement["elapsed"] * 1000)
+        loaded = measurement["loaded"]
+
+    return {"median": statistics.median(list_elapsed),
+            "min": min(list_elapsed),
+            "loaded": loaded}
+
+
+def run_benchmark(**kwargs):
+    """
+        function to run the startup benchmark and return the list of violations
+        kwargs:
+            runs: number of the measurements per module (default : 5)
+            scale: factor applied to the budgets, e.g., for slow machines (default : 1.0)
+    """
+    scale = kwargs.get("scale")
+    if scale is None:
+        scale = 1.0
+
+    list_budgets = [(module, budget, path_src) for module, budget in IMPORT_BUDGET.items()]
+    list_budgets += [(module, budget, path_root) for module, budget in ENTRY_POINT_BUDGET.items()]
+
+    list_violations = []
+    for module, budget, path in list_budgets:
+        ret = measure_import(module, runs=kwargs.get("runs"), path=path)
+        budget = budget * scale
+
+        status = "ok"
+        if ret["median"] > budget:
+            status = "over budget"
+            list_violations.append(f"{module} : {ret['median']:.1f} ms > {budget:.1f} ms")
+
+        if ret["loaded"]:
+            status = "eager import"
+            list_violations.append(f"{module} : loads {', '.join(ret['loaded'])}")
+
+        print(f"{module:24s} median {ret['median']:7.1f} ms  min {ret['min']:7.1f} ms  "
+              f"budget {budget:7.1f} ms  {status}")
+
+    return list_violations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="startup benchmark of ftsynthesis")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0)
+    arguments = parser.parse_args()
+
+    violations = run_benchmark(runs=arguments.runs, scale=arguments.scale)
+
+    for violation in violations:
+        print(f"violation : {violation}")
+
+    sys.exit(1 if violations else 0)
@@ -15,8 +15,9 @@ setup(
 	description			= 'fault tolerant circuit synthesis for universal fault-tolerant quantum computing based on concatenated codes',
 	author 				= 'Yongsoo Hwang',
 	author_email 		= 'yhwang@etri.re.kr',
-	install_requires 	= ['simplejson', 'icecream', 'pandas', 'networkx', 'parse', 'progress', 'qubitmapping', 'userproperty'],
+	install_requires 	= ['simplejson', 'icecream', 'pandas', 'networkx', 'numpy', 'parse', 'progress', 'qubitmapping', 'userproperty'],
 	packages 			= find_packages(),
+	entry_points 		= {'console_scripts': ['ftsynthesis = src.cli:main']},
 	zip_safe 			= False,
 	python_requires 	= '>=3'
 	)
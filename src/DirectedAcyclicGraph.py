@@ -9,28 +9,188 @@
 
 '''
     module to generate_directed_acyclic_graph
+
+    the DAG is a networkx DiGraph, or a CompactDAG (createDAG(.., compact=True)) for the
+    memory-lean synthesis : the nodes in slots, the edges in integer arrays, and the reverse
+    DAG derived from the same nodes (derive_reverse_dag) instead of being built again
 '''
 
+import array
 import collections
 import itertools
 from ast import literal_eval
-import parse
-
-import networkx as nx
 
 import globalVariable as g
 
+class CompactNode:
+    '''
+        node of a CompactDAG : the attributes of a DAG node in slots,
+        accessed as the attribute dictionary of a networkx node (node["gate"], node.get(..))
+    '''
+    __slots__ = ("gate", "ctrl", "trgt", "cbit", "id", "angle", "expected", "role")
+
+    def __init__(self, **attributes):
+        for key, value in attributes.items():
+            setattr(self, key, value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+class CompactNodeTable:
+    '''
+        nodes of a CompactDAG indexed by the node id (DAG.nodes[id], iteration over the ids)
+    '''
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = []
+
+    def __getitem__(self, index):
+        node = self.items[index] if 0 <= index < len(self.items) else None
+        if node is None:
+            raise KeyError(index)
+
+        return node
+
+    def __iter__(self):
+        return (index for index, node in enumerate(self.items) if node is not None)
+
+    def __len__(self):
+        return sum(1 for node in self.items if node is not None)
+
+
+class CompactDAG:
+    '''
+        read-only DAG for the graph traversal :
+            nodes (CompactNodeTable) and the successors and the predecessors of each node
+            in integer arrays (offsets per node into the arrays of the node ids)
+        the edges are collected by add_edge and arranged by freeze
+    '''
+    __slots__ = ("nodes", "edge_parents", "edge_children", "last_child", "parents_of_last_child",
+                 "successor_offsets", "successor_ids", "predecessor_offsets", "predecessor_ids")
+
+    def __init__(self, nodes=None):
+        self.nodes = nodes if nodes is not None else CompactNodeTable()
+        self.edge_parents = array.array("l")
+        self.edge_children = array.array("l")
+        self.last_child = None
+        self.parents_of_last_child = set()
+
+    def add_node(self, index, **attributes):
+        items = self.nodes.items
+        if index >= len(items):
+            items.extend([None] * (index + 1 - len(items)))
+
+        # the attributes of an existing node are updated as networkx does
+        if items[index] is None:
+            items[index] = CompactNode(**attributes)
+        else:
+            for key, value in attributes.items():
+                items[index][key] = value
+
+    def add_edge(self, parent, child):
+        # the edges to a node are added together, so that a repeated edge is dropped
+        # by checking the parents of the last child only
+        if child != self.last_child:
+            self.last_child = child
+            self.parents_of_last_child = set()
+
+        if parent in self.parents_of_last_child:
+            return
+
+        self.parents_of_last_child.add(parent)
+        self.edge_parents.append(parent)
+        self.edge_children.append(child)
+
+    def freeze(self):
+        size = len(self.nodes.items)
+        self.successor_offsets, self.successor_ids =\
+            arrange_edges(self.edge_parents, self.edge_children, size)
+        self.predecessor_offsets, self.predecessor_ids =\
+            arrange_edges(self.edge_children, self.edge_parents, size)
+
+        self.edge_parents = self.edge_children = None
+        self.parents_of_last_child = set()
+
+    def successors(self, index):
+        return iter(self.successor_ids[self.successor_offsets[index]:
+                                       self.successor_offsets[index + 1]])
+
+    def predecessors(self, index):
+        return iter(self.predecessor_ids[self.predecessor_offsets[index]:
+                                         self.predecessor_offsets[index + 1]])
+
+    def in_degree(self, index):
+        return self.predecessor_offsets[index + 1] - self.predecessor_offsets[index]
+
+
+def arrange_edges(sources, destinations, size):
+    '''
+        function to arrange the edges (sources[i] -> destinations[i]) by the source
+        the order of the edges of a source is kept (as the adjacency of networkx)
+        return: offsets (size + 1), destinations arranged by the source
+    '''
+    offsets = array.array("l", [0]) * (size + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+
+    for index in range(size):
+        offsets[index + 1] += offsets[index]
+
+    position = offsets[:-1]
+    arranged = array.array("l", [0]) * len(sources)
+    for source, destination in zip(sources, destinations):
+        arranged[position[source]] = destination
+        position[source] += 1
+
+    return offsets, arranged
+
+
 def createDAG(list_qasm, **kwargs):
     '''
          function to generate directed_acyclic graph from the given QASM
+         kwargs:
+            compact: build a CompactDAG instead of a networkx DiGraph (default : False)
     '''
-    DAG = nx.DiGraph()
+    import networkx as nx
+    import parse
+
+    g.ensure_globals()
+
+    flag_compact = kwargs.get("compact")
+    if flag_compact is None:
+        flag_compact = False
+
+    if flag_compact:
+        DAG = CompactDAG()
+    else:
+        DAG = nx.DiGraph()
 
     # 노드 증가할 때 마다 1씩 increment
     node_index = 0
     list_nodes_associated_with_qubit = collections.defaultdict(list)
     list_nodes_connection = []
     list_root_nodes = []
+
+    # the networkx DAG takes the edges at once at the end
+    if flag_compact:
+        connect = DAG.add_edge
+    else:
+        def connect(parent, child):
+            list_nodes_connection.append((parent, child))
     list_qubits = []
 
     for tokens in list_qasm:
@@ -49,7 +209,7 @@ def createDAG(list_qasm, **kwargs):
             if len(list_nodes_associated_with_qubit[ctrl]):
                 flag_children = True
                 parent_node_id = list_nodes_associated_with_qubit[ctrl][-1]
-                list_nodes_connection.append((parent_node_id, node_index))
+                connect(parent_node_id, node_index)
 
             # ctrl/trgt 큐빗을 공유하는 그래프 상의 마지막 노드에 현재 노드 추가
             list_nodes_associated_with_qubit[ctrl].append(node_index)
@@ -59,7 +219,7 @@ def createDAG(list_qasm, **kwargs):
                 if len(list_nodes_associated_with_qubit[trgt]):
                     flag_children = True
                     parent_node_id = list_nodes_associated_with_qubit[trgt][-1]
-                    list_nodes_connection.append((parent_node_id, node_index))
+                    connect(parent_node_id, node_index)
 
                 list_nodes_associated_with_qubit[trgt].append(node_index)
 
@@ -124,7 +284,7 @@ def createDAG(list_qasm, **kwargs):
             if len(list_nodes_associated_with_qubit[trgt]):
                 flag_children = True
                 parent_node_id = list_nodes_associated_with_qubit[trgt][-1]
-                list_nodes_connection.append((parent_node_id, node_index))
+                connect(parent_node_id, node_index)
 
             if not flag_children:
                 list_root_nodes.append(DAG.nodes[node_index])
@@ -150,7 +310,7 @@ def createDAG(list_qasm, **kwargs):
                         if len(list_nodes_associated_with_qubit[qubit]):
                             flag_children = True
                             parent_node_id = list_nodes_associated_with_qubit[qubit][-1]
-                            list_nodes_connection.append((parent_node_id, node_index))
+                            connect(parent_node_id, node_index)
 
                         if not flag_children:
                             list_root_nodes.append(DAG.nodes[node_index])
@@ -171,7 +331,7 @@ def createDAG(list_qasm, **kwargs):
             for qubit in list_qubits:
                 if len(list_nodes_associated_with_qubit[qubit]):
                     parent_node_id = list_nodes_associated_with_qubit[qubit][-1]
-                    list_nodes_connection.append((parent_node_id, node_index))
+                    connect(parent_node_id, node_index)
                 else:
                     list_root_nodes.append(DAG.nodes[node_index])
 
@@ -183,7 +343,7 @@ def createDAG(list_qasm, **kwargs):
             for qubit in list_nodes_associated_with_qubit.keys():
                 if len(list_nodes_associated_with_qubit[qubit]):
                     parent_node_id = list_nodes_associated_with_qubit[qubit][-1]
-                    list_nodes_connection.append((parent_node_id, node_index))
+                    connect(parent_node_id, node_index)
                 else:
                     list_root_nodes.append(DAG.nodes[node_index])
 
@@ -205,11 +365,84 @@ def createDAG(list_qasm, **kwargs):
 
         node_index+=1
 
-    DAG.add_edges_from(list_nodes_connection)
+    if flag_compact:
+        DAG.freeze()
+    else:
+        DAG.add_edges_from(list_nodes_connection)
 
     return {"DAG": DAG, "roots": list_root_nodes}
 
 
+def derive_reverse_dag(dag, **kwargs):
+    '''
+        function to derive the DAG of the reversed QASM from a CompactDAG
+        the nodes are shared, and the edges are linked over the nodes in the reverse order
+        by the rules of createDAG (the same as createDAG(reversed(QASM), compact=True),
+        except that a Release keeps the qubits it was expanded to in the forward order)
+
+        kwargs:
+            limit: the nodes from the id limit (e.g., the moveback) are left out
+                   (default : all the nodes)
+    '''
+    g.ensure_globals()
+
+    limit = kwargs.get("limit")
+    if limit is None:
+        limit = len(dag.nodes.items)
+
+    reverse_dag = CompactDAG(dag.nodes)
+    list_root_nodes = []
+
+    # the last node on each qubit in the reverse order
+    last_node_of_qubit = {}
+
+    list_two_qubit_gates = [g.str_gate_cnot, g.str_gate_cz, g.str_move_back, g.str_move,
+                            g.str_gate_cx, g.str_gate_swap]
+
+    for node_index in reversed(range(limit)):
+        node = dag.nodes.items[node_index]
+        if node is None:
+            continue
+
+        if node["gate"] == "Qubit":
+            list_root_nodes.append(node)
+            continue
+
+        if node["gate"] == g.str_barrier_all:
+            list_qubits = list(last_node_of_qubit.keys())
+
+        elif node["gate"] == g.str_barrier:
+            list_qubits = node["trgt"]
+
+        elif node["gate"] in list_two_qubit_gates:
+            list_qubits = [node["ctrl"]]
+            if node["gate"] not in [g.str_move] and node["trgt"] != "measurement_qubit":
+                list_qubits.append(node["trgt"])
+
+        else:
+            list_qubits = [node["trgt"]]
+
+        flag_children = False
+        for qubit in list_qubits:
+            parent_node_id = last_node_of_qubit.get(qubit)
+            if parent_node_id is not None:
+                flag_children = True
+                reverse_dag.add_edge(parent_node_id, node_index)
+
+            # a selective barrier is a root for each of its qubits without a parent
+            elif node["gate"] == g.str_barrier:
+                list_root_nodes.append(node)
+
+            last_node_of_qubit[qubit] = node_index
+
+        if not flag_children and node["gate"] not in [g.str_barrier, g.str_barrier_all]:
+            list_root_nodes.append(node)
+
+    reverse_dag.freeze()
+
+    return {"DAG": reverse_dag, "roots": list_root_nodes}
+
+
 def get_parent_from_node(DAG, node, depth):
     '''
         function to return ancestors in depth steps from the current node
@@ -246,3 +479,25 @@ def get_children_from_node(DAG, node, depth):
     list_children.remove(node["id"])
 
     return list_children
+
+
+def get_critical_path_depth(DAG):
+    '''
+        function to return the number of time steps along the critical path of the DAG
+        declarations, barriers, release and move do not take a time step
+        (a lower bound of the depth of any circuit implementing the DAG before cancellation)
+    '''
+    import networkx as nx
+
+    g.ensure_globals()
+
+    list_timed_gates = set(g.list_one_qubit_gates) |\
+        set([g.str_gate_cnot, g.str_gate_cz, g.str_gate_cx, g.str_gate_swap])
+
+    depth = {}
+    for node in nx.topological_sort(DAG):
+        weight = 1 if DAG.nodes[node].get("gate") in list_timed_gates else 0
+        depth[node] = weight + max((depth[parent] for parent in DAG.predecessors(node)),
+                                   default=0)
+
+    return max(depth.values(), default=0)
@@ -16,7 +16,6 @@ import re
 import collections
 import math
 from ast import literal_eval
-import parse
 import globalVariable as g
 
 
@@ -49,28 +48,89 @@ def analyze_qasm(path_qasm):
     """
         function to extract list_qasm_commands, list_algorithm_qubits from QASM
     """
+    with open(path_qasm, "r", encoding="utf-8") as infile:
+        list_lines = infile.readlines()
+
+    return analyze_qasm_lines(list_lines)
+
+
+def analyze_qasm_lines(list_lines):
+    """
+        function to extract list_qasm_commands, list_algorithm_qubits from the lines of QASM
+        (e.g., a protocol held in memory as a string or a list of lines)
+    """
+    import parse
+
+    if isinstance(list_lines, str):
+        list_lines = list_lines.splitlines()
+
     list_qasm_commands = []
     list_algorithm_qubits = []
 
     cnot_counts = 0
 
-    with open(path_qasm, "r", encoding="utf-8") as infile:
-        for line in infile:
-            token = parser.findall(line)
+    for line in list_lines:
+        token = parser.findall(line)
+
+        if len(token) == 0:
+            continue
+
+        list_qasm_commands.append(token)
+
+        if token[0] in [g.str_gate_rx, g.str_gate_rz, g.str_gate_ry]:
+            # 경우에 따라서 gate angle trgt 순으로 기재된 qasm 과 gate trgt angle 로 기재된 qasm 이 혼재함
+            try:
+                if isinstance(literal_eval(token[1]), (float, int)):
+                    angle, trgt = token[1:3]
+
+            except TypeError:
+                if isinstance(literal_eval(token[2]), (float, int)):
+                    trgt, angle = token[1:3]
+
+            finally:
+                list_algorithm_qubits.append(trgt)
+
+        elif token[0] in [g.str_gate_prepz, g.str_gate_prepx,
+                          g.str_gate_measz, g.str_gate_measx]:
+            list_algorithm_qubits.append(token[1])
 
+        elif token[0] in [g.str_gate_x, g.str_gate_z, g.str_gate_y,
+                          g.str_gate_phase, g.str_gate_h]:
+            list_algorithm_qubits.append(token[1])
+
+        elif token[0] in [g.str_gate_cnot]:
+            cnot_counts+=1
+            list_algorithm_qubits.extend(list(token[1:]))
+
+        elif token[0] in [g.str_gate_swap]:
+            cnot_counts+=3
+            list_algorithm_qubits.extend(list(token[1:]))
+
+        elif token[0] in ["Qubit"]:
+            result = parse.compile("{}[{}]").parse(token[1])
+            if result is None:
+                list_algorithm_qubits.append(token[1])
+            else:
+                trgt_qubit_name, trgt_qubit_size = result[:]
+
+                if trgt_qubit_size.isdigit():
+                    for i in range(len(trgt_qubit_size)):
+                        list_algorithm_qubits.append(f"{trgt_qubit_name}[{i}]")
+
+
+    if len(list_algorithm_qubits) == 0:
+        for line in list_lines:
+            token = parser.findall(line)
             if len(token) == 0:
                 continue
 
-            list_qasm_commands.append(token)
-
             if token[0] in [g.str_gate_rx, g.str_gate_rz, g.str_gate_ry]:
-                # 경우에 따라서 gate angle trgt 순으로 기재된 qasm 과 gate trgt angle 로 기재된 qasm 이 혼재함
                 try:
-                    if isinstance(literal_eval(token[1]), (float, int)):
+                    if isinstance(literal_eval(token[1]), float):
                         angle, trgt = token[1:3]
 
                 except TypeError:
-                    if isinstance(literal_eval(token[2]), (float, int)):
+                    if isinstance(literal_eval(token[2]), float):
                         trgt, angle = token[1:3]
 
                 finally:
@@ -92,53 +152,6 @@ def analyze_qasm(path_qasm):
                 cnot_counts+=3
                 list_algorithm_qubits.extend(list(token[1:]))
 
-            elif token[0] in ["Qubit"]:
-                result = parse.compile("{}[{}]").parse(token[1])
-                if result is None:
-                    list_algorithm_qubits.append(token[1])
-                else:
-                    trgt_qubit_name, trgt_qubit_size = result[:]
-
-                    if trgt_qubit_size.isdigit():
-                        for i in range(len(trgt_qubit_size)):
-                            list_algorithm_qubits.append(f"{trgt_qubit_name}[{i}]")
-
-
-    if len(list_algorithm_qubits) == 0:
-        with open(path_qasm, "r", encoding="utf-8") as infile:
-            for line in infile:
-                token = parser.findall(line)
-                if len(token) == 0:
-                    continue
-
-                if token[0] in [g.str_gate_rx, g.str_gate_rz, g.str_gate_ry]:
-                    try:
-                        if isinstance(literal_eval(token[1]), float):
-                            angle, trgt = token[1:3]
-
-                    except TypeError:
-                        if isinstance(literal_eval(token[2]), float):
-                            trgt, angle = token[1:3]
-
-                    finally:
-                        list_algorithm_qubits.append(trgt)
-
-                elif token[0] in [g.str_gate_prepz, g.str_gate_prepx,
-                                  g.str_gate_measz, g.str_gate_measx]:
-                    list_algorithm_qubits.append(token[1])
-
-                elif token[0] in [g.str_gate_x, g.str_gate_z, g.str_gate_y,
-                                  g.str_gate_phase, g.str_gate_h]:
-                    list_algorithm_qubits.append(token[1])
-
-                elif token[0] in [g.str_gate_cnot]:
-                    cnot_counts+=1
-                    list_algorithm_qubits.extend(list(token[1:]))
-
-                elif token[0] in [g.str_gate_swap]:
-                    cnot_counts+=3
-                    list_algorithm_qubits.extend(list(token[1:]))
-
     list_algorithm_qubits = list(set(list_algorithm_qubits))
 
     return list_qasm_commands, list_algorithm_qubits, cnot_counts
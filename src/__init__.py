@@ -1,5 +1,3 @@
-
-
 # -*-coding:utf-8-*-
 
 # This code is part of ftsynthesis
@@ -11,8 +9,10 @@
 
 '''
     init function
-'''
 
-from . import checkup, depth_analysis, DirectedAcyclicGraph, \
-    DistanceMatrix, formatconversion, globalVariable, ftsynthesis, \
-    SABRE_utility, util
+    the modules import each other by their plain names (e.g., import formatconversion),
+    so they are imported with this directory in the module search path (e.g., the tests),
+    and the console script (src.cli:main) adds it by itself
+
+    the submodules are not imported here, to keep the startup of the console script short
+'''
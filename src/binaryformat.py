@@ -0,0 +1,371 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module for the compact binary container of synthesis results
+
+    layout of a file:
+        header : magic (4 bytes), version (uint16), number of sections (uint16)
+        table  : per section, name (16 bytes), offset, length, raw length (uint64), codec (uint8)
+        sections : "document" (json of the result without the circuit),
+                   "circuit" (json of opcodes, params and the time keys),
+                   "time", "opcode", "qubit0", "qubit1" (little-endian integer arrays)
+'''
+
+import array
+import contextlib
+import mmap
+import struct
+import sys
+import zlib
+
+import simplejson as json
+
+import formatconversion
+
+MAGIC = b"FTCB"
+VERSION = 1
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+
+STRUCT_HEADER = struct.Struct("<4sHH")
+STRUCT_SECTION = struct.Struct("<16sQQQB")
+
+# typecodes of the circuit columns in a file (fixed item size on all platforms)
+COLUMN_TYPECODES = {"time": "i", "opcode": "H", "qubit0": "i", "qubit1": "i"}
+
+# placeholder of the circuit in the document section
+CIRCUIT_PLACEHOLDER = "__circuit__"
+
+
+def find_system_code(document, path=()):
+    """
+        function to find the path to the "system_code" (with "circuit") in a result document
+        e.g., ("result", "system_code") for the files in Circuits/*/Raw Data
+    """
+    if not isinstance(document, dict):
+        return None
+
+    system_code = document.get("system_code")
+    if isinstance(system_code, dict) and isinstance(system_code.get("circuit"), dict):
+        return path + ("system_code",)
+
+    for key, value in document.items():
+        ret = find_system_code(value, path + (key,))
+        if ret is not None:
+            return ret
+
+    return None
+
+
+def get_by_path(document, path):
+    """
+        function to get the item at the path of keys
+    """
+    for key in path:
+        document = document[key]
+
+    return document
+
+
+def encode_string_circuit(circuit):
+    """
+        function to encode a time ordered circuit written in string into the columnar form
+        instructions whose string is not restored exactly from the columnar form are kept
+        in "extras" {row: string} so that the conversion is lossless
+    """
+    columnar_syscode = formatconversion.new_columnar_syscode()
+    extras = {}
+
+    for time_index in sorted(circuit.keys(), key=int):
+        for str_inst in circuit[time_index]:
+            row = len(columnar_syscode["time"])
+            inst = formatconversion.parse_instruction(str_inst)
+
+            try:
+                formatconversion.append_columnar_instruction(columnar_syscode,
+                                                             int(time_index), inst)
+                flag_restored = formatconversion.render_instruction(
+                    formatconversion.get_columnar_instruction(columnar_syscode, row)) == str_inst
+
+            except (TypeError, ValueError, IndexError, OverflowError):
+                # roll back the partially appended row
+                for column in COLUMN_TYPECODES:
+                    del columnar_syscode[column][row:]
+                columnar_syscode["params"].pop(row, None)
+
+                formatconversion.append_columnar_instruction(columnar_syscode,
+                                                             int(time_index), [inst[0]])
+                flag_restored = False
+
+            if not flag_restored:
+                extras[row] = str_inst
+
+    return columnar_syscode, extras
+
+
+def decode_string_circuit(columnar_syscode, extras, list_keys):
+    """
+        function to restore the time ordered circuit written in string
+        with the time keys in their original order
+    """
+    circuit = {key: [] for key in list_keys}
+    table_keys = {int(key): key for key in list_keys}
+
+    for row in range(len(columnar_syscode["time"])):
+        str_inst = extras.get(row)
+        if str_inst is None:
+            str_inst = formatconversion.render_instruction(
+                formatconversion.get_columnar_instruction(columnar_syscode, row))
+
+        time_index = columnar_syscode["time"][row]
+        key = table_keys.get(time_index, time_index)
+        circuit.setdefault(key, []).append(str_inst)
+
+    return circuit
+
+
+def save_result(result, path_binary, **kwargs):
+    """
+        function to write a synthesis result (or a result document such as the files in
+        Circuits/*/Raw Data) into the compact binary container
+
+        kwargs:
+            compress: compress the sections with zlib (default : False)
+    """
+    flag_compress = kwargs.get("compress")
+    if flag_compress is None:
+        flag_compress = False
+
+    path_system_code = find_system_code(result)
+    if path_system_code is None:
+        raise Exception("The system code (circuit) is not found in the result.")
+
+    system_code = get_by_path(result, path_system_code)
+    circuit = system_code["circuit"]
+
+    # the columnar form is written directly, the string form is encoded first
+    if "opcodes" in circuit:
+        columnar_syscode, extras, list_keys, circuit_format = circuit, {}, None, "columnar"
+    else:
+        columnar_syscode, extras = encode_string_circuit(circuit)
+        list_keys, circuit_format = list(circuit.keys()), "string"
+
+    # the document without the circuit (mappings, analysis, options, ..)
+    document = dict(result)
+    parent = document
+    for key in path_system_code:
+        parent[key] = dict(parent[key])
+        parent = parent[key]
+    parent["circuit"] = CIRCUIT_PLACEHOLDER
+
+    circuit_info = {"path": list(path_system_code),
+                    "format": circuit_format,
+                    "keys": list_keys,
+                    "opcodes": columnar_syscode["opcodes"],
+                    "params": {str(row): list(params)
+                               for row, params in columnar_syscode["params"].items()},
+                    "extras": {str(row): str_inst for row, str_inst in extras.items()}}
+
+    sections = [("document", json.dumps(document).encode("utf-8")),
+                ("circuit", json.dumps(circuit_info).encode("utf-8"))]
+
+    for column, typecode in COLUMN_TYPECODES.items():
+        values = array.array(typecode, columnar_syscode[column])
+        if sys.byteorder != "little":
+            values.byteswap()
+        sections.append((column, values.tobytes()))
+
+    codec = CODEC_ZLIB if flag_compress else CODEC_RAW
+
+    # offsets of the sections are aligned to 8 bytes for the memory-mapped columns
+    offset = STRUCT_HEADER.size + STRUCT_SECTION.size * len(sections)
+    table, payloads = [], []
+    for name, raw_data in sections:
+        data = zlib.compress(raw_data) if flag_compress else raw_data
+        offset += -offset % 8
+        table.append(STRUCT_SECTION.pack(name.encode("ascii"), offset, len(data),
+                                         len(raw_data), codec))
+        payloads.append((offset, data))
+        offset += len(data)
+
+    with open(path_binary, "wb") as outfile:
+        outfile.write(STRUCT_HEADER.pack(MAGIC, VERSION, len(sections)))
+        outfile.write(b"".join(table))
+
+        for offset, data in payloads:
+            outfile.write(b"\0" * (offset - outfile.tell()))
+            outfile.write(data)
+
+
+def read_section_table(buffer):
+    """
+        function to read the table of sections {name: (offset, length, raw length, codec)}
+    """
+    magic, version, number_sections = STRUCT_HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise Exception("The file is not a binary container of a synthesis result.")
+
+    if version > VERSION:
+        raise Exception(f"The version of the file ({version}) is not supported.")
+
+    table = {}
+    for idx in range(number_sections):
+        name, offset, length, raw_length, codec = STRUCT_SECTION.unpack_from(
+            buffer, STRUCT_HEADER.size + idx * STRUCT_SECTION.size)
+        table[name.rstrip(b"\0").decode("ascii")] = (offset, length, raw_length, codec)
+
+    return table
+
+
+def read_section(buffer, entry):
+    """
+        function to read a section as a memoryview (without copy if it is not compressed)
+    """
+    offset, length, _, codec = entry
+    data = memoryview(buffer)[offset:offset + length]
+
+    if codec == CODEC_ZLIB:
+        return memoryview(zlib.decompress(data))
+
+    return data
+
+
+def load_result(path_binary, **kwargs):
+    """
+        function to read a synthesis result from the binary container
+
+        kwargs:
+            circuit: format of the circuit in the returned result
+                     "columnar" (default) : the columns in array.array, as
+                                            formatconversion.transform_columnar_syscode
+                     "string" : the original layout {time index: ["CNOT 3,4", ..]}
+
+        the file is memory-mapped while it is read, and the result does not refer to it
+        (see open_result for the lazy loading of the circuit)
+    """
+    circuit_format = kwargs.get("circuit")
+    if circuit_format is None:
+        circuit_format = "columnar"
+
+    with open(path_binary, "rb") as infile:
+        buffer = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        return read_result(buffer, circuit_format)
+    finally:
+        buffer.close()
+
+
+@contextlib.contextmanager
+def open_result(path_binary, **kwargs):
+    """
+        context manager to read a synthesis result lazily from the binary container
+        e.g., with binaryformat.open_result(path_binary) as ret: ..
+
+        the file stays memory-mapped within the context, and the circuit columns are
+        memoryviews of the mapped file, so that a step is read only when it is visited
+        (the compressed sections are decompressed at once, and the columns are copied on
+        a big-endian platform), the views are released when the context exits
+
+        kwargs:
+            circuit: format of the circuit in the returned result (see load_result)
+    """
+    circuit_format = kwargs.get("circuit")
+    if circuit_format is None:
+        circuit_format = "columnar"
+
+    with open(path_binary, "rb") as infile:
+        buffer = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+    views = []
+    try:
+        yield read_result(buffer, circuit_format, views=views)
+    finally:
+        for view in views:
+            view.release()
+        buffer.close()
+
+
+def read_result(buffer, circuit_format, **kwargs):
+    """
+        function to read a synthesis result from the buffer of the binary container
+
+        kwargs:
+            views: list collecting the memoryviews of the columns, which are then kept as
+                   views of the buffer (see open_result), otherwise the columns are copied
+                   out of the buffer into array.array (see load_result)
+
+        the circuit with the instructions kept in string ("extras", e.g., an irregular
+        format in a raw data file) is restored in string, as the columnar form does not hold them
+    """
+    views = kwargs.get("views")
+
+    table = read_section_table(buffer)
+
+    document = json.loads(bytes(read_section(buffer, table["document"])).decode("utf-8"))
+    circuit_info = json.loads(bytes(read_section(buffer, table["circuit"])).decode("utf-8"))
+
+    columnar_syscode = {"opcodes": circuit_info["opcodes"],
+                        "params": {int(row): tuple(params)
+                                   for row, params in circuit_info["params"].items()}}
+
+    for column, typecode in COLUMN_TYPECODES.items():
+        data = read_section(buffer, table[column])
+
+        if views is not None and sys.byteorder == "little":
+            values = data.cast(typecode)
+            views.extend([values, data])
+
+        else:
+            values = array.array(typecode)
+            values.frombytes(data)
+            data.release()
+
+            if sys.byteorder != "little":
+                values.byteswap()
+
+        columnar_syscode[column] = values
+
+    extras = {int(row): str_inst for row, str_inst in circuit_info["extras"].items()}
+
+    if circuit_format == "string" or extras:
+        list_keys = circuit_info["keys"]
+        if list_keys is None:
+            list_keys = sorted(set(columnar_syscode["time"]))
+
+        circuit = decode_string_circuit(columnar_syscode, extras, list_keys)
+    else:
+        circuit = columnar_syscode
+
+    get_by_path(document, circuit_info["path"])["circuit"] = circuit
+
+    return document
+
+
+def convert_json_to_binary(path_json, path_binary, **kwargs):
+    """
+        function to convert a result file in json into the binary container
+        kwargs are passed to save_result (e.g., compress=True)
+    """
+    with open(path_json, "r", encoding="utf-8") as infile:
+        document = json.load(infile)
+
+    save_result(document, path_binary, **kwargs)
+
+
+def convert_binary_to_json(path_binary, path_json):
+    """
+        function to convert the binary container back into the json layout
+    """
+    document = load_result(path_binary, circuit="string")
+
+    with open(path_json, "w", encoding="utf-8") as outfile:
+        json.dump(document, outfile, sort_keys=True, indent=4, separators=(',', ':'))
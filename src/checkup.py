@@ -1,4 +1,3 @@
-
 # -*-coding:utf-8-*-
 
 # This code is part of ftsynthesis
@@ -12,40 +11,162 @@
     module to check up the resulting circuit
 '''
 
-import re
+import formatconversion
 import globalVariable as g
 
 
+def generate_adjacency_bitset(qchip):
+    """
+        function to form the adjacency bit-matrix of a quantum chip
+        the j-th bit of the i-th row (python integer) is set if the qubits i and j are adjacent
+    """
+    connectivity = qchip["qubit_connectivity"]
+    adjacency = [0] * (max(int(qubit) for qubit in connectivity.keys()) + 1)
+
+    for qubit, neighbors in connectivity.items():
+        row = 0
+        for neighbor in neighbors:
+            row |= 1 << int(neighbor)
+
+        adjacency[int(qubit)] = row
+
+    return adjacency
+
+
+def find_connectivity_violations(system_code, qchip, **kwargs):
+    """
+        function to find all the 2-qubit gates acting on non-adjacent qubits
+
+        args:
+            system_code: structured circuit before it is stringified
+                         columnar form (see formatconversion.new_columnar_syscode),
+                         time ordered form {time index: [[gate, ctrl, trgt], ..]} or
+                         naive list form [[gate, ctrl, trgt], ..] (time index = list index)
+            qchip: quantum chip data with "qubit_connectivity"
+            adjacency (optional): adjacency bit-matrix made by generate_adjacency_bitset
+
+        return:
+            list of violations {"time": time index, "instruction": instruction}
+    """
+    adjacency = kwargs.get("adjacency")
+    if adjacency is None:
+        adjacency = generate_adjacency_bitset(qchip)
+
+    size_adjacency = len(adjacency)
+    list_two_qubit_gates = (g.str_gate_cnot, g.str_gate_swap, g.str_gate_cz)
+
+    violations = []
+
+    # columnar form: the qubit columns are checked directly
+    if isinstance(system_code, dict) and "opcodes" in system_code:
+        two_qubit_opcodes = set(idx for idx, gate in enumerate(system_code["opcodes"])
+                                if gate in list_two_qubit_gates)
+
+        for row, (opcode, ctrl, trgt) in enumerate(zip(system_code["opcode"],
+                                                       system_code["qubit0"],
+                                                       system_code["qubit1"])):
+            if opcode not in two_qubit_opcodes:
+                continue
+
+            if ctrl >= size_adjacency or not (adjacency[ctrl] >> trgt) & 1:
+                violations.append({"time": system_code["time"][row],
+                    "instruction": formatconversion.get_columnar_instruction(system_code, row)})
+
+        return violations
+
+    for time_index, instructions in formatconversion.iterate_ordered_syscode(system_code):
+        for inst in instructions:
+            if inst[0] not in list_two_qubit_gates:
+                continue
+
+            ctrl, trgt = int(inst[1]), int(inst[2])
+            if ctrl >= size_adjacency or not (adjacency[ctrl] >> trgt) & 1:
+                violations.append({"time": time_index, "instruction": inst})
+
+    return violations
+
+
 def checkup_system_code(system_code, qchip):
 # def checkup_system_code(system_code, qchip, **kwargs):
     """
         function to checkup of the circuit
         whether the system_code is compatible with the quantum chip (qubit connectivity)
     """
-    parser = re.compile(r"[\{a-zA-Z0-9_.*\->\+}]+")
-    flag_verification = True
+    return not find_connectivity_violations(system_code, qchip)
+
+
+def checkup_fault_tolerance(system_code, **kwargs):
+    """
+        function to investigate the fault tolerance of the circuit silently
+        a SWAP between activated qubits (data, magic and prepared ancilla qubits) is reported
+
+        args:
+            system_code: {"circuit": time ordered circuit (columnar, structured or string form),
+                          "initial_mapping": {qubit name: physical qubit index}}
+            snapshot_steps (optional): time indices whose qubit layout is recorded
+                                       (after the instructions of the step are performed)
+            lattice_size (optional): {"height": .., "width": ..} to record a layout as 2d array
+
+        return:
+            {"violations": [{"time": .., "instruction": .., "qubits": (name, name)}, ..],
+             "snapshots": {time index: layout}}
+    """
+    snapshot_steps = kwargs.get("snapshot_steps")
+    if snapshot_steps is None:
+        snapshot_steps = set()
+    else:
+        snapshot_steps = set(int(step) for step in snapshot_steps)
+
+    lattice_size = kwargs.get("lattice_size")
+
+    # qubit names are indexed, and the usage status and inverse mapping are kept in arrays
+    qubit_mapping = system_code["initial_mapping"]
+    list_qubit_names = list(qubit_mapping.keys())
+
+    inverse_mapping = [-1] * (max(int(v) for v in qubit_mapping.values()) + 1)
+    for qubit_id, qubit in enumerate(list_qubit_names):
+        inverse_mapping[int(qubit_mapping[qubit])] = qubit_id
+
+    # the data and magic qubits are activated from the beginning
+    qubit_usage_status = bytearray(len(list_qubit_names))
+    for qubit_id, qubit in enumerate(list_qubit_names):
+        if "data" in qubit or "magic" in qubit:
+            qubit_usage_status[qubit_id] = 1
+
+    violations = []
+    snapshots = {}
+
+    for time_index, instructions in formatconversion.iterate_ordered_syscode(
+            system_code["circuit"]):
+        for inst in instructions:
+            if inst[0] in [g.str_gate_prepz, g.str_gate_prepx]:
+                qubit_usage_status[inverse_mapping[int(inst[1])]] = 1
+
+            elif inst[0] in [g.str_gate_measz, g.str_gate_measx]:
+                qubit_usage_status[inverse_mapping[int(inst[1])]] = 0
+
+            elif inst[0] == g.str_gate_swap:
+                physical_qubit0, physical_qubit1 = int(inst[1]), int(inst[2])
+                qubit_id0 = inverse_mapping[physical_qubit0]
+                qubit_id1 = inverse_mapping[physical_qubit1]
 
-    if isinstance(system_code, dict):
-        for instructions in list(system_code.values()):
-            for inst in instructions:
-                tokens = parser.findall(inst)
+                # interaction (SWAP) between activated qubits
+                if qubit_usage_status[qubit_id0] and qubit_usage_status[qubit_id1]:
+                    violations.append({"time": time_index, "instruction": inst,
+                                       "qubits": (list_qubit_names[qubit_id0],
+                                                  list_qubit_names[qubit_id1])})
 
-                if tokens is None or len(tokens) == 0:
-                    continue
+                inverse_mapping[physical_qubit0], inverse_mapping[physical_qubit1] =\
+                    qubit_id1, qubit_id0
 
-                if tokens[0] in [g.str_gate_cnot, g.str_gate_swap, g.str_gate_cz]:
-                    ctrl, trgt = map(int, tokens[1:])
-                    if trgt not in qchip["qubit_connectivity"][ctrl]:
-                        flag_verification = False
-                        break
+        if time_index in snapshot_steps:
+            layout = [list_qubit_names[qubit_id] if qubit_id >= 0 else None
+                      for qubit_id in inverse_mapping]
 
-    elif isinstance(system_code, list):
-        for inst in system_code:
-            if inst[0] in [g.str_gate_cnot, g.str_gate_swap, g.str_gate_cz]:
-                ctrl, trgt = map(int, inst[1:])
-                if trgt not in qchip["qubit_connectivity"][ctrl]:
-                    flag_verification = False
-                    break
+            if lattice_size is not None:
+                layout = [layout[row * lattice_size["width"]:(row + 1) * lattice_size["width"]]
+                          for row in range(lattice_size["height"])]
 
-    return flag_verification
+            snapshots[time_index] = layout
 
+    return {"violations": violations, "snapshots": snapshots}
@@ -0,0 +1,350 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    command line entry point to run a batch of syntheses declared in a job file (json)
+
+    job file
+        {"synthesis_options": {name: synthesis option, ..},
+         "architecture": default architecture (optional, default : 2),
+         "output_dir": directory for the results (optional),
+         "jobs": [job, ..]}
+
+        job (a list in place of a value runs every combination)
+            "protocol" (or "protocols") : path to the protocol (qasm)
+            "qchip" (or "qchips") : path to a quantum chip file, or
+            "layout_size" (or "layout_sizes") : size of a generated chip, e.g., [7, 7]
+            "architecture" (or "architectures") : architecture of a generated chip
+            "synthesis_option" (or "synthesis_options") : name in "synthesis_options" or an option
+            "qubit_table" : initial mapping or path to it (optional)
+            "name" : prefix of the result names (optional, default : the protocol file name)
+
+        the paths in the job file are relative to the job file
+
+    usage
+        ftsynthesis jobs.json --workers 4 --output-dir Circuits/nightly
+'''
+
+import os
+import sys
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import simplejson as json
+
+# the modules import each other by their plain names (e.g., import formatconversion),
+# so the directory of this module is added to the module search path for the console
+# script (src.cli:main), the heavy packages are imported only when they are used
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ftsynthesis
+
+# output directory (default)
+OUTPUT_DIR = "DB-Jobs"
+
+# prepared chips of a worker process, {key: chip with its distance matrix}
+WORKER_QCHIPS = {}
+
+
+def as_list(value):
+    """
+        function to return a value of the job file as a list
+    """
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def get_job_items(job, key, plural_key):
+    """
+        function to get the values of a job item given by its key or its plural key
+    """
+    if plural_key in job:
+        return list(job[plural_key])
+    if key in job:
+        return as_list(job[key])
+    return []
+
+
+def resolve_path(path, base_dir):
+    """
+        function to resolve a path in the job file relative to the job file
+    """
+    return os.path.normpath(os.path.join(base_dir, os.path.expanduser(path)))
+
+
+def expand_jobs(job_file):
+    """
+        function to read a job file and expand its jobs into single syntheses
+    """
+    with open(job_file, "r", encoding="utf-8") as infile:
+        job_data = json.load(infile)
+
+    base_dir = os.path.dirname(os.path.abspath(job_file))
+    named_options = job_data.get("synthesis_options", {})
+
+    default_architecture = job_data.get("architecture")
+
+    list_expanded = []
+    for job in job_data.get("jobs", []):
+        list_protocols = get_job_items(job, "protocol", "protocols")
+        if not list_protocols:
+            raise Exception(f"Error ! A job has no protocol : {job}")
+
+        list_qchips = [("file", resolve_path(path, base_dir))
+                       for path in get_job_items(job, "qchip", "qchips")]
+
+        list_layout_sizes = job.get("layout_sizes")
+        if list_layout_sizes is None and "layout_size" in job:
+            list_layout_sizes = [job["layout_size"]]
+
+        # the generated chips (layoutbuilder loads numpy)
+        if list_layout_sizes:
+            import layoutbuilder
+
+            list_architectures = get_job_items(job, "architecture", "architectures")
+            if not list_architectures:
+                if default_architecture is None:
+                    default_architecture = layoutbuilder.RECTANGULAR
+                list_architectures = [default_architecture]
+
+            for layout_size, architecture in itertools.product(list_layout_sizes,
+                                                               list_architectures):
+                list_qchips.append(("layout", layoutbuilder.normalize_layout_size(layout_size),
+                                    architecture))
+
+        if not list_qchips:
+            raise Exception(f"Error ! A job has no quantum chip : {job}")
+
+        list_options = []
+        for option in get_job_items(job, "synthesis_option", "synthesis_options"):
+            if isinstance(option, dict):
+                list_options.append((None, option))
+            elif option in named_options:
+                list_options.append((option, named_options[option]))
+            else:
+                raise Exception(f"Error ! Synthesis option {option} is not declared.")
+
+        if not list_options:
+            raise Exception(f"Error ! A job has no synthesis option : {job}")
+
+        qubit_table = job.get("qubit_table")
+        if isinstance(qubit_table, str):
+            with open(resolve_path(qubit_table, base_dir), "r", encoding="utf-8") as infile:
+                qubit_table = json.load(infile)
+
+        for protocol, qchip, (option_name, option) in itertools.product(list_protocols,
+                                                                         list_qchips,
+                                                                         list_options):
+            path_protocol = resolve_path(protocol, base_dir)
+
+            prefix = job.get("name")
+            if prefix is None:
+                prefix = os.path.splitext(os.path.basename(path_protocol))[0]
+
+            if qchip[0] == "file":
+                chip_name = os.path.splitext(os.path.basename(qchip[1]))[0]
+            else:
+                chip_name = f"{qchip[2]}_" + "x".join(str(qchip[1][key])
+                                                      for key in ["height", "length", "width"]
+                                                      if key in qchip[1])
+
+            tokens = [prefix, chip_name] + ([option_name] if option_name else [])
+            list_expanded.append({"name": "_".join(tokens),
+                                  "protocol": path_protocol,
+                                  "qchip": qchip,
+                                  "synthesis_option": option,
+                                  "qubit_table": qubit_table})
+
+    list_names = [job["name"] for job in list_expanded]
+    duplicates = sorted({name for name in list_names if list_names.count(name) > 1})
+    if duplicates:
+        raise Exception(f"Error ! The jobs have the same names : {duplicates}")
+
+    return {"jobs": list_expanded, "output_dir": job_data.get("output_dir"),
+            "base_dir": base_dir}
+
+
+def get_worker_qchip(qchip):
+    """
+        function to get a prepared quantum chip, kept for the following jobs of the worker
+    """
+    if qchip[0] == "file":
+        status = os.stat(qchip[1])
+        key = (qchip[1], status.st_mtime_ns)
+    else:
+        key = ("layout", qchip[2], tuple(sorted(qchip[1].items())))
+
+    if key not in WORKER_QCHIPS:
+        if qchip[0] == "file":
+            WORKER_QCHIPS[key] = ftsynthesis.prepare_qchip(qchip[1])
+        else:
+            import layoutbuilder
+
+            WORKER_QCHIPS[key] = ftsynthesis.prepare_qchip(
+                layoutbuilder.generate_qchip(qchip[1], architecture=qchip[2]))
+
+    return WORKER_QCHIPS[key]
+
+
+def run_cli_job(job):
+    """
+        function to synthesize a job, write its result and return its summary
+    """
+    summary = {"name": job["name"], "protocol": job["protocol"],
+               "path_result": job["path_result"]}
+
+    start_time = time.time()
+    try:
+        qchip = get_worker_qchip(job["qchip"])
+        protocol = ftsynthesis.prepare_protocol(job["protocol"])
+
+        protocol_size = len(set(protocol["algorithm_qubits"]))
+        qchip_size = len(qchip["qubit_connectivity"])
+        if qchip_size < protocol_size:
+            raise Exception(f"The quantum chip ({qchip_size} qubits) is smaller than "
+                            f"the protocol ({protocol_size} qubits).")
+
+        # the workers run in parallel, so that no progress is shown on the console
+        result = ftsynthesis.synthesize(protocol, qchip,
+                                        synthesis_option=job["synthesis_option"],
+                                        qubit_table=job["qubit_table"],
+                                        sink=job["path_result"],
+                                        listeners=[])
+
+    except Exception as error:
+        summary.update({"error": str(error), "elapsed": time.time() - start_time})
+        return summary
+
+    analysis = result["analysis"]
+    summary.update({"qchip": result["qchip"].get("device_name"),
+                    "KQ": analysis["KQ"],
+                    "Circuit Depth": analysis["Circuit Depth"],
+                    "Gates": sum(analysis["Function List"].values()),
+                    "Qubit": analysis["Qubit"]["Qubit"],
+                    "elapsed": time.time() - start_time})
+
+    return summary
+
+
+def run_jobs(list_jobs, output_dir, **kwargs):
+    """
+        function to run the jobs and write a result file per job into the output directory
+
+        kwargs:
+            workers: number of worker processes (default : os.cpu_count(), 1 : no pool)
+            skip_existing: skip the jobs whose result file exists (default : False)
+
+        return:
+            the summaries of the jobs (also written into summary.json of the output directory)
+    """
+    workers = kwargs.get("workers")
+    if workers is None:
+        workers = os.cpu_count()
+
+    flag_skip_existing = kwargs.get("skip_existing")
+    if flag_skip_existing is None:
+        flag_skip_existing = False
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    list_summaries = []
+    list_pending = []
+    for job in list_jobs:
+        job = dict(job, path_result=os.path.join(output_dir, f"{job['name']}.json"))
+
+        if flag_skip_existing and os.path.exists(job["path_result"]):
+            list_summaries.append({"name": job["name"], "protocol": job["protocol"],
+                                   "path_result": job["path_result"], "skipped": True})
+            continue
+
+        list_pending.append(job)
+
+    def report(summary):
+        if "error" in summary:
+            print(f"[error] {summary['name']} : {summary['error']}", file=sys.stderr)
+        else:
+            print(f"[done] {summary['name']} : KQ {summary['KQ']}, "
+                  f"depth {summary['Circuit Depth']} ({summary['elapsed']:.1f}s)",
+                  file=sys.stderr)
+        list_summaries.append(summary)
+
+    if workers == 1 or len(list_pending) <= 1:
+        for job in list_pending:
+            report(run_cli_job(job))
+
+    elif list_pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(list_pending))) as executor:
+            futures = [executor.submit(run_cli_job, job) for job in list_pending]
+            for future in as_completed(futures):
+                report(future.result())
+
+    order = {job["name"]: idx for idx, job in enumerate(list_jobs)}
+    list_summaries.sort(key=lambda summary: order[summary["name"]])
+
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as outfile:
+        json.dump(list_summaries, outfile, sort_keys=True, indent=4, separators=(',', ':'))
+
+    return list_summaries
+
+
+def main(argv=None):
+    """
+        function for the console entry point, return the exit status
+        (1 if a job failed)
+    """
+    parser = argparse.ArgumentParser(prog="ftsynthesis",
+                                     description="run the syntheses declared in a job file")
+    parser.add_argument("job_file", help="path to the job file (json)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default : the number of cpus)")
+    parser.add_argument("--output-dir", default=None,
+                        help="directory for the results "
+                             f"(default : output_dir of the job file or {OUTPUT_DIR})")
+    parser.add_argument("--only", action="append", default=None,
+                        help="run only the job of the name (repeatable)")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="skip the jobs whose result file exists")
+    parser.add_argument("--list", action="store_true",
+                        help="list the jobs without running them")
+    arguments = parser.parse_args(argv)
+
+    expanded = expand_jobs(arguments.job_file)
+    list_jobs = expanded["jobs"]
+
+    if arguments.only:
+        unknown = set(arguments.only) - {job["name"] for job in list_jobs}
+        if unknown:
+            parser.error(f"unknown jobs : {sorted(unknown)}")
+        list_jobs = [job for job in list_jobs if job["name"] in arguments.only]
+
+    if arguments.list:
+        for job in list_jobs:
+            print(job["name"])
+        return 0
+
+    output_dir = arguments.output_dir
+    if output_dir is None:
+        if expanded["output_dir"] is not None:
+            output_dir = resolve_path(expanded["output_dir"], expanded["base_dir"])
+        else:
+            output_dir = OUTPUT_DIR
+
+    list_summaries = run_jobs(list_jobs, output_dir, workers=arguments.workers,
+                              skip_existing=arguments.skip_existing)
+
+    return 1 if any("error" in summary for summary in list_summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,7 +12,6 @@
 '''
 
 import collections
-import networkx
 
 import DirectedAcyclicGraph
 import globalVariable as g
@@ -85,6 +84,8 @@ def evaluate_cnot_depth(system_code):
         function to evaluate the cnot-depth of a circuit
         it is determined from the directed acyclic graph with the longest path
     """
+    import networkx
+
 
     circuit_dag = DirectedAcyclicGraph.createDAG(system_code["circuit"], goal="cnot_depth")
     cnot_depth = networkx.dag_longest_path_length(circuit_dag["DAG"]) + 1
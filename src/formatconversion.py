@@ -11,6 +11,7 @@
     module to form the resulting circuit
 '''
 
+import array
 import collections
 from math import *
 from ast import literal_eval
@@ -275,13 +276,172 @@ def transform_time_ordered_syscode(syscode, qubit_mapping):
     pprint(collections_circuits)
 
 
-def transform_ordered_syscode(syscode, **kwargs):
-    '''
-        개별 게이트의 circuit index를 분석하고, 시간순으로 정리된 회로를 생성 리턴하는 함
-    '''
+def new_columnar_syscode():
+    """
+        function to make an empty time ordered circuit in the columnar form
+
+        columns:
+            time: time index of each instruction
+            opcode: index of the gate name in "opcodes"
+            qubit0, qubit1: physical qubit indices (-1 if not used)
+            params: {row: tuple of the other operands (angle, cbit, barrier qubits, ..)}
+    """
+    return {"opcodes": [],
+            "time": array.array("l"),
+            "opcode": array.array("H"),
+            "qubit0": array.array("l"),
+            "qubit1": array.array("l"),
+            "params": {}}
+
+
+def append_columnar_instruction(columnar_syscode, time_index, inst):
+    """
+        function to append an instruction of the list form (e.g., ["CNOT", 3, 4])
+        to the time ordered circuit in the columnar form
+    """
+    opcodes = columnar_syscode["opcodes"]
+    try:
+        opcode = opcodes.index(inst[0])
+    except ValueError:
+        opcode = len(opcodes)
+        opcodes.append(inst[0])
+
+    qubit0 = qubit1 = -1
+    params = None
+
+    if inst[0] in [g.str_gate_cnot, g.str_gate_cz, g.str_gate_swap]:
+        qubit0, qubit1 = inst[1:3]
+
+    elif inst[0] in [g.str_gate_rz, g.str_gate_rx, g.str_gate_ry, g.str_gate_phase,
+                     g.str_gate_u]:
+        *params, qubit0 = inst[1:]
+
+    elif inst[0] in [g.str_gate_measz, g.str_gate_measx]:
+        qubit0, *params = inst[1:]
+
+    elif inst[0] in [g.str_barrier_all, g.str_barrier]:
+        params = inst[1:]
+
+    else:
+        qubit0 = inst[1]
+        params = inst[2:]
+
+    row = len(columnar_syscode["time"])
+    columnar_syscode["time"].append(time_index)
+    columnar_syscode["opcode"].append(opcode)
+    columnar_syscode["qubit0"].append(qubit0)
+    columnar_syscode["qubit1"].append(qubit1)
+
+    if params:
+        columnar_syscode["params"][row] = tuple(params)
+
+
+def get_columnar_instruction(columnar_syscode, row):
+    """
+        function to restore the instruction of the list form at a row of the columnar form
+    """
+    gate = columnar_syscode["opcodes"][columnar_syscode["opcode"][row]]
+    qubit0 = columnar_syscode["qubit0"][row]
+    qubit1 = columnar_syscode["qubit1"][row]
+    params = columnar_syscode["params"].get(row, ())
+
+    if qubit1 >= 0:
+        return [gate, qubit0, qubit1]
+
+    if gate in [g.str_gate_rz, g.str_gate_rx, g.str_gate_ry, g.str_gate_phase, g.str_gate_u]:
+        return [gate, *params, qubit0]
+
+    if qubit0 < 0:
+        return [gate, *params]
+
+    return [gate, qubit0, *params]
+
+
+def restore_syscode(columnar_syscode):
+    """
+        function to restore the naive list of instructions (list form) from the rows of
+        the columnar form (e.g., the syscode written by a traversal in the memory-lean mode)
+    """
+    return [get_columnar_instruction(columnar_syscode, row)
+            for row in range(len(columnar_syscode["time"]))]
+
+
+def render_instruction(inst):
+    """
+        function to format an instruction of the list form in string (e.g., "CNOT 3,4")
+    """
+    if inst[0] in [g.str_gate_cnot, g.str_gate_cz, g.str_gate_swap]:
+        return f"{inst[0]} {inst[1]},{inst[2]}"
+
+    if inst[0] in [g.str_gate_rz, g.str_gate_rx, g.str_gate_ry, g.str_gate_phase]:
+        angle, qubit = inst[1:]
+        return f"{inst[0]}({angle}) {qubit}"
+
+    if inst[0] in [g.str_gate_u]:
+        *angle, qubit = inst[1:]
+        return f"{inst[0]}({angle[0]},{angle[1]},{angle[2]}) {qubit}"
+
+    if inst[0] in [g.str_gate_measz, g.str_gate_measx] and len(inst) > 2:
+        qubit, cbit, *arguments = inst[1:]
+        list_str_command = [inst[0], str(qubit), "->", str(cbit)]
+
+        if len(arguments):
+            sub_args_command = []
+            str_args = ",".join(sub_args_command)
+            str_args = "(" + str_args + ")"
+            list_str_command.append(str_args)
+
+        return " ".join(list_str_command)
+
+    if inst[0] == g.str_barrier_all:
+        return g.str_barrier_all
+
+    if inst[0] == g.str_barrier:
+        return f"{g.str_barrier} {inst[1]}"
+
+    if len(inst) == 1:
+        return inst[0]
+
+    return f"{inst[0]} {','.join(str(operand) for operand in inst[1:])}"
+
+
+def parse_instruction(str_inst):
+    """
+        function to parse an instruction formatted in string into the list form
+        e.g., "CNOT 3,4" -> ["CNOT", 3, 4], "Rz(0.5) 3" -> ["Rz", "0.5", 3],
+              "MeasZ 3 -> 3" -> ["MeasZ", 3, 3]
+    """
+    def to_operand(token):
+        return int(token) if token.lstrip("-").isdigit() else token
+
+    gate, _, operands = str_inst.strip().partition(" ")
+
+    params = []
+    if gate.endswith(")") and "(" in gate:
+        gate, _, str_params = gate[:-1].partition("(")
+        params = [to_operand(param) for param in str_params.split(",")]
+
+    if "," in operands:
+        qubits = operands.split(",")
+    else:
+        qubits = [token for token in operands.split(" ") if token not in ["", "->"]]
+
+    qubits = [to_operand(qubit) for qubit in qubits]
+
+    if params:
+        return [gate, *params, *qubits]
+
+    return [gate, *qubits]
+
+
+def transform_columnar_syscode(syscode):
+    """
+        function to transform a system code of the list form without time information into
+        the time ordered circuit in the columnar form (rows are sorted in time order)
+    """
 
     time_index = collections.defaultdict(int)
-    ordered_syscode = collections.defaultdict(list)
+    columnar_syscode = new_columnar_syscode()
 
     for inst in syscode:
         flag_barrier = False
@@ -291,72 +451,118 @@ def transform_ordered_syscode(syscode, **kwargs):
 
             applying_index = max(time_index[ctrl], time_index[trgt])
             time_index[ctrl] = time_index[trgt] = applying_index+1
-            list_command = f"{inst[0]} {ctrl},{trgt}"
 
         elif inst[0] in ["Qubit", "Cbit"]:
             continue
 
-        else:
-            if inst[0] in [g.str_gate_rz, g.str_gate_rx, g.str_gate_ry, g.str_gate_phase]:
-                angle, qubit = inst[1:]
-                list_command = f"{inst[0]}({angle}) {qubit}"
-                applying_index = time_index[qubit]
-                time_index[qubit] += 1
-
-            elif inst[0] in [g.str_gate_u]:
-                *angle, qubit = inst[1:]
-                list_command = f"{inst[0]}({angle[0]},{angle[1]},{angle[2]}) {qubit}"
-                applying_index = time_index[qubit]
-                time_index[qubit] += 1
-
-            elif inst[0] in [g.str_gate_measz, g.str_gate_measx]:
-                qubit, cbit, *arguments = inst[1:]
-                list_str_command = [inst[0], str(qubit), "->", str(cbit)]
-
-                if len(arguments):
-                    sub_args_command = []
-                    str_args = ",".join(sub_args_command)
-                    str_args = "(" + str_args + ")"
-                    list_str_command.append(str_args)
-
-                list_command = " ".join(list_str_command)
-
-                applying_index = time_index[qubit]
-                time_index[qubit] += 1
-
-            elif inst[0] in ["Qubit"]:
-                if len(inst[1:]) == 2:
-                    qubit, size = inst[1:]
-                    list_command = f"{inst[0]} {qubit} {size}"
-                else:
-                    qubit = inst[1]
-                    list_command = f"{inst[0]} {qubit}"
+        elif inst[0] in [g.str_gate_rz, g.str_gate_rx, g.str_gate_ry, g.str_gate_phase,
+                         g.str_gate_u]:
+            qubit = inst[-1]
+            applying_index = time_index[qubit]
+            time_index[qubit] += 1
 
-            elif inst[0] == g.str_barrier_all:
-                flag_barrier = True
-                list_command = g.str_barrier_all
-                applying_index = max(list(time_index.values()))
+        elif inst[0] == g.str_barrier_all:
+            flag_barrier = True
+            applying_index = max(list(time_index.values()), default=0)
 
-                for qubit in time_index.keys():
-                    time_index[qubit] = applying_index
+            for qubit in time_index.keys():
+                time_index[qubit] = applying_index
 
-            elif inst[0] == g.str_barrier:
-                flag_barrier = True
-                list_command = f"{g.str_barrier} {inst[1]}"
-                applying_index = max(time_index[qubit] for qubit in inst[1])
+        elif inst[0] == g.str_barrier:
+            flag_barrier = True
+            applying_index = max(time_index[qubit] for qubit in inst[1])
 
-                for qubit in inst[1]:
-                    time_index[qubit] = applying_index
+            for qubit in inst[1]:
+                time_index[qubit] = applying_index
 
-            else:
-                qubit = inst[1]
-                list_command = f"{inst[0]} {qubit}"
-                applying_index = time_index[qubit]
-                time_index[qubit] += 1
+        else:
+            qubit = inst[1]
+            applying_index = time_index[qubit]
+            time_index[qubit] += 1
 
         if flag_barrier:
             applying_index -= 1
 
-        ordered_syscode[applying_index].append(list_command)
+        append_columnar_instruction(columnar_syscode, applying_index, inst)
+
+    # rows are sorted in time order (stable, the order within a time step is kept)
+    list_time = columnar_syscode["time"]
+    order = sorted(range(len(list_time)), key=list_time.__getitem__)
+
+    sorted_syscode = {"opcodes": columnar_syscode["opcodes"], "params": {}}
+    for column in ["time", "opcode", "qubit0", "qubit1"]:
+        values = columnar_syscode[column]
+        sorted_syscode[column] = array.array(values.typecode, (values[row] for row in order))
+
+    params = columnar_syscode["params"]
+    for new_row, row in enumerate(order):
+        if row in params:
+            sorted_syscode["params"][new_row] = params[row]
+
+    return sorted_syscode
+
+
+def iterate_ordered_syscode(circuit):
+    """
+        generator to visit a time ordered circuit step by step
+        yields (time index, list of instructions in the list form)
+
+        args:
+            circuit: columnar form, {time index: [instructions in list or string]}
+                     or a naive list of instructions (time index = list index)
+    """
+    if isinstance(circuit, dict) and "opcodes" in circuit:
+        list_time = circuit["time"]
+        row = 0
+        while row < len(list_time):
+            time_index = list_time[row]
+            instructions = []
+
+            while row < len(list_time) and list_time[row] == time_index:
+                instructions.append(get_columnar_instruction(circuit, row))
+                row += 1
+
+            yield time_index, instructions
+
+    elif isinstance(circuit, dict):
+        for time_index in sorted(circuit.keys(), key=int):
+            yield int(time_index), [parse_instruction(inst) if isinstance(inst, str) else inst
+                                    for inst in circuit[time_index]]
+
+    else:
+        for time_index, inst in enumerate(circuit):
+            yield time_index, [inst]
+
+
+def render_ordered_syscode(columnar_syscode):
+    """
+        function to render a time ordered circuit in the columnar form into
+        {time index: [instructions formatted in string]} for exporting
+    """
+    ordered_syscode = collections.defaultdict(list)
+
+    for time_index, instructions in iterate_ordered_syscode(columnar_syscode):
+        ordered_syscode[time_index].extend(render_instruction(inst) for inst in instructions)
 
     return ordered_syscode
+
+
+def transform_ordered_syscode(syscode, **kwargs):
+    '''
+        개별 게이트의 circuit index를 분석하고, 시간순으로 정리된 회로를 생성 리턴하는 함
+
+        kwargs:
+            structured: if True, the instructions are kept in the list form
+                        (e.g., ["CNOT", 3, 4]) instead of being formatted in string
+    '''
+
+    flag_structured = kwargs.get("structured")
+    if flag_structured is None:
+        flag_structured = False
+
+    columnar_syscode = transform_columnar_syscode(syscode)
+
+    if flag_structured:
+        return dict(iterate_ordered_syscode(columnar_syscode))
+
+    return render_ordered_syscode(columnar_syscode)
@@ -17,34 +17,82 @@
 # import re
 
 import collections
+import itertools
 import math
 import copy
-import multiprocessing
+import time
 from datetime import datetime
 
-from progress.bar import Bar
-import parse
-
-import simplejson as json
-import numpy as np
-
-# package for picking a random qubit mapping (developed by YH)
-import qubitmapping
+# the heavy packages (numpy, networkx, parse, progress, simplejson, qubitmapping)
+# are imported on the code paths that need them, to keep the import of this module fast
 
 import DirectedAcyclicGraph
 import SABRE_utility
 import checkup
 import formatconversion
-import depth_analysis
 import DistanceMatrix as DM
 import globalVariable as g
-
-g.initialize_globals()
+import sharedtransport
+import synthesisevents
 
 # constant for qubit's usage status
 FLAG_ACTIVE = "active"
 FLAG_INACTIVE = "inactive"
 
+# sections of graph_traversal timed in the profiling mode
+PROFILE_SECTIONS = ["executability", "execution", "promotion", "candidates", "cost",
+                    "selection", "inverse_mapping", "swap_update", "refill"]
+
+
+def new_traversal_profile():
+    """
+        function to create the profile of a graph traversal (profiling mode)
+            counts : loop iterations, executed gates, inserted swaps,
+                     swap candidates (generated and scored)
+            front_layer, extended_set : sizes summed over the iterations (or the scorings)
+                                        and their maximum
+            time : seconds spent in each section of the traversal loop
+    """
+    return {"traversals": 1,
+            "counts": {"iterations": 0, "gates_executed": 0, "swaps": 0,
+                       "candidates": 0, "candidates_scored": 0},
+            "front_layer": {"total": 0, "max": 0},
+            "extended_set": {"total": 0, "max": 0, "count": 0},
+            "time": {section: 0.0 for section in PROFILE_SECTIONS}}
+
+
+def record_section(profile, section, clock):
+    """
+        function to add the time from the clock to a section of the profile
+        and return the current clock
+    """
+    now = time.perf_counter()
+    profile["time"][section] += now - clock
+    return now
+
+
+def merge_traversal_profiles(total, profile):
+    """
+        function to accumulate the profile of a graph traversal into the total
+    """
+    if total is None:
+        return copy.deepcopy(profile)
+
+    total["traversals"] += profile["traversals"]
+
+    for group in ["counts", "time"]:
+        for key, value in profile[group].items():
+            total[group][key] += value
+
+    for group in ["front_layer", "extended_set"]:
+        for key, value in profile[group].items():
+            if key == "max":
+                total[group][key] = max(total[group][key], value)
+            else:
+                total[group][key] += value
+
+    return total
+
 
 def calculate_nnc_cost(front_layer, distance, qubit_mapping):
     '''
@@ -64,9 +112,10 @@ def calculate_nnc_cost(front_layer, distance, qubit_mapping):
 
 
 def calculate_lap_cost(swap, dag, front_layer, distance, qubit_mapping, list_decay,
-    lap_depth, extended_set_weight):
+    lap_depth, extended_set_weight, profile=None):
     '''
         cost function based on Look-Ahead Ability and Parallelism
+        profile : profile of the traversal to record the size of the extended set (optional)
     '''
     # cost for front layer
     temp_cost_fl = 0
@@ -111,6 +160,11 @@ def calculate_lap_cost(swap, dag, front_layer, distance, qubit_mapping, list_dec
 
         temp_cost_el += distance[associated_physical_ctrl_qubit][associated_physical_trgt_qubit]
 
+    if profile is not None:
+        profile["extended_set"]["total"] += len(extended_set)
+        profile["extended_set"]["max"] = max(profile["extended_set"]["max"], len(extended_set))
+        profile["extended_set"]["count"] += 1
+
     # calculating the cost
     cost = float(temp_cost_fl/len(front_layer))
     # if len(extended_set):
@@ -121,6 +175,439 @@ def calculate_lap_cost(swap, dag, front_layer, distance, qubit_mapping, list_dec
     return cost
 
 
+def initialize_qubit_status(qubit_mapping, qubit_info, qubit_status=None):
+    """
+        function to initialize the status of the qubits (active, inactive)
+        qubit_status : status of the qubits overriding the default, e.g., in a later window
+    """
+    # initialization of qubits' usage status according to the qubits
+    # qubit status change: "inactive" -> "active" by prepare
+    #                      "active" -> "inactive" by measure
+
+    # the data qubits and the magic qubits are so-called data qubits of a logic qubit (magic state)
+    # therefore, the status of each should be active from the beginning
+    table_qubit_status = {}
+    for active_qubit in ["data", "magic"]:
+        if active_qubit not in qubit_info.keys():
+            continue
+
+        table_qubit_status.update(
+            {qubit : FLAG_ACTIVE for qubit in qubit_info[active_qubit]})
+
+    # for other type of qubits such as ancilla, we set its initial usage status as inactive
+    for k in list(qubit_mapping.keys()):
+        if all(label not in k for label in ["data", "magic"]):
+            table_qubit_status.update({k: FLAG_INACTIVE})
+
+    if qubit_status is not None:
+        table_qubit_status.update(qubit_status)
+
+    return table_qubit_status
+
+
+def translate_moveback(dag, position_data_qubits):
+    """
+        function to translate the destination of the moves, written symbolically (-init),
+        to the specific qubit location in the home base of the data qubits
+
+        return: table of the move nodes keyed by the qubit to be moved back
+    """
+    import parse
+
+    table_moveback = {}
+    for i in dag.nodes:
+        if dag.nodes[i]["gate"] in [g.str_move]:
+            # if the trgt is provided symbolically as (-init),
+            # it is translated to a physical specific index
+            # if type(DAG.nodes[i]["trgt"]) == str and "init" in DAG.nodes[i]["trgt"]:
+            if isinstance(dag.nodes[i]["trgt"], str) and "init" in dag.nodes[i]["trgt"]:
+                result = parse.compile("{}-init").parse(dag.nodes[i]["trgt"])
+                if result is None:
+                    dag.nodes[i]["trgt"] = position_data_qubits[dag.nodes[i]["trgt"]]
+                else:
+                    dag.nodes[i]["trgt"] = position_data_qubits[result[0]]
+
+            table_moveback[dag.nodes[i]["ctrl"]] = dag.nodes[i]
+
+    return table_moveback
+
+
+def find_executable_gates(front_layer, qubit_mapping, qchip_data, list_qubits_moved_back):
+    """
+        function to find the executable gates in the front layer
+        a move is executable when the qubit is at its destination, the qubit is recorded
+        in list_qubits_moved_back
+
+        return: list of the executable gates, flag whether a move is in the front layer
+    """
+    flag_move = False
+
+    list_executable_gates = []
+
+    # check the executablity of a quantum gate in terms of the qubit connectivity
+    # find executable gates
+    # the main focus : 2-qubit gate, move, barrier
+    for node in front_layer:
+        if node["gate"] in g.list_one_qubit_gates:
+            list_executable_gates.append(node)
+
+        elif node["gate"] in ["Qubit"]:
+            list_executable_gates.append(node)
+
+        # two-qubit gate
+        elif node["gate"] in [g.str_gate_cnot, g.str_gate_cz, g.str_gate_swap]:
+            ctrl_qubit = node["ctrl"]
+            trgt_qubit = node["trgt"]
+
+            # in case of the 2-qubit gate,
+            # if the qubits ctrl and trgt is located in neighbor, it is executable
+            if qubit_mapping[trgt_qubit] in qchip_data["qubit_connectivity"][
+                qubit_mapping[ctrl_qubit]]:
+                list_executable_gates.append(node)
+
+        # move
+        elif node["gate"] == g.str_move:
+            ctrl_qubit = node["ctrl"]
+            flag_move = True
+
+            # for a move,
+            # the qubit (set as ctrl) should be placed in the destination (set as trgt)
+            if qubit_mapping[ctrl_qubit] == node["trgt"]:
+                list_executable_gates.append(node)
+                list_qubits_moved_back.append(ctrl_qubit)
+
+        # barrier for all qubits (in the paper)
+        # if the remaining nodes in FL are barrier all (actually only one node in FL)
+        elif node["gate"] == g.str_barrier_all:
+            if all(node["gate"] == g.str_barrier_all for node in front_layer):
+                list_executable_gates.append(node)
+
+        # in the upgraded algorithm,
+        # we treat a selective barrier (blocking subset of qubits not all)
+        # therefore tested enough not yet..
+
+        # selective barrier 가 실행 가능한 경우:
+        # "barrier a,b,c" 경우, FL 내부에 큐빗 a, b, c 에 동작하는 명령이 없는 경우 가능함
+        # 먼저, 0) FL 내 나 혼자 남았으면, 실행 가능
+        # 따라서, 1) barrier 에서 locked 큐빗을 확인하고,
+        # 2) FL 내 모든 노드(양자명령)이 동작하는 큐빗 목록을 확인함
+        # 만약, 3) 두 노드 셋이 교집합이 empty이면, 해당 barrier 실행 가능함
+        elif node["gate"] == g.str_barrier:
+            continue
+
+    return list_executable_gates, flag_move
+
+
+def apply_gate_status(node, table_qubit_status, traversal_direction):
+    """
+        function to update the status of the qubit by a preparation or a measurement
+        forward : activated by a preparation, inactivated by a measurement
+        backward : inactivated by a preparation, activated by a measurement
+    """
+    if node["gate"] in [g.str_gate_prepz, g.str_gate_prepx]:
+        if traversal_direction == "forward":
+            table_qubit_status[node["trgt"]] = FLAG_ACTIVE
+
+        elif traversal_direction == "backward":
+            table_qubit_status[node["trgt"]] = FLAG_INACTIVE
+
+    elif node["gate"] in [g.str_gate_measz, g.str_gate_measx]:
+        if traversal_direction == "forward":
+            table_qubit_status[node["trgt"]] = FLAG_INACTIVE
+
+        elif traversal_direction == "backward":
+            table_qubit_status[node["trgt"]] = FLAG_ACTIVE
+
+
+def get_syscode_instruction(node, qubit_mapping):
+    """
+        function to translate an executed node to the instruction of the system code
+        according to the quantum gate, the format is little different
+
+        return: instruction (None for a selective barrier)
+    """
+    if node["gate"] in g.list_one_qubit_gates:
+        # measurement
+        if node["gate"] in [g.str_gate_measz, g.str_gate_measx]:
+            # in case where the classical bit is not provided
+            try:
+                list_command = [node["gate"],
+                                qubit_mapping[node["trgt"]],
+                                node["cbit"]]
+
+            except KeyError:
+                list_command = [node["gate"], qubit_mapping[node["trgt"]]]
+
+            return list_command
+
+        # rotational gate
+        elif node["gate"] in [g.str_gate_rz]:
+            return [node["gate"], node["angle"], qubit_mapping[node["trgt"]]]
+
+        # other H, Pauli, T, Tdag gates
+        else:
+            return [node["gate"], qubit_mapping[node["trgt"]]]
+
+    # two qubit gates
+    elif node["gate"] in [g.str_gate_cnot, g.str_gate_swap, g.str_gate_cz]:
+        return [node["gate"], qubit_mapping[node["ctrl"]], qubit_mapping[node["trgt"]]]
+
+    # barrier : need to display barrier-all to partition the circuit
+    elif node["gate"] == g.str_barrier_all:
+        return [node["gate"]]
+
+    # selective barrier statement to block a subset of all qubits
+    return None
+
+
+def place_ready_node(node, front_layer, list_for_moveback, list_for_barrier):
+    """
+        function to place a node whose preceding nodes are all executed
+        a move is kept in list_for_moveback and a node following a barrier-all in FL is
+        kept in list_for_barrier, otherwise it is pulled into FL
+    """
+    if node["gate"] == g.str_move:
+        list_for_moveback.append(node)
+
+    else:
+        # if the barrier statement is in FL,
+        # the following instruction is appened in the list
+        # list_for_barrier not FL
+
+        if g.str_barrier_all in [temp_node["gate"]
+                                 for temp_node in front_layer]:
+            list_for_barrier["all"].append(node)
+
+        # 후속 노드가 barrier 이면,
+        # 해당 barrier 에 의해 대기가 걸리는 큐빗에 동작하는 연산 노드가 FL 에 없으면, FL 에 추가 가능
+        elif node["gate"] == g.str_barrier:
+            return
+
+        # 현재 FL 에 selective barrier 가 포함되어 있고,
+        # j의 대상 큐빗이 해당 barrier 에 의해 locked 큐빗에 속하면 list_for_barrier[key] 에 포함,
+        # 아니며, FL 에 포함
+        elif g.str_barrier in [temp_node["gate"] for temp_node in front_layer]:
+            return
+
+        else:
+            # 삭제된 양자 명령의 후속이 일반 양자 게이트이면, FL 에 추가
+            front_layer.append(node)
+
+
+def collect_swap_candidates(front_layer, qubit_mapping, inverse_mapping, table_qubit_status,
+    qchip_data, traversal_direction, count_data_interaction, number_allowable_data_interaction):
+    """
+        function to obtain swap candidate gates working fault tolerantly
+        the candidates : inactivated qubits, activate qubit and inactivated qubit,
+                         activated qubits under the bound of the interaction between them
+    """
+    list_swap_candidates = []
+    # pass the barrier statement
+    # for forward direction: include moveback
+    # for backward direction: not include moveback
+    for node in front_layer:
+        if node["gate"] in [g.str_barrier_all, g.str_barrier]:
+            continue
+
+        if traversal_direction == "backward" and node["gate"] == g.str_move:
+            continue
+
+        # for 2-qubit gates (CNOT, CZ, SWAP, CX etc.),
+        # swap based on both the ctrl and trgt qubits
+        # for move, swap based on both the ctrl is included.
+        #           in case of trgt, it is limitedly included
+        if node["gate"] in [g.str_gate_cnot, g.str_gate_swap, g.str_gate_cz]:
+            ctrl_qubit = node["ctrl"]
+            trgt_qubit = node["trgt"]
+
+            associated_physical_ctrl_qubit = qubit_mapping[ctrl_qubit]
+            associated_physical_trgt_qubit = qubit_mapping[trgt_qubit]
+
+        elif node["gate"] == g.str_move:
+            ctrl_qubit = node["ctrl"]
+            trgt_qubit = node["trgt"]
+
+            associated_physical_ctrl_qubit = qubit_mapping[ctrl_qubit]
+            associated_physical_trgt_qubit = trgt_qubit
+
+        # in case of inactive qubit, it can be used as a communication channel
+        if table_qubit_status[ctrl_qubit] != FLAG_ACTIVE:
+            temp_swaps = [(ctrl_qubit, inverse_mapping[j])
+                          for j in qchip_data["qubit_connectivity"].get(
+                            associated_physical_ctrl_qubit)]
+
+            list_swap_candidates.extend(temp_swaps)
+
+        # the active data qubit,
+        # swap can be included based on the status of its neighbor qubits
+        else:
+            for j in qchip_data["qubit_connectivity"][associated_physical_ctrl_qubit]:
+                # if neighbor is inactive status, swap is included
+                if table_qubit_status.get(inverse_mapping[j]) != FLAG_ACTIVE:
+                    list_swap_candidates.append((ctrl_qubit, inverse_mapping[j]))
+
+                # if neighbor is in activated, then
+                else:
+                    # condition 1: swap is possible based on the predefined the bound
+                    # for the interaction between activated qubits
+                    # if the current counter < bound
+                    if count_data_interaction < number_allowable_data_interaction:
+                        list_swap_candidates.append((ctrl_qubit, inverse_mapping[j]))
+
+                    # condition 2: neighbor and its neighbor (2nd level)
+                    temp_swaps = [(inverse_mapping[j], inverse_mapping[neighbor])
+                                  for neighbor in qchip_data["qubit_connectivity"][j]
+                                  if table_qubit_status.get(
+                                    inverse_mapping[neighbor]) != FLAG_ACTIVE]
+
+                    list_swap_candidates.extend(temp_swaps)
+
+        # for target qubit
+        if node["gate"] not in [g.str_move]:
+            # if trgt is inactivated, it can be used as a communication channel
+            if table_qubit_status.get(trgt_qubit) != FLAG_ACTIVE:
+                temp_swaps = [(trgt_qubit, inverse_mapping[j])
+                            for j in qchip_data["qubit_connectivity"].get(
+                                associated_physical_trgt_qubit)]
+
+                list_swap_candidates.extend(temp_swaps)
+
+            # if trgt data qubit in activated status,
+            # then the swap is possible based on the status of its neighbor qubit
+            else:
+                for j in qchip_data["qubit_connectivity"][associated_physical_trgt_qubit]:
+
+                    # if neighbor is inactivated, swap is included
+                    if table_qubit_status.get(inverse_mapping[j]) != FLAG_ACTIVE:
+                        list_swap_candidates.append((trgt_qubit, inverse_mapping[j]))
+
+                    # if neighbor is in activated, then
+                    else:
+                        # condition 1: swap is possible based on the predefined the bound
+                        # for the interaction between activated qubits
+                        # if the current counter < bound
+                        if count_data_interaction < number_allowable_data_interaction:
+                            list_swap_candidates.append((trgt_qubit, inverse_mapping[j]))
+
+                        # condition 2: neighbor and its neighbor (2nd level)
+                        temp_swaps = [(inverse_mapping[j], inverse_mapping[neighbor])
+                                      for neighbor in qchip_data["qubit_connectivity"][j]
+                                      if table_qubit_status.get(
+                                        inverse_mapping[neighbor]) != FLAG_ACTIVE]
+
+                        list_swap_candidates.extend(temp_swaps)
+
+        # for move, it the quantum state stays at trgt is ancilla (not data and magic),
+        # it is possible to perform a swap based on the qubit
+        else:
+            if "data" not in inverse_mapping[trgt_qubit] and \
+                "magic" not in inverse_mapping[trgt_qubit]:
+                temp_swaps = [(inverse_mapping[trgt_qubit], inverse_mapping[j])
+                                for j in qchip_data["qubit_connectivity"][trgt_qubit]
+                                if table_qubit_status.get(
+                                    inverse_mapping[j]) != FLAG_ACTIVE]
+
+                list_swap_candidates.extend(temp_swaps)
+
+        # checkup if swap acting on both activated qubits is included
+        for swap in list_swap_candidates:
+            if all("dummy" in qubit for qubit in [swap[0], swap[1]]):
+                del swap
+                continue
+
+            if qubit_mapping[swap[0]] not in \
+                qchip_data["qubit_connectivity"][qubit_mapping[swap[1]]]:
+                raise Exception(f"error happend. they are not adjacent. {swap}")
+
+            if count_data_interaction > number_allowable_data_interaction:
+                if any ("dummy" not in qubit for qubit in [swap[0], swap[1]]):
+                    raise Exception(f"error happend. both qubits are data type. {swap}")
+
+    return list_swap_candidates
+
+
+def evaluate_swap_candidates(list_swap_candidates, dag, front_layer, distancematrix,
+    qubit_mapping, list_decay, **kwargs):
+    """
+        function to evaluate the cost (lap or nnc) of the swap candidate gates
+
+        kwargs:
+            cost: cost function (lap or nnc)
+            decay, lap_depth, extended_set_weight: parameters of the lap cost
+            profile: profile of the traversal (optional)
+
+        return: cost of each swap candidate
+    """
+    cost_function = kwargs.get("cost")
+    decay = kwargs.get("decay")
+    lap_depth = kwargs.get("lap_depth")
+    extended_set_weight = kwargs.get("extended_set_weight")
+    profile = kwargs.get("profile")
+
+    cost = {}
+
+    # cost function : lap
+    if cost_function == "lap":
+        decay_factor = 1 + decay
+        for swap in list_swap_candidates:
+            qubit_mapping[swap[0]], qubit_mapping[swap[1]] =\
+                qubit_mapping[swap[1]], qubit_mapping[swap[0]]
+
+            list_decay[swap[0]] += decay_factor
+            list_decay[swap[1]] += decay_factor
+
+            cost[swap] = calculate_lap_cost(
+                swap, dag, front_layer, distancematrix, qubit_mapping, list_decay,
+                    lap_depth, extended_set_weight, profile=profile)
+
+            list_decay[swap[0]] -= decay_factor
+            list_decay[swap[1]] -= decay_factor
+
+            qubit_mapping[swap[0]], qubit_mapping[swap[1]] =\
+                qubit_mapping[swap[1]], qubit_mapping[swap[0]]
+
+    # cost function : nnc
+    elif cost_function == "nnc":
+        for swap in list_swap_candidates:
+            qubit_mapping[swap[0]], qubit_mapping[swap[1]] =\
+                qubit_mapping[swap[1]], qubit_mapping[swap[0]]
+
+            cost[swap] = calculate_nnc_cost(front_layer, distancematrix, qubit_mapping)
+
+            qubit_mapping[swap[0]], qubit_mapping[swap[1]] =\
+                qubit_mapping[swap[1]], qubit_mapping[swap[0]]
+
+    return cost
+
+
+def record_swap_interaction(swap, interactions, table_qubit_status):
+    """
+        function to count the swap by the type of the qubits
+
+        return: True if the swap acts on both the active data qubits
+    """
+    # to check the type of quantum state
+    name_qubit1, name_qubit2 = swap[0:2]
+
+    while name_qubit1[-1].isdigit():
+        name_qubit1 = name_qubit1[:-1]
+
+    while name_qubit2[-1].isdigit():
+        name_qubit2 = name_qubit2[:-1]
+
+    interactions[(name_qubit1, name_qubit2)]+=1
+
+    # 두 큐빗이 데이터 류이고, active 상태에 있는 큐빗들간의 SWAP 이면
+    # increment count_data_interaction by 1
+    condition_a = "dummy" not in name_qubit1 and \
+                 table_qubit_status[swap[0]] == FLAG_ACTIVE
+
+    condition_b = "dummy" not in name_qubit2 and \
+                 table_qubit_status[swap[1]] == FLAG_ACTIVE
+
+    return condition_a and condition_b
+
+
 def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data, **kwargs):
     '''
 
@@ -130,12 +617,40 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
             DAG: directed acyclic graph from algorithm
             FL: front layer from DAG
             MT: random qubit mapping table
+            profile: profile (new_traversal_profile) filled in the profiling mode (optional)
+            packed_syscode: the syscode is written into the columnar arrays (formatconversion)
+                            instead of a list (default : False)
+            qubit_status: status of the qubits at the beginning, e.g., the ancilla qubits
+                          prepared in a previous window (default : the data and magic qubits
+                          are active, the others inactive)
+            router: router of the traversal writing the circuit, greedy or beam
+                    (default : greedy, see beam_traversal)
+            beam_width: width of the beam for the router beam (default : 4)
     '''
+    import numpy as np
+
+    g.ensure_globals()
+
+    # the traversal writing the circuit can be routed by the beam search over the swaps
+    if kwargs.get("router") == "beam" and kwargs.get("write_syscode"):
+        return beam_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
+                              **kwargs)
 
     # reset the seed for random number for every traversal to keep the random
     np.random.seed(datetime.now().microsecond%10)
 
-    list_syscode_commands = []
+    # the syscode packed in the columnar arrays (memory-lean mode, shared memory transport)
+    # (the time index of a row is its position in the order of writing)
+    flag_packed_syscode = kwargs.get("packed_syscode")
+    if flag_packed_syscode:
+        list_syscode_commands = formatconversion.new_columnar_syscode()
+
+        def write_syscode(inst):
+            formatconversion.append_columnar_instruction(
+                list_syscode_commands, len(list_syscode_commands["time"]), inst)
+    else:
+        list_syscode_commands = []
+        write_syscode = list_syscode_commands.append
 
     # user's selection for cost function (default : nnc)
     cost_function = kwargs.get("cost")
@@ -172,24 +687,11 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
     # type of the qubits employed in the protocol
     qubit_info = kwargs.get("qubit_info")
 
-    # initialization of qubits' usage status according to the qubits
-    # qubit status change: "inactive" -> "active" by prepare
-    #                      "active" -> "inactive" by measure
-
-    # the data qubits and the magic qubits are so-called data qubits of a logic qubit (magic state)
-    # therefore, the status of each should be active from the beginning
-    table_qubit_status = {}
-    for active_qubit in ["data", "magic"]:
-        if active_qubit not in qubit_info.keys():
-            continue
-
-        table_qubit_status.update(
-            {qubit : FLAG_ACTIVE for qubit in qubit_info[active_qubit]})
+    # profile of the traversal (None : profiling mode off)
+    profile = kwargs.get("profile")
 
-    # for other type of qubits such as ancilla, we set its initial usage status as inactive
-    for k in list(qubit_mapping.keys()):
-        if all(label not in k for label in ["data", "magic"]):
-            table_qubit_status.update({k: FLAG_INACTIVE})
+    table_qubit_status = initialize_qubit_status(qubit_mapping, qubit_info,
+                                                 kwargs.get("qubit_status"))
 
     # inverse of qubit mapping
     inverse_mapping = {v: k for k, v in qubit_mapping.items()}
@@ -209,34 +711,8 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
     # for the forward graph traversal, the moveback should be conducted
     # for the moveback, ctrl qubit is needed to go to the trgt position
     table_moveback = {}
-
-    # for move operation,
-    # translat the destination written symbolically to the specific qubit location
     if traversal_direction == "forward":
-        for i in dag.nodes:
-            if dag.nodes[i]["gate"] in [g.str_move]:
-                # if the trgt is provided symbolically as (-init),
-                # it is translated to a physical specific index
-                # if type(DAG.nodes[i]["trgt"]) == str and "init" in DAG.nodes[i]["trgt"]:
-                if isinstance(dag.nodes[i]["trgt"], str) and "init" in dag.nodes[i]["trgt"]:
-                    result = parse.compile("{}-init").parse(dag.nodes[i]["trgt"])
-                    if result is None:
-                        dag.nodes[i]["trgt"] = position_data_qubits[dag.nodes[i]["trgt"]]
-                    else:
-                        dag.nodes[i]["trgt"] = position_data_qubits[result[0]]
-
-                table_moveback[dag.nodes[i]["ctrl"]] = dag.nodes[i]
-
-        # for fl_node in front_layer:
-        # 	if fl_node["gate"] in [g.str_move]:
-        # 		if type(fl_node["trgt"]) == str and "init" in fl_node["trgt"]:
-        # 			result = parse.compile("{}-init").parse(fl_node["trgt"])
-        # 			if result is None:
-        # 				fl_node["trgt"] = position_data_qubits[fl_node["ctrl"]]
-        # 			else:
-        # 				fl_node["trgt"] = position_data_qubits[result[0]]
-
-        # 		table_moveback[fl_node["ctrl"]] = fl_node
+        table_moveback = translate_moveback(dag, position_data_qubits)
 
     flag_moveback = False
 
@@ -252,60 +728,20 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
 
     # while len(FL):
     while front_layer:
-        list_executable_gates = []
+        if profile is not None:
+            profile["counts"]["iterations"] += 1
+            profile["front_layer"]["total"] += len(front_layer)
+            profile["front_layer"]["max"] = max(profile["front_layer"]["max"], len(front_layer))
+            clock = time.perf_counter()
+
         # 1. checking the executability of a quantum gate in the front layer
         # 	 if yes, it is added to list_executable_gates
+        list_executable_gates, flag_move = find_executable_gates(
+            front_layer, qubit_mapping, qchip_data, list_qubits_moved_back)
+        flag_moveback = flag_moveback or flag_move
 
-        # check the executablity of a quantum gate in terms of the qubit connectivity
-        # find executable gates
-        # the main focus : 2-qubit gate, move, barrier
-        for node in front_layer:
-            if node["gate"] in g.list_one_qubit_gates:
-                list_executable_gates.append(node)
-
-            elif node["gate"] in ["Qubit"]:
-                list_executable_gates.append(node)
-
-            # two-qubit gate
-            elif node["gate"] in [g.str_gate_cnot, g.str_gate_cz, g.str_gate_swap]:
-                ctrl_qubit = node["ctrl"]
-                trgt_qubit = node["trgt"]
-
-                # in case of the 2-qubit gate,
-                # if the qubits ctrl and trgt is located in neighbor, it is executable
-                if qubit_mapping[trgt_qubit] in qchip_data["qubit_connectivity"][
-                    qubit_mapping[ctrl_qubit]]:
-                    list_executable_gates.append(node)
-
-            # move
-            elif node["gate"] == g.str_move:
-                ctrl_qubit = node["ctrl"]
-                flag_moveback = True
-
-                # for a move,
-                # the qubit (set as ctrl) should be placed in the destination (set as trgt)
-                if qubit_mapping[ctrl_qubit] == node["trgt"]:
-                    list_executable_gates.append(node)
-                    list_qubits_moved_back.append(ctrl_qubit)
-
-            # barrier for all qubits (in the paper)
-            # if the remaining nodes in FL are barrier all (actually only one node in FL)
-            elif node["gate"] == g.str_barrier_all:
-                if all(node["gate"] == g.str_barrier_all for node in front_layer):
-                    list_executable_gates.append(node)
-
-            # in the upgraded algorithm,
-            # we treat a selective barrier (blocking subset of qubits not all)
-            # therefore tested enough not yet..
-
-            # selective barrier 가 실행 가능한 경우:
-            # "barrier a,b,c" 경우, FL 내부에 큐빗 a, b, c 에 동작하는 명령이 없는 경우 가능함
-            # 먼저, 0) FL 내 나 혼자 남았으면, 실행 가능
-            # 따라서, 1) barrier 에서 locked 큐빗을 확인하고,
-            # 2) FL 내 모든 노드(양자명령)이 동작하는 큐빗 목록을 확인함
-            # 만약, 3) 두 노드 셋이 교집합이 empty이면, 해당 barrier 실행 가능함
-            elif node["gate"] == g.str_barrier:
-                continue
+        if profile is not None:
+            clock = record_section(profile, "executability", clock)
 
         # 2. if list_executable_gates is not empty,
         #	1) delete a gate from front layer
@@ -324,6 +760,9 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
         # 	   pull it to FL
         # if len(list_executable_gates):
         if list_executable_gates:
+            if profile is not None:
+                profile["counts"]["gates_executed"] += len(list_executable_gates)
+
             for node in list_executable_gates:
                 # update status of ancilla qubits (syndrome, syndrome verification qubits)
                 # in the forward traversal,
@@ -333,19 +772,7 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
                 # in the backward traversal,
                 # by measurement it becomes as activated and
                 # by preparation it becomes as inactivated
-                if node["gate"] in [g.str_gate_prepz, g.str_gate_prepx]:
-                    if traversal_direction == "forward":
-                        table_qubit_status[node["trgt"]] = FLAG_ACTIVE
-
-                    elif traversal_direction == "backward":
-                        table_qubit_status[node["trgt"]] = FLAG_INACTIVE
-
-                elif node["gate"] in [g.str_gate_measz, g.str_gate_measx]:
-                    if traversal_direction == "forward":
-                        table_qubit_status[node["trgt"]] = FLAG_INACTIVE
-
-                    elif traversal_direction == "backward":
-                        table_qubit_status[node["trgt"]] = FLAG_ACTIVE
+                apply_gate_status(node, table_qubit_status, traversal_direction)
 
                 # By running a "barrier" statement,
                 # we move the elements held in the list_for_barrier to FL
@@ -353,7 +780,7 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
                 # As mentioned above,
                 # the list list_for_barrier keeps the quantum gates
                 # that should be executed after the barrier statement forcibly
-                elif node["gate"] == g.str_barrier_all:
+                if node["gate"] == g.str_barrier_all:
                     list_instructions = list_for_barrier.get("all")
 
                     if list_instructions is not None:
@@ -364,49 +791,11 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
                 # the following part deals with it, but not tested enough
                 elif node["gate"] == g.str_barrier:
                     continue
-
                 # flag writing a circuit on a text file
-                # according to the quantum gate, the format is little different
-
                 if flag_write_syscode:
-                    if node["gate"] in g.list_one_qubit_gates:
-                        # measurement
-                        if node["gate"] in [g.str_gate_measz, g.str_gate_measx]:
-                            # in case where the classical bit is not provided
-                            try:
-                                list_command = [node["gate"],
-                                                qubit_mapping[node["trgt"]],
-                                                node["cbit"]]
-
-                            except KeyError:
-                                list_command = [node["gate"], qubit_mapping[node["trgt"]]]
-
-                            list_syscode_commands.append(list_command)
-
-                        # rotational gate
-                        elif node["gate"] in [g.str_gate_rz]:
-                            list_syscode_commands.append([node["gate"],
-                                                          node["angle"],
-                                                          qubit_mapping[node["trgt"]]])
-
-                        # other H, Pauli, T, Tdag gates
-                        else:
-                            list_syscode_commands.append([node["gate"],
-                                                          qubit_mapping[node["trgt"]]])
-
-                    # two qubit gates
-                    elif node["gate"] in [g.str_gate_cnot, g.str_gate_swap, g.str_gate_cz]:
-                        list_syscode_commands.append([node["gate"],
-                                                      qubit_mapping[node["ctrl"]],
-                                                      qubit_mapping[node["trgt"]]])
-
-                    # barrier : need to display barrier-all to partition the circuit
-                    elif node["gate"] == g.str_barrier_all:
-                        list_syscode_commands.append([node["gate"]])
-
-                    # selective barrier statement to block a subset of all qubits
-                    elif node["gate"] == g.str_barrier:
-                        continue
+                    inst = get_syscode_instruction(node, qubit_mapping)
+                    if inst is not None:
+                        write_syscode(inst)
 
                 # delete a gate that is executable
                 front_layer.remove(node)
@@ -414,6 +803,9 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
                 # to check the logical dependency later
                 list_executed_nodes.add(node["id"])
 
+                if profile is not None:
+                    clock = record_section(profile, "execution", clock)
+
                 # to check the succeeding nodes with respect to the current executable node
                 # for succeeding nodes with respect to the current executable node
                 for j in dag.successors(node["id"]):
@@ -430,32 +822,11 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
                     if ancestors.issubset(list_executed_nodes):
                         # if the succeeding gate is move, then it is kept in list_for_moveback
                         # not for FL
-                        if dag.nodes[j]["gate"] == g.str_move:
-                            list_for_moveback.append(dag.nodes[j])
-
-                        else:
-                            # if the barrier statement is in FL,
-                            # the following instruction is appened in the list
-                            # list_for_barrier not FL
-
-                            if g.str_barrier_all in [temp_node["gate"]
-                                                     for temp_node in front_layer]:
-                                list_for_barrier["all"].append(dag.nodes[j])
+                        place_ready_node(dag.nodes[j], front_layer, list_for_moveback,
+                                         list_for_barrier)
 
-                            # 후속 노드가 barrier 이면,
-                            # 해당 barrier 에 의해 대기가 걸리는 큐빗에 동작하는 연산 노드가 FL 에 없으면, FL 에 추가 가능
-                            elif dag.nodes[j]["gate"] == g.str_barrier:
-                                continue
-
-                            # 현재 FL 에 selective barrier 가 포함되어 있고,
-                            # j의 대상 큐빗이 해당 barrier 에 의해 locked 큐빗에 속하면 list_for_barrier[key] 에 포함,
-                            # 아니며, FL 에 포함
-                            elif g.str_barrier in [temp_node["gate"] for temp_node in front_layer]:
-                                continue
-
-                            else:
-                                # 삭제된 양자 명령의 후속이 일반 양자 게이트이면, FL 에 추가
-                                front_layer.append(dag.nodes[j])
+                if profile is not None:
+                    clock = record_section(profile, "promotion", clock)
 
         # 3. if list_executable_gates is empty : collect swap candidates
         #	1) initialize the data structure "score"
@@ -468,164 +839,25 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
         #	4) pick an optimal (minimal cost) one
         #	5) update the qubit mapping based on the chosen one
         else:
-            # function to obtain swap candidate gates working fault tolerantly
-            list_swap_candidates = []
-            # pass the barrier statement
-            # for forward direction: include moveback
-            # for backward direction: not include moveback
-            for node in front_layer:
-                if node["gate"] in [g.str_barrier_all, g.str_barrier]:
-                    continue
-
-                if traversal_direction == "backward" and node["gate"] == g.str_move:
-                    continue
-
-                # for 2-qubit gates (CNOT, CZ, SWAP, CX etc.),
-                # swap based on both the ctrl and trgt qubits
-                # for move, swap based on both the ctrl is included.
-                #           in case of trgt, it is limitedly included
-                if node["gate"] in [g.str_gate_cnot, g.str_gate_swap, g.str_gate_cz]:
-                    ctrl_qubit = node["ctrl"]
-                    trgt_qubit = node["trgt"]
-
-                    associated_physical_ctrl_qubit = qubit_mapping[ctrl_qubit]
-                    associated_physical_trgt_qubit = qubit_mapping[trgt_qubit]
-
-                elif node["gate"] == g.str_move:
-                    ctrl_qubit = node["ctrl"]
-                    trgt_qubit = node["trgt"]
-
-                    associated_physical_ctrl_qubit = qubit_mapping[ctrl_qubit]
-                    associated_physical_trgt_qubit = trgt_qubit
-
-                # in case of inactive qubit, it can be used as a communication channel
-                if table_qubit_status[ctrl_qubit] != FLAG_ACTIVE:
-                    temp_swaps = [(ctrl_qubit, inverse_mapping[j])
-                                  for j in qchip_data["qubit_connectivity"].get(
-                                    associated_physical_ctrl_qubit)]
-
-                    list_swap_candidates.extend(temp_swaps)
-
-                # the active data qubit,
-                # swap can be included based on the status of its neighbor qubits
-                else:
-                    for j in qchip_data["qubit_connectivity"][associated_physical_ctrl_qubit]:
-                        # if neighbor is inactive status, swap is included
-                        if table_qubit_status.get(inverse_mapping[j]) != FLAG_ACTIVE:
-                            list_swap_candidates.append((ctrl_qubit, inverse_mapping[j]))
-
-                        # if neighbor is in activated, then
-                        else:
-                            # condition 1: swap is possible based on the predefined the bound
-                            # for the interaction between activated qubits
-                            # if the current counter < bound
-                            if count_data_interaction < number_allowable_data_interaction:
-                                list_swap_candidates.append((ctrl_qubit, inverse_mapping[j]))
-
-                            # condition 2: neighbor and its neighbor (2nd level)
-                            temp_swaps = [(inverse_mapping[j], inverse_mapping[neighbor])
-                                          for neighbor in qchip_data["qubit_connectivity"][j]
-                                          if table_qubit_status.get(
-                                            inverse_mapping[neighbor]) != FLAG_ACTIVE]
-
-                            list_swap_candidates.extend(temp_swaps)
-
-                # for target qubit
-                if node["gate"] not in [g.str_move]:
-                    # if trgt is inactivated, it can be used as a communication channel
-                    if table_qubit_status.get(trgt_qubit) != FLAG_ACTIVE:
-                        temp_swaps = [(trgt_qubit, inverse_mapping[j])
-                                    for j in qchip_data["qubit_connectivity"].get(
-                                        associated_physical_trgt_qubit)]
-
-                        list_swap_candidates.extend(temp_swaps)
-
-                    # if trgt data qubit in activated status,
-                    # then the swap is possible based on the status of its neighbor qubit
-                    else:
-                        for j in qchip_data["qubit_connectivity"][associated_physical_trgt_qubit]:
-
-                            # if neighbor is inactivated, swap is included
-                            if table_qubit_status.get(inverse_mapping[j]) != FLAG_ACTIVE:
-                                list_swap_candidates.append((trgt_qubit, inverse_mapping[j]))
-
-                            # if neighbor is in activated, then
-                            else:
-                                # condition 1: swap is possible based on the predefined the bound
-                                # for the interaction between activated qubits
-                                # if the current counter < bound
-                                if count_data_interaction < number_allowable_data_interaction:
-                                    list_swap_candidates.append((trgt_qubit, inverse_mapping[j]))
-
-                                # condition 2: neighbor and its neighbor (2nd level)
-                                temp_swaps = [(inverse_mapping[j], inverse_mapping[neighbor])
-                                              for neighbor in qchip_data["qubit_connectivity"][j]
-                                              if table_qubit_status.get(
-                                                inverse_mapping[neighbor]) != FLAG_ACTIVE]
-
-                                list_swap_candidates.extend(temp_swaps)
-
-                # for move, it the quantum state stays at trgt is ancilla (not data and magic),
-                # it is possible to perform a swap based on the qubit
-                else:
-                    if "data" not in inverse_mapping[trgt_qubit] and \
-                        "magic" not in inverse_mapping[trgt_qubit]:
-                        temp_swaps = [(inverse_mapping[trgt_qubit], inverse_mapping[j])
-                                        for j in qchip_data["qubit_connectivity"][trgt_qubit]
-                                        if table_qubit_status.get(
-                                            inverse_mapping[j]) != FLAG_ACTIVE]
-
-                        list_swap_candidates.extend(temp_swaps)
-
-                # checkup if swap acting on both activated qubits is included
-                for swap in list_swap_candidates:
-                    if all("dummy" in qubit for qubit in [swap[0], swap[1]]):
-                        del swap
-                        continue
-
-                    if qubit_mapping[swap[0]] not in \
-                        qchip_data["qubit_connectivity"][qubit_mapping[swap[1]]]:
-                        raise Exception(f"error happend. they are not adjacent. {swap}")
+            list_swap_candidates = collect_swap_candidates(
+                front_layer, qubit_mapping, inverse_mapping, table_qubit_status, qchip_data,
+                traversal_direction, count_data_interaction, number_allowable_data_interaction)
 
-                    if count_data_interaction > number_allowable_data_interaction:
-                        if any ("dummy" not in qubit for qubit in [swap[0], swap[1]]):
-                            raise Exception(f"error happend. both qubits are data type. {swap}")
+            if profile is not None:
+                profile["counts"]["candidates"] += len(list_swap_candidates)
+                clock = record_section(profile, "candidates", clock)
 
             # evaluating the swap candidate gates
             # if len(list_swap_candidates):
             if list_swap_candidates:
-                cost = {}
+                cost = evaluate_swap_candidates(
+                    list_swap_candidates, dag, front_layer, distancematrix, qubit_mapping,
+                    list_decay, cost=cost_function, decay=decay, lap_depth=lap_depth,
+                    extended_set_weight=extended_set_weight, profile=profile)
 
-                # cost function : lap
-                if cost_function == "lap":
-                    decay_factor = 1 + decay
-                    for swap in list_swap_candidates:
-                        qubit_mapping[swap[0]], qubit_mapping[swap[1]] =\
-                            qubit_mapping[swap[1]], qubit_mapping[swap[0]]
-
-                        list_decay[swap[0]] += decay_factor
-                        list_decay[swap[1]] += decay_factor
-
-                        cost[swap] = calculate_lap_cost(
-                            swap, dag, front_layer, distancematrix, qubit_mapping, list_decay,
-                                lap_depth, extended_set_weight)
-
-                        list_decay[swap[0]] -= decay_factor
-                        list_decay[swap[1]] -= decay_factor
-
-                        qubit_mapping[swap[0]], qubit_mapping[swap[1]] =\
-                            qubit_mapping[swap[1]], qubit_mapping[swap[0]]
-
-                # cost function : nnc
-                elif cost_function == "nnc":
-                    for swap in list_swap_candidates:
-                        qubit_mapping[swap[0]], qubit_mapping[swap[1]] =\
-                            qubit_mapping[swap[1]], qubit_mapping[swap[0]]
-
-                        cost[swap] = calculate_nnc_cost(front_layer, distancematrix, qubit_mapping)
-
-                        qubit_mapping[swap[0]], qubit_mapping[swap[1]] =\
-                            qubit_mapping[swap[1]], qubit_mapping[swap[0]]
+                if profile is not None:
+                    profile["counts"]["candidates_scored"] += len(cost)
+                    clock = record_section(profile, "cost", clock)
 
                 # picking an optimal one
                 best_swap = min(cost, key=cost.get)
@@ -654,28 +886,18 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
                 qubit_mapping[best_swap[0]], qubit_mapping[best_swap[1]] =\
                     qubit_mapping[best_swap[1]], qubit_mapping[best_swap[0]]
 
-                inverse_mapping = {v: k for k, v in qubit_mapping.items()}
-
-                # to check the type of quantum state
-                name_qubit1, name_qubit2 = best_swap[0:2]
+                if profile is not None:
+                    profile["counts"]["swaps"] += 1
+                    clock = record_section(profile, "selection", clock)
 
-                while name_qubit1[-1].isdigit():
-                    name_qubit1 = name_qubit1[:-1]
-
-                while name_qubit2[-1].isdigit():
-                    name_qubit2 = name_qubit2[:-1]
+                inverse_mapping = {v: k for k, v in qubit_mapping.items()}
 
-                interactions[(name_qubit1, name_qubit2)]+=1
+                if profile is not None:
+                    clock = record_section(profile, "inverse_mapping", clock)
 
                 # 두 큐빗이 데이터 류이고, active 상태에 있는 큐빗들간의 SWAP 이면
                 # increment count_data_interaction by 1
-                condition_a = "dummy" not in name_qubit1 and \
-                             table_qubit_status[best_swap[0]] == FLAG_ACTIVE
-
-                condition_b = "dummy" not in name_qubit2 and \
-                             table_qubit_status[best_swap[1]] == FLAG_ACTIVE
-
-                if condition_a and condition_b:
+                if record_swap_interaction(best_swap, interactions, table_qubit_status):
                     count_data_interaction += 1
 
                 # if the amount of the swaps acting on both the data qubits is
@@ -684,58 +906,412 @@ def graph_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data,
                     raise Exception(f"""The number of mutual data interactions reaches to the limit:
                                     -> {count_data_interaction} and {number_allowable_data_interaction}""")
 
-                previous_best_swap = best_swap
+                previous_best_swap = best_swap
+
+                # writing the circuit
+                if flag_write_syscode:
+                    # update qubit mapping by performing the best SWAP
+                    # to run the system code, it is written with the qubit index
+                    # not the algorithm qubit name
+                    # therefore, the algorithm qubit is mapped to the qubit index
+                    # through the qubit mapping table, MT
+                    if flag_swap:
+                        write_syscode(
+                            [g.str_gate_swap,
+                             qubit_mapping[best_swap[0]], qubit_mapping[best_swap[1]]])
+                    # else:
+                    # 	# swap a, b -> CNOT a, b / CNOT b, a / CNOT a, b
+                    # 	list_syscode_commands.append(
+                    #       [g.str_gate_cnot,
+                    #        qubit_mapping[best_swap[0]], qubit_mapping[best_swap[1]]])
+
+                    # 	list_syscode_commands.append(
+                    #       [g.str_gate_cnot,
+                    #        qubit_mapping[best_swap[1]], qubit_mapping[best_swap[0]]])
+
+                    # 	list_syscode_commands.append(
+                    #       [g.str_gate_cnot,
+                    #        qubit_mapping[best_swap[0]], qubit_mapping[best_swap[1]]])
+
+                if profile is not None:
+                    clock = record_section(profile, "swap_update", clock)
+
+        # after all the gates in FL are performed,
+        # if list_for_moveback is not empty, move the elements in the list to FL
+        # if not len(FL):
+        if len(front_layer) == 0:
+            for k, list_item in list_for_barrier.items():
+                if list_item:
+                    front_layer.extend(list_item)
+                    list_for_barrier[k] = []
+
+            # if not len(FL) and len(list_for_moveback):
+            if len(front_layer) == 0 and list_for_moveback:
+                front_layer.extend(list_for_moveback)
+                list_for_moveback = []
+
+        if profile is not None:
+            record_section(profile, "refill", clock)
+
+    # check all the data qubits moved their homebase
+    if flag_moveback:
+        position_data_qubits_after = {key: value for key, value in qubit_mapping.items()
+                                        if "data" in key}
+
+        if not set(position_data_qubits_after.items()).issubset(set(position_data_qubits.items())):
+            raise Exception("""The positions of data qubits
+                            before and after the mapping is not the same.""")
+
+    if flag_write_syscode:
+        return list_syscode_commands, interactions
+
+    return interactions
+
+
+def calculate_lookahead_distance(dag, front_layer, distance, qubit_mapping, lap_depth,
+    extended_set_weight):
+    """
+        function to estimate the swaps still needed from a state of the beam search
+        the excess distance (beyond the adjacency) of the 2-qubit gates and the moves in FL
+        plus the weighted excess distance in the extended set ahead of FL
+    """
+    temp_cost_fl = 0
+    temp_cost_el = 0
+
+    extended_set = set()
+    for node in front_layer:
+        if node["gate"] in [g.str_gate_cnot, g.str_gate_cz, g.str_gate_swap]:
+            temp_cost_fl += distance[qubit_mapping[node["ctrl"]]][qubit_mapping[node["trgt"]]] - 1
+
+        elif node["gate"] == g.str_move:
+            temp_cost_fl += distance[qubit_mapping[node["ctrl"]]][node["trgt"]]
+
+        else:
+            continue
+
+        extended_set.update(DirectedAcyclicGraph.get_children_from_node(dag, node, lap_depth))
+
+    for j in extended_set:
+        node = dag.nodes[j]
+        if node["gate"] in [g.str_gate_cnot, g.str_gate_cz, g.str_gate_swap]:
+            temp_cost_el += distance[qubit_mapping[node["ctrl"]]][qubit_mapping[node["trgt"]]] - 1
+
+    return temp_cost_fl + extended_set_weight * temp_cost_el
+
+
+def beam_traversal(dag, front_layer, qubit_mapping, distancematrix, qchip_data, **kwargs):
+    '''
+        beam search over the swap decisions (router "beam") for the forward traversal writing
+        the circuit, instead of the greedy choice of the best swap in graph_traversal
+
+        the beam keeps the beam_width partial solutions (states) of the least cost,
+        i.e., the swaps inserted so far plus the look-ahead distance (calculate_lookahead_distance)
+        each state is expanded by its beam_width best swap candidates (cost function of the
+        greedy router), and then the gates executable after the swap are executed at once
+        the search ends when a state executes all the gates
+
+        a child shares the circuit written before the branching (prefix) with its parent and
+        the other children, it copies only the small part of the state
+        (mapping, status, front layer, the counters of the executed predecessors)
+
+        args: as graph_traversal
+            beam_width: width of the beam (default : 4)
+        return: syscode, interactions (qubit_mapping is updated to the final mapping)
+    '''
+    # the syscode packed in the columnar arrays (memory-lean mode, shared memory transport)
+    flag_packed_syscode = kwargs.get("packed_syscode")
+    if flag_packed_syscode:
+        list_syscode_commands = formatconversion.new_columnar_syscode()
+
+        def write_syscode(inst):
+            formatconversion.append_columnar_instruction(
+                list_syscode_commands, len(list_syscode_commands["time"]), inst)
+    else:
+        list_syscode_commands = []
+        write_syscode = list_syscode_commands.append
+
+    cost_function = kwargs.get("cost")
+    if cost_function is None:
+        cost_function = "nnc"
+
+    flag_swap = kwargs.get("allow_swap")
+    if flag_swap is None:
+        flag_swap = False
+
+    decay = kwargs.get("decay")
+    if decay is None:
+        decay = 0
+
+    lap_depth = kwargs.get("lap_depth")
+    if lap_depth is None:
+        lap_depth = 1
+
+    extended_set_weight = kwargs.get("extended_set_weight")
+    if extended_set_weight is None:
+        extended_set_weight = 0.5
+
+    beam_width = kwargs.get("beam_width")
+    if beam_width is None:
+        beam_width = 4
+    beam_width = max(int(beam_width), 1)
+
+    position_data_qubits = kwargs.get("position_data_qubits")
+
+    number_allowable_data_interaction = kwargs.get("allowable_data_interaction")
+    if number_allowable_data_interaction is not None:
+        number_allowable_data_interaction = int(number_allowable_data_interaction)
+    else:
+        number_allowable_data_interaction = 0
+
+    profile = kwargs.get("profile")
+
+    table_moveback = translate_moveback(dag, position_data_qubits)
+
+    # the syscode of a state : chain of the segments written before the branchings
+    # (parent chain, segment) and its own segment
+    root = {"front_layer": list(front_layer),
+            "mapping": dict(qubit_mapping),
+            "status": initialize_qubit_status(qubit_mapping, kwargs.get("qubit_info"),
+                                              kwargs.get("qubit_status")),
+            "decay": collections.defaultdict(int),
+            "pending": {},
+            "moved_back": [],
+            "for_moveback": [],
+            "for_barrier": collections.defaultdict(list),
+            "interactions": collections.defaultdict(int),
+            "count_data_interaction": 0,
+            "flag_moveback": False,
+            "previous_swap": None,
+            "executed": 0,
+            "swaps": 0,
+            "chain": None,
+            "segment": []}
+
+    def advance(state):
+        """
+            function to execute the executable gates of a state until a swap is needed
+            return: True if all the gates are executed
+        """
+        front = state["front_layer"]
+
+        while True:
+            # after all the gates in FL are performed, the delayed gates are pulled into FL
+            if not front:
+                for k, list_item in state["for_barrier"].items():
+                    if list_item:
+                        front.extend(list_item)
+                        state["for_barrier"][k] = []
+
+                if not front and state["for_moveback"]:
+                    front.extend(state["for_moveback"])
+                    state["for_moveback"] = []
+
+                if not front:
+                    return True
+
+            list_executable_gates, flag_move = find_executable_gates(
+                front, state["mapping"], qchip_data, state["moved_back"])
+            state["flag_moveback"] = state["flag_moveback"] or flag_move
+
+            if not list_executable_gates:
+                return False
+
+            if profile is not None:
+                profile["counts"]["gates_executed"] += len(list_executable_gates)
+
+            for node in list_executable_gates:
+                apply_gate_status(node, state["status"], "forward")
+
+                if node["gate"] == g.str_barrier_all:
+                    front.extend(state["for_barrier"]["all"])
+                    state["for_barrier"]["all"] = []
+
+                elif node["gate"] == g.str_barrier:
+                    continue
+
+                inst = get_syscode_instruction(node, state["mapping"])
+                if inst is not None:
+                    state["segment"].append(inst)
+
+                front.remove(node)
+                state["executed"] += 1
+
+                # a succeeding node is ready when all its preceding nodes are executed
+                for j in dag.successors(node["id"]):
+                    count = state["pending"].pop(j, 0) + 1
+                    if count < dag.in_degree(j):
+                        state["pending"][j] = count
+                    else:
+                        place_ready_node(dag.nodes[j], front, state["for_moveback"],
+                                         state["for_barrier"])
+
+    def expand(state):
+        """
+            function to branch a state by its best swap candidates
+        """
+        mapping = state["mapping"]
+        inverse_mapping = {v: k for k, v in mapping.items()}
+
+        list_swap_candidates = collect_swap_candidates(
+            state["front_layer"], mapping, inverse_mapping, state["status"], qchip_data,
+            "forward", state["count_data_interaction"], number_allowable_data_interaction)
+
+        cost = evaluate_swap_candidates(
+            list(dict.fromkeys(list_swap_candidates)), dag, state["front_layer"],
+            distancematrix, mapping, state["decay"], cost=cost_function, decay=decay,
+            lap_depth=lap_depth, extended_set_weight=extended_set_weight)
+
+        if profile is not None:
+            profile["counts"]["candidates"] += len(list_swap_candidates)
+            profile["counts"]["candidates_scored"] += len(cost)
+
+        # the swap just performed is not undone at once (as the greedy router)
+        if len(cost) > 1:
+            cost.pop(state["previous_swap"], None)
+
+        list_children = []
+        for swap in sorted(cost, key=cost.get)[:beam_width]:
+            child = {"front_layer": list(state["front_layer"]),
+                     "mapping": dict(mapping),
+                     "status": dict(state["status"]),
+                     "decay": state["decay"].copy(),
+                     "pending": dict(state["pending"]),
+                     "moved_back": list(state["moved_back"]),
+                     "for_moveback": list(state["for_moveback"]),
+                     "for_barrier": collections.defaultdict(
+                         list, {k: list(v) for k, v in state["for_barrier"].items()}),
+                     "interactions": state["interactions"].copy(),
+                     "count_data_interaction": state["count_data_interaction"],
+                     "flag_moveback": state["flag_moveback"],
+                     "previous_swap": swap,
+                     "executed": state["executed"],
+                     "swaps": state["swaps"] + 1,
+                     "chain": (state["chain"], state["segment"]),
+                     "segment": []}
+
+            # tag if the qubit of the swap is one that should be moved back to home
+            for qubit in swap:
+                if qubit in child["moved_back"]:
+                    child["for_moveback"].append(table_moveback[qubit])
+
+            child["decay"][swap[0]] += (1+decay)
+            child["decay"][swap[1]] += (1+decay)
+
+            child["mapping"][swap[0]], child["mapping"][swap[1]] =\
+                child["mapping"][swap[1]], child["mapping"][swap[0]]
+
+            if record_swap_interaction(swap, child["interactions"], child["status"]):
+                child["count_data_interaction"] += 1
+
+                # the branch exceeding the bound of the mutual data interactions is pruned
+                if child["count_data_interaction"] > number_allowable_data_interaction:
+                    continue
+
+            if flag_swap:
+                child["segment"].append([g.str_gate_swap,
+                                         child["mapping"][swap[0]], child["mapping"][swap[1]]])
+
+            list_children.append(child)
+
+        return list_children
+
+    def is_home(state):
+        """
+            function to check all the data qubits moved back to their homebase
+        """
+        if not state["flag_moveback"]:
+            return True
+
+        position_data_qubits_after = {key: value for key, value in state["mapping"].items()
+                                      if "data" in key}
+        return set(position_data_qubits_after.items()).issubset(
+            set(position_data_qubits.items()))
+
+    list_finished = [root] if advance(root) else []
+    beam = [root]
+
+    # the states visited since the last progress of the beam
+    progress = root["executed"]
+    set_visited = set()
+
+    while not list_finished:
+        if profile is not None:
+            profile["counts"]["iterations"] += 1
+            profile["front_layer"]["total"] += sum(len(state["front_layer"]) for state in beam)
+            profile["front_layer"]["max"] = max([profile["front_layer"]["max"]] +
+                                                [len(state["front_layer"]) for state in beam])
+            clock = time.perf_counter()
+
+        list_children = []
+        for state in beam:
+            list_children.extend(expand(state))
+
+        if profile is not None:
+            clock = record_section(profile, "candidates", clock)
+
+        if not list_children:
+            raise Exception("Error ! No swap candidate remains in the beam search.")
+
+        list_finished = [child for child in list_children if advance(child)]
+
+        if profile is not None:
+            clock = record_section(profile, "execution", clock)
+
+        # the children reaching a mapping visited after the same progress are dropped
+        # (otherwise the beam may circulate among a few mappings without executing any gate)
+        table_children = {}
+        for child in list_children:
+            key = hash((child["executed"], frozenset(child["mapping"].items())))
+            if key in set_visited or key in table_children:
+                continue
+
+            child["score"] = child["swaps"] + calculate_lookahead_distance(
+                dag, child["front_layer"], distancematrix, child["mapping"], lap_depth,
+                extended_set_weight)
+            table_children[key] = child
 
-                # writing the circuit
-                if flag_write_syscode:
-                    # update qubit mapping by performing the best SWAP
-                    # to run the system code, it is written with the qubit index
-                    # not the algorithm qubit name
-                    # therefore, the algorithm qubit is mapped to the qubit index
-                    # through the qubit mapping table, MT
-                    if flag_swap:
-                        list_syscode_commands.append(
-                            [g.str_gate_swap,
-                             qubit_mapping[best_swap[0]], qubit_mapping[best_swap[1]]])
-                    # else:
-                    # 	# swap a, b -> CNOT a, b / CNOT b, a / CNOT a, b
-                    # 	list_syscode_commands.append(
-                    #       [g.str_gate_cnot,
-                    #        qubit_mapping[best_swap[0]], qubit_mapping[best_swap[1]]])
+        if not table_children:
+            raise Exception("Error ! No unvisited state remains in the beam search.")
 
-                    # 	list_syscode_commands.append(
-                    #       [g.str_gate_cnot,
-                    #        qubit_mapping[best_swap[1]], qubit_mapping[best_swap[0]]])
+        # the states of the most progress (executed gates) are kept first,
+        # a state behind is not comparable by the look-ahead distance (its next gates are
+        # not in its front layer yet)
+        beam = sorted(table_children.values(),
+                      key=lambda state: (-state["executed"], state["score"]))[:beam_width]
 
-                    # 	list_syscode_commands.append(
-                    #       [g.str_gate_cnot,
-                    #        qubit_mapping[best_swap[0]], qubit_mapping[best_swap[1]]])
+        if beam[0]["executed"] > progress:
+            progress = beam[0]["executed"]
+            set_visited = set()
 
-        # after all the gates in FL are performed,
-        # if list_for_moveback is not empty, move the elements in the list to FL
-        # if not len(FL):
-        if len(front_layer) == 0:
-            for k, list_item in list_for_barrier.items():
-                if list_item:
-                    front_layer.extend(list_item)
-                    list_for_barrier[k] = []
+        set_visited.update(key for key, child in table_children.items() if child in beam)
 
-            # if not len(FL) and len(list_for_moveback):
-            if len(front_layer) == 0 and list_for_moveback:
-                front_layer.extend(list_for_moveback)
-                list_for_moveback = []
+        if profile is not None:
+            record_section(profile, "selection", clock)
 
-    # check all the data qubits moved their homebase
-    if flag_moveback:
-        position_data_qubits_after = {key: value for key, value in qubit_mapping.items()
-                                        if "data" in key}
+    list_finished = [state for state in list_finished if is_home(state)]
+    if not list_finished:
+        raise Exception("""The positions of data qubits
+                        before and after the mapping is not the same.""")
 
-        if not set(position_data_qubits_after.items()).issubset(set(position_data_qubits.items())):
-            raise Exception("""The positions of data qubits
-                            before and after the mapping is not the same.""")
+    final = list_finished[0]
 
-    if flag_write_syscode:
-        return list_syscode_commands, interactions
+    if profile is not None:
+        profile["counts"]["swaps"] += final["swaps"]
+
+    # the syscode is written by following the chain of the segments back to the root
+    list_segments = [final["segment"]]
+    chain = final["chain"]
+    while chain is not None:
+        chain, segment = chain
+        list_segments.append(segment)
+
+    for segment in reversed(list_segments):
+        for inst in segment:
+            write_syscode(inst)
+
+    qubit_mapping.update(final["mapping"])
+
+    return list_syscode_commands, final["interactions"]
 
 
 def manage_graph_traversal_as_process(args, conn):
@@ -744,6 +1320,9 @@ def manage_graph_traversal_as_process(args, conn):
         this is because we need to count the time flow and
         stop if the execution time exceeds the time limit
     """
+    # the data in shared memory blocks are attached (transport "shared_memory")
+    attachment = sharedtransport.attach_arguments(args)
+    args = attachment["arguments"]
 
     flag_write_syscode = args.get("write_syscode")
     qubit_mapping = args.get("qubit_mapping")
@@ -754,6 +1333,10 @@ def manage_graph_traversal_as_process(args, conn):
     else:
         position_data_qubits = homebase
 
+    # in the profiling mode, the profile of the traversal is sent at the end of the message
+    profile = new_traversal_profile() if args.get("profile") else None
+    list_profile = [profile] if profile is not None else []
+
     if flag_write_syscode:
         # for the last forward traversal
         list_syscode_commands, interactions = graph_traversal(
@@ -771,13 +1354,20 @@ def manage_graph_traversal_as_process(args, conn):
             allow_swap=args.get("allow_swap"),
             position_data_qubits=position_data_qubits,
             direction=args.get("direction"),
-            allowable_data_interaction=args.get("allowable_data_interaction"))
+            allowable_data_interaction=args.get("allowable_data_interaction"),
+            profile=profile,
+            packed_syscode=args.get("packed_syscode"),
+            qubit_status=args.get("qubit_status"),
+            router=args.get("router"),
+            beam_width=args.get("beam_width"))
 
-        conn.send([list_syscode_commands, interactions, qubit_mapping])
+        conn.send([list_syscode_commands, interactions, qubit_mapping] + list_profile)
+        sharedtransport.detach_arguments(attachment)
 
     else:
         # for the first forward and second backward traversals
-        graph_traversal(args.get("DAG"),
+        # (the number of the swaps is sent for the SABRE rounds)
+        interactions = graph_traversal(args.get("DAG"),
             args.get("FL"),
             qubit_mapping,
             args.get("DM"),
@@ -791,15 +1381,26 @@ def manage_graph_traversal_as_process(args, conn):
             allow_swap=args["allow_swap"],
             position_data_qubits=position_data_qubits,
             direction=args.get("direction"),
-            allowable_data_interaction=args["allowable_data_interaction"])
+            allowable_data_interaction=args["allowable_data_interaction"],
+            profile=profile,
+            packed_syscode=args.get("packed_syscode"),
+            qubit_status=args.get("qubit_status"))
 
-        conn.send([qubit_mapping])
+        conn.send([qubit_mapping, sum(interactions.values())] + list_profile)
+        sharedtransport.detach_arguments(attachment)
 
 
 def manage_forward_traversal(args, conn):
     '''
         first forward traversal (with random initial mapping) 관리 함수
     '''
+    # package for picking a random qubit mapping (developed by YH)
+    import qubitmapping
+
+    # the data in shared memory blocks are attached (transport "shared_memory")
+    attachment = sharedtransport.attach_arguments(args)
+    args = attachment["arguments"]
+
     qchip_size = len(args["QChip"]["qubit_connectivity"])
 
     list_algorithm_qubits = []
@@ -813,11 +1414,17 @@ def manage_forward_traversal(args, conn):
     #     flag_write_syscode = False
 
     # fixed_qubit
-    qubit_mapping = qubitmapping.initialize_qubit_mapping(list_algorithm_qubits,
-                        qchip_size,
-                        option=args["initial_mapping_option"],
-                        fixed_qubits=args["initial_mapping"],
-                        period=args.get("period"))
+    # the random initial mapping is reproducible with a seed (offset of qubitmapping)
+    # a placement optimized in advance is taken as it is (initial_mapping_option "annealing")
+    if args.get("placement") is not None:
+        qubit_mapping = dict(args["placement"])
+    else:
+        qubit_mapping = qubitmapping.initialize_qubit_mapping(list_algorithm_qubits,
+                            qchip_size,
+                            option=args["initial_mapping_option"],
+                            fixed_qubits=args["initial_mapping"],
+                            period=args.get("period"),
+                            offset=args.get("seed"))
 
     # 데이터 큐빗의 위치
     # homebase : 프로토콜 수행 후 데이터 큐빗이 위치해야 하는 곳
@@ -829,6 +1436,10 @@ def manage_forward_traversal(args, conn):
     else:
         position_data_qubits = homebase
 
+    # in the profiling mode, the profile of the traversal is sent at the end of the message
+    profile = new_traversal_profile() if args.get("profile") else None
+    list_profile = [profile] if profile is not None else []
+
     if flag_write_syscode:
         initial_mapping = copy.deepcopy(qubit_mapping)
         list_syscode_commands, interactions = graph_traversal(
@@ -843,12 +1454,19 @@ def manage_forward_traversal(args, conn):
             allow_swap=args["allow_swap"],
             position_data_qubits=position_data_qubits,
             direction="forward",
-            allowable_data_interaction=args["allowable_data_interaction"])
+            allowable_data_interaction=args["allowable_data_interaction"],
+            profile=profile,
+            packed_syscode=args.get("packed_syscode"),
+            qubit_status=args.get("qubit_status"),
+            router=args.get("router"),
+            beam_width=args.get("beam_width"))
 
-        conn.send([list_syscode_commands, interactions, initial_mapping, qubit_mapping])
+        conn.send([list_syscode_commands, interactions, initial_mapping, qubit_mapping] +
+                  list_profile)
+        sharedtransport.detach_arguments(attachment)
 
     else:
-        graph_traversal(args["DAG"], args["FL"], qubit_mapping,
+        interactions = graph_traversal(args["DAG"], args["FL"], qubit_mapping,
                 args["DM"], args["QChip"],
                 qubit_info=args["qubit_info"],
                 cost=args["cost"],
@@ -859,15 +1477,631 @@ def manage_forward_traversal(args, conn):
                 allow_swap=args["allow_swap"],
                 position_data_qubits=position_data_qubits,
                 direction="forward",
-                allowable_data_interaction=args["allowable_data_interaction"])
+                allowable_data_interaction=args["allowable_data_interaction"],
+                profile=profile,
+                packed_syscode=args.get("packed_syscode"),
+                qubit_status=args.get("qubit_status"))
+
+        conn.send([qubit_mapping, sum(interactions.values())] + list_profile)
+        sharedtransport.detach_arguments(attachment)
+
+
+def prepare_qchip(qchip, **kwargs):
+    """
+        function to prepare a quantum chip for the synthesis :
+            the chip (a file path or a chip object) is loaded, its qubit connectivity is keyed
+            by int and its distance matrix is computed once and kept in "distance_matrix"
+
+        the given chip object is not modified, a prepared chip is returned as a (shallow) copy
+        kwargs:
+            distance_matrix: distance matrix computed in advance (optional)
+    """
+    if isinstance(qchip, dict):
+        qchip_data = dict(qchip)
+
+    else:
+        import simplejson as json
+
+        with open(qchip, "r", encoding="utf-8") as infile:
+            qchip_data = json.load(infile)
+
+    # update qubit connectivity (string type -> int type)
+    qchip_data["qubit_connectivity"] = {int(k): v
+        for k, v in qchip_data["qubit_connectivity"].items()}
+
+    distance_matrix = kwargs.get("distance_matrix")
+    if distance_matrix is not None:
+        qchip_data["distance_matrix"] = distance_matrix
+
+    # computing the distance matrix from qchip_data
+    if qchip_data.get("distance_matrix") is None:
+        qchip_data["distance_matrix"], _ = DM.generateDM(qchip_data, "distance")
+
+    return qchip_data
+
+
+def prepare_protocol(protocol):
+    """
+        function to prepare a protocol (qasm) for the synthesis :
+            {"qasm_commands", "algorithm_qubits", "cnot_counts"}
+
+        the protocol is given as a file path, a qasm text (str with lines or list of lines),
+        or a protocol prepared already (returned as it is)
+    """
+    if isinstance(protocol, dict):
+        return protocol
+
+    if isinstance(protocol, str) and "\n" not in protocol:
+        list_qasm_commands, list_algorithm_qubits, cnot_counts =\
+            SABRE_utility.analyze_qasm(protocol)
+    else:
+        list_qasm_commands, list_algorithm_qubits, cnot_counts =\
+            SABRE_utility.analyze_qasm_lines(protocol)
+
+    return {"qasm_commands": list_qasm_commands,
+            "algorithm_qubits": list_algorithm_qubits,
+            "cnot_counts": cnot_counts}
+
+
+def split_protocol_windows(list_qasm_commands, **kwargs):
+    """
+        function to split the qasm commands into the windows delimited by Barrier-All
+        (segmented synthesis) : a window ends with its Barrier-All, and the declarations
+        stay in the window where they are
+
+        kwargs:
+            window_size: the minimum number of the gates of a window, a smaller window is
+                         merged into the following one (default : 1)
+    """
+    window_size = kwargs.get("window_size")
+    if window_size is None:
+        window_size = 1
+
+    list_windows = []
+    window = []
+    number_gates = 0
+
+    for command in list_qasm_commands:
+        window.append(command)
+
+        if command[0] in ["Qubit", "Cbit"]:
+            continue
+
+        if command[0] == g.str_barrier_all:
+            if number_gates >= window_size:
+                list_windows.append(window)
+                window = []
+                number_gates = 0
+
+        else:
+            number_gates += 1
+
+    # the commands after the last window boundary
+    if window:
+        if list_windows and number_gates < window_size:
+            list_windows[-1].extend(window)
+        else:
+            list_windows.append(window)
+
+    return list_windows
+
+
+def update_qubit_status(qubit_status, window):
+    """
+        function to return the status of the qubits (active, inactive) after a window
+        in the forward direction : activated by a preparation, inactivated by a measurement
+    """
+    qubit_status = dict(qubit_status)
+
+    for command in window:
+        if command[0] in [g.str_gate_prepz, g.str_gate_prepx]:
+            qubit_status[command[1]] = FLAG_ACTIVE
+
+        elif command[0] in [g.str_gate_measz, g.str_gate_measx]:
+            qubit_status[command[1]] = FLAG_INACTIVE
+
+    return qubit_status
+
+
+def run_traversal_process(target, args, **kwargs):
+    """
+        function to run a traversal (manage_forward_traversal, manage_graph_traversal_as_process)
+        as a separate process
+        the message is awaited within the time limit, so that the process sending a large
+        message is not killed while its message waits to be read
+
+        kwargs:
+            time_limit: time limit in seconds (default : None, no limit)
+
+        the process is started by the start method of the arguments ("start_method")
+
+        return: the message of the traversal, None if it is killed or it failed
+    """
+    import multiprocessing
+
+    time_limit = kwargs.get("time_limit")
+
+    context = multiprocessing.get_context(args.get("start_method"))
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    proc = context.Process(target=target, args=(args, child_conn))
+    proc.start()
+
+    # the parent does not keep the sending end, a failed process ends the waiting (EOF)
+    child_conn.close()
+
+    message = None
+    if parent_conn.poll(time_limit):
+        try:
+            message = parent_conn.recv()
+        except EOFError:
+            message = None
+
+    if message is None and proc.is_alive():
+        proc.terminate()
+
+    proc.join()
+    parent_conn.close()
+
+    return message
+
+
+def refine_sabre_rounds(qubit_mapping, cost, forward_arguments, backward_arguments, **kwargs):
+    """
+        function to repeat the SABRE rounds (a forward and a backward traversal, both without
+        writing the circuit) from the mapping of the first round, so that only the last forward
+        traversal of a trial writes the circuit
+        the rounds stop when the mapping repeats or the swaps of a round do not decrease,
+        and the mapping of the least swaps is returned
+
+        args:
+            qubit_mapping: the mapping after the first round (backward traversal)
+            cost: the number of the swaps of the first round
+            forward_arguments, backward_arguments: the arguments of the traversals
+                                                   (the mapping is set for each round)
+
+        kwargs:
+            rounds: the number of the rounds including the first one (default : 1)
+            time_limit: time limit of a traversal in seconds (default : None, no limit)
+            listeners: listeners of the events (see synthesisevents)
+            trial: the index of the trial (for the events)
+            window: the index of the window (segmented synthesis, for the events)
+            traversal_profiles: the profiles per phase, updated in the profiling mode
+
+        return: {"mapping", "cost", "rounds", "killed"}
+    """
+    rounds = kwargs.get("rounds")
+    if rounds is None:
+        rounds = 1
+
+    time_limit = kwargs.get("time_limit")
+    listeners = kwargs.get("listeners")
+    traversal_profiles = kwargs.get("traversal_profiles")
+
+    # the window is attached to the events in the segmented synthesis
+    event_items = {"trial": kwargs.get("trial")}
+    if kwargs.get("window") is not None:
+        event_items["window"] = kwargs.get("window")
+
+    best = {"mapping": qubit_mapping, "cost": cost, "rounds": 1, "killed": 0}
+    set_mappings = {frozenset(qubit_mapping.items())}
+    flag_converged = False
+
+    for round_index in range(1, rounds):
+        round_cost = 0
+
+        for phase, arguments in [("forward", forward_arguments), ("backward", backward_arguments)]:
+            args = dict(arguments, qubit_mapping=qubit_mapping)
+            if phase == "forward":
+                args["position_data_qubits"] = {key: value for key, value in qubit_mapping.items()
+                                                if "data" in key}
+
+            stopwatch = synthesisevents.start_stopwatch()
+            message = run_traversal_process(manage_graph_traversal_as_process, args,
+                                            time_limit=time_limit)
+
+            if message is None:
+                best["killed"] += 1
+                synthesisevents.emit(listeners, "trial_killed", phase=phase, round=round_index,
+                                     time_limit=time_limit, **event_items,
+                                     **synthesisevents.read_stopwatch(stopwatch))
+                break
+
+            synthesisevents.emit(listeners, phase, round=round_index, **event_items,
+                                 **synthesisevents.read_stopwatch(stopwatch))
+
+            if args.get("profile") and traversal_profiles is not None:
+                traversal_profiles[phase] = merge_traversal_profiles(
+                    traversal_profiles.get(phase), message[-1])
+
+            qubit_mapping, round_cost = message[0], round_cost + message[1]
+
+        # a round killed by the time limit ends the rounds (the best mapping is kept)
+        if message is None:
+            break
+
+        key = frozenset(qubit_mapping.items())
+        if key in set_mappings or round_cost >= best["cost"]:
+            flag_converged = True
+            break
+
+        set_mappings.add(key)
+        best.update({"mapping": qubit_mapping, "cost": round_cost, "rounds": round_index + 1})
+
+    synthesisevents.emit(listeners, "rounds", rounds=best["rounds"], cost=best["cost"],
+                         converged=flag_converged, **event_items)
+
+    return best
+
+
+def get_write_time_limit(time_limit, arguments):
+    """
+        function to return the time limit of the traversal writing the circuit
+        the beam search (router beam) expands beam_width states at each step,
+        so that it is given beam_width times the time limit of the greedy traversal
+    """
+    if arguments.get("router") == "beam":
+        return time_limit * arguments["beam_width"]
+
+    return time_limit
+
+
+def synthesize_windows(list_windows, arguments, **kwargs):
+    """
+        function to route the windows of a protocol (split_protocol_windows) in turn,
+        carrying the qubit mapping across the windows (segmented synthesis)
+
+        the first window is searched by the trials of forward-backward-forward traversals
+        (or forward only with the given initial mapping), and the next windows are routed by
+        the forward traversal from the final mapping of each candidate, so that the swaps of
+        the stitched circuit carry the initial mapping to the final mapping
+        the candidates (circuits up to the current window) are kept by their cost up to
+        window_beam, and the circuit of the best candidate is stitched at the end
+
+        a traversal is limited by the number of the cnot gates of its window (in seconds),
+        the killed trials count in the budget of the window, and a window without any
+        candidate is searched once again by iteration starts (from the best candidate)
+        no traversal starts after the time budget, and the synthesis fails if a window
+        is left without any candidate
+
+        args:
+            list_windows: the windows of the qasm commands (the moveback in the last window)
+            arguments: the arguments for the graph traversals (see synthesize)
+
+        kwargs:
+            iteration: the number of the trials for the first window (default : 10)
+            window_beam: the number of the candidates kept over the windows (default : 3)
+            optimal_criterion: circuit_depth or number_gates (default : circuit_depth)
+            initial_mapping: the initial mapping is given (forward traversal only)
+            seed: seed of the random initial mappings (see synthesize)
+            memory_lean: the DAGs of the windows in the compact form (default : False)
+            listeners: listeners of the events (see synthesisevents)
+            traversal_profiles: the profiles per phase, updated in the profiling mode
+            placements: the initial placements of the first attempts (default : None)
+            sabre_rounds: the number of the SABRE rounds for the first window (default : 1)
+            time_budget: time budget of the windows in seconds (default : None, no budget)
+
+        return:
+            {"syscode", "initial_mapping", "final_mapping", "interactions", "cost",
+             "trials", "killed"}
+    """
+    import depth_analysis
+
+    iteration = kwargs.get("iteration")
+    if iteration is None:
+        iteration = 10
+
+    window_beam = kwargs.get("window_beam")
+    if window_beam is None:
+        window_beam = 3
+
+    optimal_criterion = kwargs.get("optimal_criterion")
+    if optimal_criterion is None:
+        optimal_criterion = "circuit_depth"
+
+    flag_initial_mapping = bool(kwargs.get("initial_mapping"))
+    seed = kwargs.get("seed")
+    flag_memory_lean = bool(kwargs.get("memory_lean"))
+    listeners = kwargs.get("listeners")
+
+    traversal_profiles = kwargs.get("traversal_profiles")
+    if traversal_profiles is None:
+        traversal_profiles = {}
+
+    list_placements = kwargs.get("placements")
+    if list_placements is None:
+        list_placements = []
+
+    sabre_rounds = kwargs.get("sabre_rounds")
+    if sabre_rounds is None:
+        sabre_rounds = 1
+
+    time_budget = kwargs.get("time_budget")
+    budget_stopwatch = synthesisevents.start_stopwatch()
+
+    def is_budget_spent():
+        return time_budget is not None and\
+            synthesisevents.read_stopwatch(budget_stopwatch)["wall"] >= time_budget
+
+    # the status of the qubits at the beginning of the protocol
+    qubit_info = arguments["qubit_info"]
+    qubit_status = {}
+    for qubit_type, list_qubits in qubit_info.items():
+        status = FLAG_ACTIVE if qubit_type in ["data", "magic"] else FLAG_INACTIVE
+        qubit_status.update({qubit: status for qubit in list_qubits})
+
+    counters = {"trials": 0, "killed": 0, "attempts": 0}
+
+    def run_phase(target, args, phase, window_index, time_limit):
+        stopwatch = synthesisevents.start_stopwatch()
+        message = run_traversal_process(target, args, time_limit=time_limit)
+
+        if message is None:
+            counters["killed"] += 1
+            synthesisevents.emit(listeners, "trial_killed", trial=counters["trials"],
+                                 window=window_index, phase=phase, time_limit=time_limit,
+                                 **synthesisevents.read_stopwatch(stopwatch))
+            return None
+
+        synthesisevents.emit(listeners, phase, trial=counters["trials"], window=window_index,
+                             **synthesisevents.read_stopwatch(stopwatch))
+
+        if arguments.get("profile"):
+            traversal_profiles[phase] = merge_traversal_profiles(traversal_profiles.get(phase),
+                                                                 message[-1])
+        return message
+
+    def new_candidate(parent, list_syscode_commands, interactions, final_mapping):
+        # the syscode packed in the columnar arrays is restored
+        if arguments.get("packed_syscode"):
+            list_syscode_commands = formatconversion.restore_syscode(list_syscode_commands)
+
+        list_syscode_commands = formatconversion.cancel_redundancy(list_syscode_commands)
+
+        if optimal_criterion == "circuit_depth":
+            cost = depth_analysis.evaluate_circuit_depth(list_syscode_commands)
+        else:
+            cost = len(list_syscode_commands)
+
+        synthesisevents.emit(listeners, "trial_done", trial=counters["trials"])
+        counters["trials"] += 1
 
-        conn.send([qubit_mapping])
+        return {"parent": parent,
+                "syscode": list_syscode_commands,
+                "interactions": interactions,
+                "final_mapping": final_mapping,
+                "cost": cost if parent is None else parent["cost"] + cost}
+
+    # the front layer holds the root nodes of the DAG (not copies, the process works on its own),
+    # so that a move node among them is translated with the DAG (e.g., the moveback of a data
+    # qubit idle in the last window)
+    def route_first_window(dag, reverse_dag, status_begin, status_end, time_limit):
+        args = dict(arguments, DAG=dag["DAG"], FL=list(dag["roots"]),
+                    qubit_status=status_begin)
+
+        if seed is not None:
+            args["seed"] = seed + counters["attempts"]
+
+        if counters["attempts"] < len(list_placements):
+            args["placement"] = list_placements[counters["attempts"]]
+        counters["attempts"] += 1
+
+        message = run_phase(manage_forward_traversal, args, "forward", 0,
+                            get_write_time_limit(time_limit, args)
+                            if flag_initial_mapping else time_limit)
+        if message is None:
+            return None
+
+        if flag_initial_mapping:
+            list_syscode_commands, interactions, initial_mapping, final_mapping = message[:4]
+
+        else:
+            # the backward traversal starts with the status at the end of the window
+            forward_swaps = message[1]
+            backward_arguments = dict(arguments, DAG=reverse_dag["DAG"], FL=reverse_dag["roots"],
+                                      qubit_mapping=message[0], write_syscode=False,
+                                      direction="backward", qubit_status=status_end)
+
+            message = run_phase(manage_graph_traversal_as_process, backward_arguments,
+                                "backward", 0, time_limit)
+            if message is None:
+                return None
+
+            qubit_mapping = message[0]
+
+            # the next SABRE rounds from the mapping of the first round
+            if sabre_rounds > 1:
+                refined = refine_sabre_rounds(
+                    qubit_mapping, forward_swaps + message[1],
+                    dict(arguments, DAG=dag["DAG"], FL=list(dag["roots"]), write_syscode=False,
+                         direction="forward", qubit_status=status_begin),
+                    backward_arguments,
+                    rounds=sabre_rounds, time_limit=time_limit, listeners=listeners,
+                    trial=counters["trials"], window=0, traversal_profiles=traversal_profiles)
+
+                qubit_mapping = refined["mapping"]
+                counters["killed"] += refined["killed"]
+
+            initial_mapping = copy.deepcopy(qubit_mapping)
+            args = dict(arguments, DAG=dag["DAG"], FL=list(dag["roots"]),
+                        qubit_mapping=qubit_mapping, write_syscode=True, direction="forward",
+                        position_data_qubits={key: value for key, value in qubit_mapping.items()
+                                              if "data" in key},
+                        qubit_status=status_begin)
+
+            message = run_phase(manage_graph_traversal_as_process, args, "forward_write", 0,
+                                get_write_time_limit(time_limit, args))
+            if message is None:
+                return None
+
+            list_syscode_commands, interactions, final_mapping = message[:3]
+
+        candidate = new_candidate(None, list_syscode_commands, interactions, final_mapping)
+        candidate["initial_mapping"] = initial_mapping
+
+        # the data qubits are moved back to their positions in the initial mapping
+        candidate["position_data_qubits"] = {key: value for key, value in initial_mapping.items()
+                                             if "data" in key}
+        return candidate
+
+    def route_next_window(candidate, window_index, dag, status_begin, time_limit):
+        counters["attempts"] += 1
+
+        args = dict(arguments, DAG=dag["DAG"], FL=list(dag["roots"]),
+                    qubit_mapping=candidate["final_mapping"], write_syscode=True,
+                    direction="forward",
+                    position_data_qubits=candidate["position_data_qubits"],
+                    qubit_status=status_begin)
+
+        message = run_phase(manage_graph_traversal_as_process, args, "forward_write",
+                            window_index, get_write_time_limit(time_limit, args))
+        if message is None:
+            return None
+
+        list_syscode_commands, interactions, final_mapping = message[:3]
+
+        extended = new_candidate(candidate, list_syscode_commands, interactions, final_mapping)
+        extended["position_data_qubits"] = candidate["position_data_qubits"]
+
+        return extended
+
+    synthesisevents.emit(listeners, "synthesis_start", iteration=iteration,
+                         windows=len(list_windows))
+
+    candidates = []
+    for window_index, window in enumerate(list_windows):
+        stopwatch = synthesisevents.start_stopwatch()
+
+        number_cnots = sum(1 for command in window if command[0] == g.str_gate_cnot)
+        time_limit = number_cnots if number_cnots else 10
+
+        status_end = update_qubit_status(qubit_status, window)
+        dag = DirectedAcyclicGraph.createDAG(window, compact=flag_memory_lean)
+
+        if window_index == 0:
+            # the moveback (a protocol of a single window) is not in the backward traversal
+            reverse_dag = DirectedAcyclicGraph.createDAG(
+                reversed([command for command in window if command[0] != g.str_move]),
+                compact=flag_memory_lean)
+
+            for _ in range(iteration):
+                if is_budget_spent():
+                    break
+
+                candidate = route_first_window(dag, reverse_dag, qubit_status, status_end,
+                                               time_limit)
+                if candidate is not None:
+                    candidates.append(candidate)
+
+            for _ in range(0 if candidates else iteration):
+                if is_budget_spent():
+                    break
+
+                candidate = route_first_window(dag, reverse_dag, qubit_status, status_end,
+                                               time_limit)
+                if candidate is not None:
+                    candidates.append(candidate)
+
+        else:
+            list_extended = []
+            for candidate in candidates:
+                if is_budget_spent():
+                    break
+
+                extended = route_next_window(candidate, window_index, dag, qubit_status,
+                                             time_limit)
+                if extended is not None:
+                    list_extended.append(extended)
+
+            # a window killed by the time limit is retried from the best candidate
+            for _ in range(0 if list_extended else iteration):
+                if is_budget_spent():
+                    break
+
+                extended = route_next_window(candidates[0], window_index, dag, qubit_status,
+                                             time_limit)
+                if extended is not None:
+                    list_extended.append(extended)
+
+            candidates = list_extended
+
+        if not candidates:
+            if is_budget_spent():
+                raise Exception(f"Error ! The window {window_index} is not routed within "
+                                f"the time budget ({time_budget} s), the quantum chip may be "
+                                f"infeasible for the protocol.")
+
+            raise Exception(f"Error ! The window {window_index} is not routed.")
+
+        candidates = sorted(candidates, key=lambda candidate: candidate["cost"])[:window_beam]
+        qubit_status = status_end
+
+        synthesisevents.emit(listeners, "window_done", window=window_index,
+                             windows=len(list_windows), candidates=len(candidates),
+                             best_cost=candidates[0]["cost"],
+                             **synthesisevents.read_stopwatch(stopwatch))
+
+    # the circuit of the best candidate is stitched from the first window
+    list_chain = []
+    candidate = candidates[0]
+    while candidate is not None:
+        list_chain.append(candidate)
+        candidate = candidate["parent"]
+    list_chain.reverse()
+
+    list_syscode_commands = [inst for candidate in list_chain for inst in candidate["syscode"]]
+    list_syscode_commands = formatconversion.cancel_redundancy(list_syscode_commands)
+
+    interactions = collections.defaultdict(int)
+    for candidate in list_chain:
+        for key, value in candidate["interactions"].items():
+            interactions[key] += value
+
+    if optimal_criterion == "circuit_depth":
+        cost = depth_analysis.evaluate_circuit_depth(list_syscode_commands)
+    else:
+        cost = len(list_syscode_commands)
+
+    return {"syscode": list_syscode_commands,
+            "initial_mapping": list_chain[0]["initial_mapping"],
+            "final_mapping": list_chain[-1]["final_mapping"],
+            "interactions": interactions,
+            "cost": cost,
+            "trials": counters["trials"],
+            "killed": counters["killed"]}
 
 
 def synthesize(path_qasm, path_qchip, **kwargs):
     """
         function to manage the fault-tolerant quantum circuit synthesis
+        path_qasm : path to the protocol, or the protocol prepared by prepare_protocol
+        path_qchip : path to the quantum chip file, the quantum chip object,
+                     or the chip prepared by prepare_qchip (with its distance matrix)
+
+        kwargs:
+            synthesis_option: options for the synthesis (required)
+            qubit_table: initial mapping (optional)
+            sink: file path or file-like to which the result is streamed (optional)
+            listeners: callables receiving the events of the synthesis (see synthesisevents)
+                       (default : [synthesisevents.console_listener()], [] : no event)
+            traversal_cache: memo table of the traversals shared by the runs in a process
+                             (traversalcache.new_traversal_cache, optional)
     """
+    import multiprocessing
+
+    import parse
+
+    import depth_analysis
+    import traversalcache
+
+    g.ensure_globals()
+
+    # listeners of the events (e.g., the progress bar on the console, metrics)
+    listeners = kwargs.get("listeners")
+    if listeners is None:
+        listeners = [synthesisevents.console_listener()]
+
+    synthesis_stopwatch = synthesisevents.start_stopwatch()
+    peak_memory_start = synthesisevents.get_peak_memory()
 
     # options for the circuit synthesis
     synthesis_option = kwargs.get("synthesis_option")
@@ -903,6 +2137,23 @@ def synthesize(path_qasm, path_qchip, **kwargs):
     else:
         extended_set_weight = 0.5
 
+    # router of the traversal writing the circuit (default : greedy)
+    #   greedy : the swap of the least cost is chosen at each step
+    #   beam : beam search keeping beam_width partial solutions over the swaps
+    #          (see beam_traversal), beam_width (default : 4)
+    router = synthesis_option.get("router")
+    if router is None:
+        router = "greedy"
+
+    if router not in ["greedy", "beam"]:
+        raise Exception(f"Error ! Router {router} is not supported.")
+
+    beam_width = synthesis_option.get("beam_width")
+    if beam_width is not None:
+        beam_width = int(beam_width)
+    else:
+        beam_width = 4
+
     # criterion for optimality of the circuit ()
     # optimal_criterion = {circuit_depth, number_gates}
     optimal_criterion = synthesis_option.get("optimal_criterion")
@@ -915,6 +2166,14 @@ def synthesize(path_qasm, path_qchip, **kwargs):
     if initial_mapping_option is None:
         initial_mapping_option = "random"
 
+    # annealing : the initial placements are optimized over the interaction graph of
+    #   the protocol by the parallel tempering (see placementannealing), and the first trials
+    #   start from the annealing_top_k best placements (default : iteration),
+    #   annealing_chains (default : 8), annealing_steps (default : 2000)
+    #   the attempts after them (e.g., following a killed trial) start from random mappings
+    annealing_option = {key: synthesis_option.get(f"annealing_{key}")
+                        for key in ["top_k", "chains", "steps"]}
+
     # SABRE iteration (default : 10)
     iteration = synthesis_option.get("iteration")
     if iteration is not None:
@@ -922,6 +2181,114 @@ def synthesize(path_qasm, path_qchip, **kwargs):
     else:
         iteration = 10
 
+    # SABRE rounds of a trial (default : 1), a round is a forward and a backward traversal
+    # without writing the circuit, and the rounds stop early when the mapping repeats or
+    # the swaps of a round do not decrease (see refine_sabre_rounds)
+    sabre_rounds = synthesis_option.get("sabre_rounds")
+    if sabre_rounds is not None:
+        sabre_rounds = max(int(sabre_rounds), 1)
+    else:
+        sabre_rounds = 1
+
+    # time budget of the trials (seconds from the start of the synthesis, default : None)
+    #   no trial starts after the time budget, and the synthesis gives up (an exception) if
+    #   no trial has succeeded by then, e.g., a quantum chip with too little room for routing
+    #   the protocol, the retry without the time limits (below) is also bounded by it
+    time_budget = synthesis_option.get("time_budget")
+    if time_budget is not None:
+        time_budget = float(time_budget)
+
+    def get_remaining_budget():
+        # the time left in the time budget (None : no time budget)
+        if time_budget is None:
+            return None
+        return max(time_budget - synthesisevents.read_stopwatch(synthesis_stopwatch)["wall"],
+                   0.0)
+
+    # seed for the random initial mappings (default : None, not reproducible)
+    # the k-th attempt of a trial (including the attempts killed by the time limit) uses seed + k
+    # note that the order of the qubits also depends on the hash seed (PYTHONHASHSEED)
+    seed = synthesis_option.get("seed")
+    if seed is not None:
+        seed = int(seed)
+
+    # profiling mode of the graph traversals (default : False)
+    # the profiles are accumulated per traversal phase into the analysis ("Profile")
+    flag_profile = synthesis_option.get("profile")
+    if flag_profile is None:
+        flag_profile = False
+
+    traversal_profiles = {}
+
+    # memory-lean mode (default : False)
+    #   the DAG is built once in the compact form (DirectedAcyclicGraph.CompactDAG) without
+    #   copying the protocol, the backward traversal runs on the reverse DAG derived from its
+    #   nodes, and the traversals write the syscode into the columnar arrays
+    flag_memory_lean = synthesis_option.get("memory_lean")
+    if flag_memory_lean is None:
+        flag_memory_lean = False
+
+    # transport of the read-only data to the traversal processes (default : pipe)
+    #   pipe : the data are handed to each process with its arguments
+    #   shared_memory : the distance matrix and the compact DAGs (memory-lean mode) are copied
+    #                   once into shared memory blocks and attached by the processes in place
+    # with shared_memory, the syscode comes back packed in the columnar arrays
+    transport = synthesis_option.get("transport")
+    if transport is None:
+        transport = "pipe"
+
+    if transport not in ["pipe", "shared_memory"]:
+        raise Exception(f"Error ! Transport {transport} is not supported.")
+
+    flag_packed_syscode = flag_memory_lean or transport == "shared_memory"
+
+    # start method of the traversal processes (default : None, the default of the platform)
+    #   fork : the processes share the data of the synthesis process at their start
+    #   spawn, forkserver : the processes are started anew and receive their arguments
+    #                       pickled, safe for a synthesis in a multithreaded process
+    #                       (e.g., synthesisserver), since fork copies the locks held by
+    #                       the other threads
+    start_method = synthesis_option.get("start_method")
+    if start_method is not None and start_method not in ["fork", "spawn", "forkserver"]:
+        raise Exception(f"Error ! Start method {start_method} is not supported.")
+
+    multiprocessing_context = multiprocessing.get_context(start_method)
+
+    # segmented synthesis (default : False)
+    #   the protocol is split into the windows delimited by Barrier-All, and the windows are
+    #   routed in turn carrying the qubit mapping across (see synthesize_windows)
+    #   window_size : the minimum number of the gates of a window (default : 1)
+    #   window_beam : the number of the candidates kept over the windows (default : 3)
+    flag_segmented = synthesis_option.get("segmented")
+    if flag_segmented is None:
+        flag_segmented = False
+
+    window_size = synthesis_option.get("window_size")
+    if window_size is not None:
+        window_size = int(window_size)
+
+    window_beam = synthesis_option.get("window_beam")
+    if window_beam is not None:
+        window_beam = int(window_beam)
+
+    # memo table of the traversals (default : None, no memo table)
+    #   the trials reaching a mapping seen before after the first forward traversal reuse
+    #   the mapping of the backward traversal and the syscode of the final forward traversal
+    #   (see traversalcache), the table is given by the kwargs (shared by the runs in a process)
+    #   or by the synthesis_option "traversal_cache" :
+    #       path : the table is loaded from the json file and saved back after the trials
+    #       True : the table is kept during the synthesis only
+    #   traversal_cache_size : the capacity of the table in the entries (default : 256)
+    traversal_cache = kwargs.get("traversal_cache")
+    if traversal_cache is None:
+        path_traversal_cache = synthesis_option.get("traversal_cache")
+        if path_traversal_cache:
+            if path_traversal_cache is True:
+                path_traversal_cache = None
+
+            traversal_cache = traversalcache.new_traversal_cache(
+                synthesis_option.get("traversal_cache_size"), path_traversal_cache)
+
     flag_initial_mapping = False
     # check a qubit mapping is provided
     initial_mapping = kwargs.get("qubit_table")
@@ -929,16 +2296,13 @@ def synthesize(path_qasm, path_qchip, **kwargs):
         if len(initial_mapping):
             flag_initial_mapping = True
 
-    # json_qchip_data = open(path_qchip).read()
-    # qchip_data = json.loads(json_qchip_data)
+    # the quantum chip is given as a file, a chip object (e.g., layoutbuilder.generate_qchip)
+    # or a chip prepared with its distance matrix (prepare_qchip), the given one is not modified
+    stopwatch = synthesisevents.start_stopwatch()
+    qchip_data = prepare_qchip(path_qchip)
+    synthesisevents.emit(listeners, "distance_matrix", **synthesisevents.read_stopwatch(stopwatch))
 
-    with open(path_qchip, "r", encoding="utf-8") as infile:
-        raw_data = infile.read()
-        qchip_data = json.loads(raw_data)
-
-    # update qubit connectivity (string type -> int type)
-    qchip_data["qubit_connectivity"] = {int(k): v
-        for k, v in qchip_data["qubit_connectivity"].items()}
+    ret_distance_matrix = qchip_data.pop("distance_matrix")
 
     qchip_size = len(qchip_data["qubit_connectivity"].keys())
 
@@ -949,9 +2313,6 @@ def synthesize(path_qasm, path_qchip, **kwargs):
     if qchip_lattice_size is None:
         qchip_lattice_size = {"height": 1, "width": qchip_size}
 
-    # computing the distance matrix from qchip_data
-    ret_distance_matrix, _ = DM.generateDM(qchip_data, "distance")
-
     # option for supporting a swap gate (default : true)
     # otherwise, a swap is implemented as 3 cnot gates
     flag_swap = synthesis_option.get("allow_swap")
@@ -966,6 +2327,12 @@ def synthesize(path_qasm, path_qchip, **kwargs):
     else:
         allowable_data_interaction = int(allowable_data_interaction)
 
+    # option to raise an exception when the fault tolerance checkup of the resulting circuit
+    # finds more SWAPs between activated qubits than the bound (default : false, reported only)
+    flag_verify_fault_tolerance = synthesis_option.get("verify_fault_tolerance")
+    if flag_verify_fault_tolerance is None:
+        flag_verify_fault_tolerance = False
+
     # reference variables to hold the optimal performance and circuits
     # initialized as math.inf or 0
     min_data_move = math.inf
@@ -979,8 +2346,20 @@ def synthesize(path_qasm, path_qchip, **kwargs):
     qubit_info = collections.defaultdict(list)
 
     # pre-analyze a qasm code
-    list_qasm_commands, list_algorithm_qubits, cnot_counts =\
-        SABRE_utility.analyze_qasm(path_qasm)
+    # the protocol is given as a file or as a protocol prepared in advance (prepare_protocol)
+    # the commands are copied since the move-back commands are added below
+    # (in the memory-lean mode, the protocol is not copied and the list keeps the move-back
+    #  commands only)
+    stopwatch = synthesisevents.start_stopwatch()
+    protocol = prepare_protocol(path_qasm)
+    synthesisevents.emit(listeners, "parse", **synthesisevents.read_stopwatch(stopwatch))
+
+    if flag_memory_lean:
+        list_qasm_commands = []
+    else:
+        list_qasm_commands = [list(command) for command in protocol["qasm_commands"]]
+    list_algorithm_qubits = list(protocol["algorithm_qubits"])
+    cnot_counts = protocol["cnot_counts"]
 
     # classify algorithm_qubits into groups according to the qubit array name
     # such as "data", "ancilla", "syndrome"
@@ -1028,236 +2407,497 @@ def synthesize(path_qasm, path_qchip, **kwargs):
     # otherwise, the initial position from the picked initial mapping is set for that
     # for the data qubits only, the moveback is conducted
     list_qubits_moved_back = []
+    list_moveback_commands = []
     if flag_moveback:
         # if homebase is not specified, then
         # it is automatically set with the initial positions from the initial mapping
         if homebase is None:
             for qubit in qubit_info["data"]:
                 list_qubits_moved_back.append(qubit)
-                list_qasm_commands.append([g.str_move, qubit, f"{qubit}-init"])
+                list_moveback_commands.append([g.str_move, qubit, f"{qubit}-init"])
         else:
             for qubit in qubit_info["data"]:
                 list_qubits_moved_back.append(qubit)
-                list_qasm_commands.append([g.str_move, qubit, homebase[qubit]])
+                list_moveback_commands.append([g.str_move, qubit, homebase[qubit]])
 
-    # directed acyclic graph for forward traversal
-    ret_dag = DirectedAcyclicGraph.createDAG(list_qasm_commands)
+        list_qasm_commands.extend(list_moveback_commands)
 
-    # for the backward traversal,
-    # the inserted moveback instruction should be removed
-    if flag_moveback:
-        if homebase is None:
-            for qubit in list_qubits_moved_back:
-                list_qasm_commands.remove([g.str_move, qubit, f"{qubit}-init"])
-        else:
-            for qubit in list_qubits_moved_back:
-                list_qasm_commands.remove([g.str_move, qubit, homebase[qubit]])
-
-    print("list of the qubits for move-back : ", list_qubits_moved_back)
-
-    # directed acyclic graph for backware traversal
-    reverse_dag = DirectedAcyclicGraph.createDAG(reversed(list_qasm_commands))
-
-    # arguments for graph traversal
-    arguments = {"QChip": qchip_data,
-                "DM": ret_distance_matrix,
-                "qubit_info": qubit_info,
-                "initial_mapping": initial_mapping,
-                "initial_mapping_option": initial_mapping_option,
-                "period": synthesis_option.get("period"),
-                "DAG": ret_dag["DAG"],
-                "cost": cost_function,
-                "decay": decay,
-                "lap_depth": lap_depth,
-                "extended_set_weight": extended_set_weight,
-                "allow_swap": flag_swap,
-                "allowable_data_interaction": allowable_data_interaction,
-                "homebase": homebase}
-
-    if cnot_counts:
-        time_limit = cnot_counts
-    else:
-        time_limit = 10
+    # directed acyclic graph for forward traversal
+    stopwatch = synthesisevents.start_stopwatch()
+    if flag_memory_lean:
+        # the moveback instructions (in list_qasm_commands) follow the protocol
+        ret_dag = DirectedAcyclicGraph.createDAG(
+            itertools.chain(protocol["qasm_commands"], list_qasm_commands), compact=True)
 
-    flag_must = False
+        synthesisevents.emit(listeners, "moveback", qubits=list_qubits_moved_back)
 
-    progress_bar = Bar ('Progress', max=iteration)
+        # directed acyclic graph for backward traversal derived from the same nodes,
+        # without the moveback nodes (the last nodes)
+        reverse_dag = DirectedAcyclicGraph.derive_reverse_dag(
+            ret_dag["DAG"],
+            limit=len(ret_dag["DAG"].nodes.items) - len(list_qubits_moved_back))
 
-    while True:
-        iter_idx = 0
-        while iter_idx < iteration:
-            # clone the front layer
-            front_layer = copy.deepcopy(ret_dag["roots"])
-            arguments.update({"FL": front_layer})
+    else:
+        ret_dag = DirectedAcyclicGraph.createDAG(list_qasm_commands)
+
+        # for the backward traversal,
+        # the inserted moveback instruction should be removed
+        for command in list_moveback_commands:
+            list_qasm_commands.remove(command)
+
+        synthesisevents.emit(listeners, "moveback", qubits=list_qubits_moved_back)
+
+        # directed acyclic graph for backware traversal
+        reverse_dag = DirectedAcyclicGraph.createDAG(reversed(list_qasm_commands))
+
+    synthesisevents.emit(listeners, "dag", **synthesisevents.read_stopwatch(stopwatch))
+
+    # the initial placements optimized in advance (initial_mapping_option "annealing")
+    list_placements = []
+    if initial_mapping_option == "annealing":
+        import placementannealing
+
+        stopwatch = synthesisevents.start_stopwatch()
+
+        top_k = annealing_option["top_k"]
+        list_placements, list_placement_scores = placementannealing.anneal_placements(
+            protocol["qasm_commands"],
+            [qubit for list_qubits in qubit_info.values() for qubit in list_qubits],
+            ret_distance_matrix,
+            top_k=int(top_k) if top_k is not None else iteration,
+            chains=annealing_option["chains"],
+            steps=annealing_option["steps"],
+            fixed_qubits=initial_mapping,
+            seed=seed)
+
+        synthesisevents.emit(listeners, "annealing", placements=len(list_placements),
+                             scores=list_placement_scores,
+                             **synthesisevents.read_stopwatch(stopwatch))
+
+    # the data handed to the traversal processes
+    # (with the transport "shared_memory", the handles of the shared memory blocks)
+    traversal_distance_matrix = ret_distance_matrix
+    traversal_dag = ret_dag["DAG"]
+    traversal_reverse_dag = reverse_dag["DAG"]
+
+    shared_blocks = []
+    try:
+        if transport == "shared_memory":
+            traversal_distance_matrix = sharedtransport.share_distance_matrix(ret_distance_matrix,
+                                                                              shared_blocks)
+            if flag_memory_lean:
+                traversal_dag = sharedtransport.share_compact_dag(ret_dag["DAG"], shared_blocks)
+                traversal_reverse_dag = sharedtransport.share_compact_dag(reverse_dag["DAG"],
+                                                                          shared_blocks)
+
+        # arguments for graph traversal
+        arguments = {"QChip": qchip_data,
+                    "DM": traversal_distance_matrix,
+                    "qubit_info": qubit_info,
+                    "initial_mapping": initial_mapping,
+                    "initial_mapping_option": initial_mapping_option,
+                    "period": synthesis_option.get("period"),
+                    "DAG": traversal_dag,
+                    "cost": cost_function,
+                    "decay": decay,
+                    "lap_depth": lap_depth,
+                    "extended_set_weight": extended_set_weight,
+                    "allow_swap": flag_swap,
+                    "allowable_data_interaction": allowable_data_interaction,
+                    "homebase": homebase,
+                    "profile": flag_profile,
+                    "packed_syscode": flag_packed_syscode,
+                    "router": router,
+                    "beam_width": beam_width,
+                    "start_method": start_method}
+
+        if cnot_counts:
+            time_limit = cnot_counts
+        else:
+            time_limit = 10
+
+        # the traversal writing the circuit may take longer (router beam)
+        write_time_limit = get_write_time_limit(time_limit, arguments)
+        forward_time_limit = write_time_limit if flag_initial_mapping else time_limit
+
+        # the digest of the inputs shared by the trials for the keys of the memo table
+        # (not used with the given qubit mapping, which has no backward traversal, nor in
+        #  the segmented synthesis)
+        if flag_initial_mapping or flag_segmented:
+            traversal_cache = None
+
+        if traversal_cache is not None:
+            cache_fingerprint = traversalcache.fingerprint_inputs(
+                itertools.chain(protocol["qasm_commands"], list_moveback_commands), qchip_data,
+                {"cost": cost_function, "decay": decay, "lap_depth": lap_depth,
+                 "extended_set_weight": extended_set_weight, "allow_swap": flag_swap,
+                 "allowable_data_interaction": allowable_data_interaction,
+                 "moveback": bool(flag_moveback), "homebase": homebase,
+                 "router": router, "beam_width": beam_width, "sabre_rounds": sabre_rounds})
+
+        flag_must = False
+
+        number_trials = 0
+        number_killed = 0
+        number_attempts = 0
+
+        if flag_segmented:
+            # the windows are routed in turn (the trials below are skipped)
+            # the moveback follows the gates of the last window (the move nodes are not roots)
+            list_windows = split_protocol_windows(protocol["qasm_commands"], window_size=window_size)
+            list_windows[-1].extend(list_moveback_commands)
+
+            segmented_result = synthesize_windows(list_windows, arguments,
+                                                  iteration=iteration,
+                                                  window_beam=window_beam,
+                                                  optimal_criterion=optimal_criterion,
+                                                  initial_mapping=flag_initial_mapping,
+                                                  seed=seed,
+                                                  memory_lean=flag_memory_lean,
+                                                  listeners=listeners,
+                                                  traversal_profiles=traversal_profiles,
+                                                  placements=list_placements,
+                                                  sabre_rounds=sabre_rounds,
+                                                  time_budget=get_remaining_budget())
+
+            best_syscode = segmented_result["syscode"]
+            best_initial_mapping = segmented_result["initial_mapping"]
+            best_final_mapping = segmented_result["final_mapping"]
+            best_interaction = segmented_result["interactions"]
+            optimal_performance = segmented_result["cost"]
+            min_data_move = sum(v for k, v in best_interaction.items()
+                                if any("data" in qubit for qubit in [k[0], k[1]]))
+            number_trials = segmented_result["trials"]
+            number_killed = segmented_result["killed"]
 
-            # if the traveral is not succeeded, the following traversals will not succeed
-            # perform the first forward graph traversal indepently (as a separate process)
-            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
-            proc = multiprocessing.Process(target=manage_forward_traversal,
-                                         args=(arguments, child_conn))
-            proc.start()
+        else:
+            synthesisevents.emit(listeners, "synthesis_start", iteration=iteration)
 
-            if not flag_must:
-                proc.join(time_limit)
-            else:
-                proc.join()
+        while best_initial_mapping is None:
+            iter_idx = 0
+            while iter_idx < iteration:
+                # no trial starts after the time budget
+                if get_remaining_budget() == 0.0:
+                    if best_initial_mapping is not None:
+                        break
 
-            # if the process is alive after the pre-set timelimt,
-            # it will be killed
-            if proc.is_alive():
-                proc.terminate()
-                print(" time limit !")
-                continue
+                    raise Exception(f"Error ! No trial succeeded within the time budget "
+                                    f"({time_budget} s), the quantum chip may be infeasible "
+                                    f"for the protocol.")
 
-            # result of the first forward graph traversal
-            message = parent_conn.recv()
+                synthesisevents.emit(listeners, "trial_start", trial=number_trials)
+                trial_stopwatch = synthesisevents.start_stopwatch()
 
-            if flag_initial_mapping:
-                list_syscode_commands, interactions, initial_mapping, final_mapping = message[:]
+                # clone the front layer
+                front_layer = copy.deepcopy(ret_dag["roots"])
+                arguments.update({"FL": front_layer})
 
-            # initial qubit mapping 이 주어지지 않았으면,
-            #     forward-reverse-forward traversal 을 통해서 최적의 mapping 을 찾아야 함
-            # initial qubit mapping (partial)이 주어졌으면,
-            #     해당 mapping 이 유지되어야 하므로 forward traversal 만 수행함
-            else:
-                # arguments for the backward traversal
-                qubit_mapping = message[0]
-                in_arguments = {"QChip": qchip_data,
-                                "DM": ret_distance_matrix,
-                                "qubit_mapping": qubit_mapping,
-                                "DAG": reverse_dag["DAG"],
-                                "FL": reverse_dag["roots"],
-                                "cost": cost_function,
-                                "decay": decay,
-                                "lap_depth": lap_depth,
-                                "extended_set_weight": extended_set_weight,
-                                "write_syscode": False,
-                                "allow_swap": flag_swap,
-                                "direction": "backward",
-                                "qubit_info": qubit_info,
-                                "allowable_data_interaction": allowable_data_interaction,
-                                "homebase": homebase}
-
-                # for backward graph traversal as a separate process
-                parent_conn, child_conn	= multiprocessing.Pipe(duplex=False)
-                proc = multiprocessing.Process(target=manage_graph_traversal_as_process,
-                                            args=(in_arguments, child_conn))
-                proc.start()
+                if seed is not None:
+                    arguments["seed"] = seed + number_attempts
 
-                if not flag_must:
-                    proc.join(time_limit)
+                if number_attempts < len(list_placements):
+                    arguments["placement"] = list_placements[number_attempts]
                 else:
-                    proc.join()
-
-                if proc.is_alive():
-                    proc.terminate()
-                    print(" time limit !")
-                    continue
-
-                message = parent_conn.recv()
-                qubit_mapping = message[0]
-
-                # for the last forward traversal,
-                # collect qubit mapping data from the previous backward traversal
-                initial_mapping = copy.deepcopy(qubit_mapping)
-                position_data_qubits = {key: value for key, value in qubit_mapping.items()
-                                             if "data" in key}
-
-                # final forward traverse circuit
-                front_layer = copy.deepcopy(ret_dag["roots"])
-                # arguments for the final forward graph traversal
-                in_arguments = {"QChip": qchip_data,
-                                "DM": ret_distance_matrix,
-                                "qubit_mapping": qubit_mapping,
-                                "DAG": ret_dag["DAG"],
-                                "FL": front_layer,
-                                "cost": cost_function,
-                                 "decay": decay,
-                                "lap_depth": lap_depth,
-                                "extended_set_weight": extended_set_weight,
-                                "write_syscode": True,
-                                "allow_swap": flag_swap,
-                                "qubit_info": qubit_info,
-                                "position_data_qubits": position_data_qubits,
-                                "direction": "forward",
-                                "allowable_data_interaction": allowable_data_interaction,
-                                "homebase": homebase}
-
-                proc = multiprocessing.Process(target=manage_graph_traversal_as_process,
-                                             args=(in_arguments, child_conn))
+                    arguments["placement"] = None
+                number_attempts += 1
+
+                # if the traveral is not succeeded, the following traversals will not succeed
+                # perform the first forward graph traversal indepently (as a separate process)
+                parent_conn, child_conn = multiprocessing_context.Pipe(duplex=False)
+                stopwatch = synthesisevents.start_stopwatch()
+                proc = multiprocessing_context.Process(target=manage_forward_traversal,
+                                             args=(arguments, child_conn))
                 proc.start()
 
                 if not flag_must:
-                    proc.join(time_limit)
+                    proc.join(forward_time_limit)
                 else:
-                    proc.join()
+                    proc.join(get_remaining_budget())
 
+                # if the process is alive after the pre-set timelimt,
+                # it will be killed
                 if proc.is_alive():
                     proc.terminate()
-                    print(" time limit !")
+                    proc.join()
+                    number_killed += 1
+                    synthesisevents.emit(listeners, "trial_killed", trial=number_trials,
+                                         phase="forward", time_limit=forward_time_limit,
+                                         **synthesisevents.read_stopwatch(stopwatch))
                     continue
 
-                # circuit data from the last forward graph traversal
+                # result of the first forward graph traversal
                 message = parent_conn.recv()
-                list_syscode_commands, interactions, qubit_mapping = message[:]
-                final_mapping = copy.deepcopy(qubit_mapping)
-
-            iter_idx+=1
-
-            # cancel out the redundant data if exist
-            list_syscode_commands = formatconversion.cancel_redundancy(list_syscode_commands)
-
-            # evaluate the circuit in terms of the circuit depth or number of gates
-            # and pick the best one
-            if optimal_criterion == "circuit_depth":
-                circuit_depth = depth_analysis.evaluate_circuit_depth(list_syscode_commands)
-
-                if circuit_depth < optimal_performance:
-                    optimal_performance = circuit_depth
-                    best_syscode = list_syscode_commands
-                    min_data_move = sum(v for k, v in interactions.items()
-                                    if any("data" in qubit for qubit in [k[0], k[1]]))
+                synthesisevents.emit(listeners, "forward", trial=number_trials,
+                                     **synthesisevents.read_stopwatch(stopwatch))
+
+                if flag_profile:
+                    traversal_profiles["forward"] = merge_traversal_profiles(
+                        traversal_profiles.get("forward"), message[-1])
+
+                # the traversals from the mapping of the first forward traversal seen before
+                # are reused from the memo table
+                cache_key = None
+                cached_entry = None
+                if traversal_cache is not None:
+                    cache_key = traversalcache.hash_traversal_inputs(cache_fingerprint, message[0])
+                    cached_entry = traversalcache.lookup_traversal(traversal_cache, cache_key)
+                    synthesisevents.emit(listeners, "traversal_cache", trial=number_trials,
+                                         hit=cached_entry is not None)
+
+                if flag_initial_mapping:
+                    list_syscode_commands, interactions, initial_mapping, final_mapping = message[:4]
+
+                elif cached_entry is not None:
+                    list_syscode_commands = cached_entry["syscode"]
+                    interactions = cached_entry["interactions"]
+                    initial_mapping = cached_entry["initial_mapping"]
+                    final_mapping = cached_entry["final_mapping"]
+
+                # initial qubit mapping 이 주어지지 않았으면,
+                #     forward-reverse-forward traversal 을 통해서 최적의 mapping 을 찾아야 함
+                # initial qubit mapping (partial)이 주어졌으면,
+                #     해당 mapping 이 유지되어야 하므로 forward traversal 만 수행함
+                else:
+                    # arguments for the backward traversal
+                    qubit_mapping, forward_swaps = message[:2]
+                    in_arguments = {"QChip": qchip_data,
+                                    "DM": traversal_distance_matrix,
+                                    "qubit_mapping": qubit_mapping,
+                                    "DAG": traversal_reverse_dag,
+                                    "FL": reverse_dag["roots"],
+                                    "cost": cost_function,
+                                    "decay": decay,
+                                    "lap_depth": lap_depth,
+                                    "extended_set_weight": extended_set_weight,
+                                    "write_syscode": False,
+                                    "allow_swap": flag_swap,
+                                    "direction": "backward",
+                                    "qubit_info": qubit_info,
+                                    "allowable_data_interaction": allowable_data_interaction,
+                                    "homebase": homebase,
+                                    "profile": flag_profile,
+                                    "packed_syscode": flag_packed_syscode,
+                                    "start_method": start_method}
+
+                    # for backward graph traversal as a separate process
+                    stopwatch = synthesisevents.start_stopwatch()
+                    parent_conn, child_conn	= multiprocessing_context.Pipe(duplex=False)
+                    proc = multiprocessing_context.Process(target=manage_graph_traversal_as_process,
+                                                args=(in_arguments, child_conn))
+                    proc.start()
+
+                    if not flag_must:
+                        proc.join(time_limit)
+                    else:
+                        proc.join(get_remaining_budget())
+
+                    if proc.is_alive():
+                        proc.terminate()
+                        proc.join()
+                        number_killed += 1
+                        synthesisevents.emit(listeners, "trial_killed", trial=number_trials,
+                                             phase="backward", time_limit=time_limit,
+                                             **synthesisevents.read_stopwatch(stopwatch))
+                        continue
 
-                    best_initial_mapping = copy.deepcopy(initial_mapping)
-                    best_final_mapping = copy.deepcopy(final_mapping)
-                    best_interaction = interactions
+                    message = parent_conn.recv()
+                    qubit_mapping = message[0]
+                    synthesisevents.emit(listeners, "backward", trial=number_trials,
+                                         **synthesisevents.read_stopwatch(stopwatch))
+
+                    if flag_profile:
+                        traversal_profiles["backward"] = merge_traversal_profiles(
+                            traversal_profiles.get("backward"), message[-1])
+
+                    # the next SABRE rounds from the mapping of the first round
+                    if sabre_rounds > 1:
+                        refined = refine_sabre_rounds(
+                            qubit_mapping, forward_swaps + message[1],
+                            dict(in_arguments, DAG=traversal_dag, FL=copy.deepcopy(ret_dag["roots"]),
+                                 direction="forward"),
+                            in_arguments,
+                            rounds=sabre_rounds, time_limit=time_limit, listeners=listeners,
+                            trial=number_trials, traversal_profiles=traversal_profiles)
+
+                        qubit_mapping = refined["mapping"]
+                        number_killed += refined["killed"]
+
+                    # for the last forward traversal,
+                    # collect qubit mapping data from the previous backward traversal
+                    initial_mapping = copy.deepcopy(qubit_mapping)
+                    position_data_qubits = {key: value for key, value in qubit_mapping.items()
+                                                 if "data" in key}
+
+                    # final forward traverse circuit
+                    front_layer = copy.deepcopy(ret_dag["roots"])
+                    # arguments for the final forward graph traversal
+                    in_arguments = {"QChip": qchip_data,
+                                    "DM": traversal_distance_matrix,
+                                    "qubit_mapping": qubit_mapping,
+                                    "DAG": traversal_dag,
+                                    "FL": front_layer,
+                                    "cost": cost_function,
+                                     "decay": decay,
+                                    "lap_depth": lap_depth,
+                                    "extended_set_weight": extended_set_weight,
+                                    "write_syscode": True,
+                                    "allow_swap": flag_swap,
+                                    "qubit_info": qubit_info,
+                                    "position_data_qubits": position_data_qubits,
+                                    "direction": "forward",
+                                    "allowable_data_interaction": allowable_data_interaction,
+                                    "homebase": homebase,
+                                    "profile": flag_profile,
+                                    "packed_syscode": flag_packed_syscode,
+                                    "router": router,
+                                    "beam_width": beam_width,
+                                    "start_method": start_method}
+
+                    stopwatch = synthesisevents.start_stopwatch()
+                    proc = multiprocessing_context.Process(target=manage_graph_traversal_as_process,
+                                                 args=(in_arguments, child_conn))
+                    proc.start()
+
+                    if not flag_must:
+                        proc.join(write_time_limit)
+                    else:
+                        proc.join(get_remaining_budget())
+
+                    if proc.is_alive():
+                        proc.terminate()
+                        proc.join()
+                        number_killed += 1
+                        synthesisevents.emit(listeners, "trial_killed", trial=number_trials,
+                                             phase="forward_write", time_limit=write_time_limit,
+                                             **synthesisevents.read_stopwatch(stopwatch))
+                        continue
 
-            elif optimal_criterion == "number_gates":
-                # gate 수 기준으로 optimal circuit 찾기
-                number_instructions = len(list_syscode_commands)
+                    # circuit data from the last forward graph traversal
+                    message = parent_conn.recv()
+                    list_syscode_commands, interactions, qubit_mapping = message[:3]
+                    synthesisevents.emit(listeners, "forward_write", trial=number_trials,
+                                         **synthesisevents.read_stopwatch(stopwatch))
+
+                    if flag_profile:
+                        traversal_profiles["forward_write"] = merge_traversal_profiles(
+                            traversal_profiles.get("forward_write"), message[-1])
+                    final_mapping = copy.deepcopy(qubit_mapping)
+
+                iter_idx+=1
+
+                stopwatch = synthesisevents.start_stopwatch()
+                previous_performance = optimal_performance
+
+                # the syscode packed in the columnar arrays is restored
+                # (the syscode from the memo table is in the list form)
+                if flag_packed_syscode and cached_entry is None:
+                    list_syscode_commands = formatconversion.restore_syscode(list_syscode_commands)
+
+                if cache_key is not None and cached_entry is None:
+                    traversalcache.store_traversal(traversal_cache, cache_key, initial_mapping,
+                                                   final_mapping, list_syscode_commands, interactions)
+
+                # cancel out the redundant data if exist
+                list_syscode_commands = formatconversion.cancel_redundancy(list_syscode_commands)
+
+                # evaluate the circuit in terms of the circuit depth or number of gates
+                # and pick the best one
+                if optimal_criterion == "circuit_depth":
+                    circuit_depth = depth_analysis.evaluate_circuit_depth(list_syscode_commands)
+
+                    if circuit_depth < optimal_performance:
+                        optimal_performance = circuit_depth
+                        best_syscode = list_syscode_commands
+                        min_data_move = sum(v for k, v in interactions.items()
+                                        if any("data" in qubit for qubit in [k[0], k[1]]))
+
+                        best_initial_mapping = copy.deepcopy(initial_mapping)
+                        best_final_mapping = copy.deepcopy(final_mapping)
+                        best_interaction = interactions
+
+                elif optimal_criterion == "number_gates":
+                    # gate 수 기준으로 optimal circuit 찾기
+                    number_instructions = len(list_syscode_commands)
+
+                    if number_instructions < optimal_performance:
+                        optimal_performance = number_instructions
+                        best_syscode = list_syscode_commands
+                        min_data_move = sum(v for k, v in interactions.items()
+                                        if any("data" in qubit for qubit in [k[0], k[1]]))
+
+                        best_initial_mapping = copy.deepcopy(initial_mapping)
+                        best_final_mapping = copy.deepcopy(final_mapping)
+                        best_interaction = interactions
+
+                if optimal_criterion == "circuit_depth":
+                    trial_cost = circuit_depth
+                else:
+                    trial_cost = len(list_syscode_commands)
 
-                if number_instructions < optimal_performance:
-                    optimal_performance = number_instructions
-                    best_syscode = list_syscode_commands
-                    min_data_move = sum(v for k, v in interactions.items()
-                                    if any("data" in qubit for qubit in [k[0], k[1]]))
+                synthesisevents.emit(listeners, "scoring", trial=number_trials,
+                                     cost=trial_cost, best_cost=optimal_performance,
+                                     improved=optimal_performance < previous_performance,
+                                     **synthesisevents.read_stopwatch(stopwatch))
 
-                    best_initial_mapping = copy.deepcopy(initial_mapping)
-                    best_final_mapping = copy.deepcopy(final_mapping)
-                    best_interaction = interactions
+                synthesisevents.emit(listeners, "trial_done", trial=number_trials,
+                                     **synthesisevents.read_stopwatch(trial_stopwatch))
+                number_trials += 1
 
-            progress_bar.next()
+            # if the best mapping is provided, then break the loop
+            # otherwise, we need to iterate the loop 1 time again
+            if not best_initial_mapping is None:
+                break
 
-        # if the best mapping is provided, then break the loop
-        # otherwise, we need to iterate the loop 1 time again
-        if not best_initial_mapping is None:
-            break
+            flag_must = True
+            iteration = 1
 
-        flag_must = True
-        iteration = 1
+    finally:
+        # the shared memory blocks are released after the traversals, also when they fail
+        # (e.g., a window not routed, an interrupt) so that no block is left behind
+        sharedtransport.release_blocks(shared_blocks)
 
-    progress_bar.finish()
+    # the memo table is saved back into its file
+    if traversal_cache is not None and traversal_cache["path"] is not None:
+        traversalcache.save_traversal_cache(traversal_cache)
 
-    # form a time ordered system code from the naive list
-    # best_circuit = formatconversion.transform_ordered_syscode(best_syscode, qchip_size)
-    best_circuit = formatconversion.transform_ordered_syscode(best_syscode)
+    # form a time ordered system code in the columnar form from the naive list
+    # the checkup passes work on it before the circuit is stringified for exporting
+    columnar_circuit = formatconversion.transform_columnar_syscode(best_syscode)
 
     # checkup the mapping result is compatible with the given qubit connectivity
-    if checkup.checkup_system_code(best_circuit, qchip_data):
+    stopwatch = synthesisevents.start_stopwatch()
+    connectivity_violations = checkup.find_connectivity_violations(columnar_circuit,
+                                                                   qchip_data)
+    if not connectivity_violations:
         checkup_msg = "mapping result is compatible with the given qubit connectivity."
     else:
         checkup_msg = "mapping result is NOT compatible with the given qubit connectivity."
-        raise Exception("mapping result is NOT compatible with the given qubit connectivity.")
+        raise Exception(f"{checkup_msg} violations: {connectivity_violations}")
+
+    # checkup the fault tolerance: SWAPs between activated qubits within the bound only
+    # (reported, and raised with the option verify_fault_tolerance)
+    fault_tolerance_violations = checkup.checkup_fault_tolerance(
+        {"circuit": columnar_circuit, "initial_mapping": best_initial_mapping})["violations"]
+
+    synthesisevents.emit(listeners, "checkup", violations=len(fault_tolerance_violations),
+                         **synthesisevents.read_stopwatch(stopwatch))
+
+    if flag_verify_fault_tolerance and\
+            len(fault_tolerance_violations) > allowable_data_interaction:
+        raise Exception(f"""The circuit is NOT fault-tolerant:
+                        SWAPs between activated qubits -> {fault_tolerance_violations}""")
+
+    # sink (file path or file-like) to which the result is streamed (see streamexport)
+    # the circuit is rendered in string step by step only while it is written
+    sink = kwargs.get("sink")
+
+    # format of the resulting circuit (default : string)
+    #   string : {time index: ["CNOT 3,4", ..]} for exporting
+    #   columnar : time ordered circuit in the columnar form
+    if synthesis_option.get("circuit_format") == "columnar" or sink is not None:
+        best_circuit = columnar_circuit
+    else:
+        best_circuit = formatconversion.render_ordered_syscode(columnar_circuit)
 
     # analyze the list of quantum gates used in the protocol
     function_list = collections.defaultdict(int)
@@ -1280,7 +2920,7 @@ def synthesize(path_qasm, path_qchip, **kwargs):
 
 
     # circuit depth
-    circuit_depth = max(list(best_circuit.keys()))+1
+    circuit_depth = columnar_circuit["time"][-1]+1
 
     # kq of the circuit = the circuit depth x the circuit bandwidth (# qubits)
     circuit_size = circuit_depth * len(best_final_mapping.keys())
@@ -1295,9 +2935,32 @@ def synthesize(path_qasm, path_qchip, **kwargs):
             "Data Qubit Move": min_data_move,
             "Circuit Depth": circuit_depth,
             "Interaction": best_interaction,
-            "KQ": circuit_size},
+            "KQ": circuit_size,
+            "Fault Tolerance Violations": len(fault_tolerance_violations)},
             "checkup": checkup_msg}
 
+    # peak resident set size (MB) of the synthesis process and of its largest traversal,
+    # as the high-water marks over the life of the process (e.g., the server, repeated runs)
+    # with "raised" : whether this synthesis has raised them
+    ret["analysis"]["Process Peak Memory"] = synthesisevents.get_peak_memory(peak_memory_start)
+
+    # profiles of the graph traversals per phase (forward, backward, forward_write)
+    if flag_profile:
+        ret["analysis"]["Profile"] = traversal_profiles
+
+    # usage of the memo table of the traversals (hits and misses accumulated over the runs)
+    if traversal_cache is not None:
+        ret["analysis"]["Traversal Cache"] = traversalcache.summarize_traversal_cache(
+            traversal_cache)
+
+    if sink is not None:
+        import streamexport
+        streamexport.export_result(ret, sink)
+
+    synthesisevents.emit(listeners, "synthesis_done", trials=number_trials,
+                         killed=number_killed, best_cost=optimal_performance,
+                         **synthesisevents.read_stopwatch(synthesis_stopwatch))
+
     return ret
 
 
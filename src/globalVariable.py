@@ -216,10 +216,24 @@ list_quantum_devices = ["ION", "SC", "Superconductor", "QD", "Quantum Dot"]
 list_quantum_codes = ["Steane", "Bacon-Shor", "Surface_defect", "Surface_planar"]
 
 
+# flag whether the global variables are initialized (see ensure_globals)
+flag_initialized = False
+
+
+def ensure_globals():
+    """
+        function to initialize the global variables on their first use
+        (the modules do not initialize them at import time)
+    """
+    if not flag_initialized:
+        initialize_globals()
+
+
 def initialize_globals(quantum_code=None):
     """
         function to define 1-qubit gate list and 2-qubit gate list
     """
+    global flag_initialized
     global list_one_qubit_gates
     global list_two_qubit_gates
     global list_nontransversal_gate
@@ -243,6 +257,8 @@ def initialize_globals(quantum_code=None):
 
     list_function_modules = set(["DecomposeRotation", "ControlledPhase"])
 
+    flag_initialized = True
+
     if quantum_code:
         print(" The quantum code is {0}".format(quantum_code))
 
@@ -0,0 +1,218 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module to build regular quantum chips (qubit layouts) in memory
+'''
+
+import os
+
+import numpy as np
+import simplejson as json
+
+# architecture of a qubit layout
+#   0 : all-to-all connection
+#   1 : one-dimensional lattice
+#   2 : two-dimensional rectangular lattice
+#   23 : two-dimensional triangular lattice (rectangular + diagonal)
+#   3 : three-dimensional cubic lattice
+ALL_TO_ALL = 0
+LINEAR = 1
+RECTANGULAR = 2
+TRIANGULAR = 23
+CUBIC = 3
+
+
+def normalize_layout_size(layout_size):
+    """
+        function to normalize a layout size given as a tuple (height, width) or
+        (height, length, width) into a dictionary
+    """
+    if isinstance(layout_size, dict):
+        return dict(layout_size)
+
+    if len(layout_size) == 2:
+        height, width = layout_size
+        return {"height": height, "width": width}
+
+    height, length, width = layout_size
+    return {"height": height, "length": length, "width": width}
+
+
+def shift_indices(index, offset):
+    """
+        function to return the index of the neighbor at the offset for every cell of the lattice
+        (-1 if the neighbor is out of the lattice)
+    """
+    neighbor = np.full(index.shape, -1, dtype=np.int64)
+
+    target = tuple(slice(max(-step, 0), dim - max(step, 0))
+                   for step, dim in zip(offset, index.shape))
+    source = tuple(slice(max(step, 0), dim - max(-step, 0))
+                   for step, dim in zip(offset, index.shape))
+
+    neighbor[target] = index[source]
+
+    return neighbor
+
+
+def generate_adjacency(layout_size, **kwargs):
+    """
+        function to generate the connectivity of a regular qubit layout as an array
+        (qubits x maximal degree), a row has the neighbors of a qubit padded by -1
+
+        the neighbors are in the order : vertical, (depth), horizontal, (diagonal)
+    """
+    architecture = kwargs.get("architecture")
+    if architecture is None:
+        architecture = RECTANGULAR
+
+    layout_size = normalize_layout_size(layout_size)
+    height = layout_size["height"]
+    width = layout_size["width"]
+    length = layout_size.get("length", 1)
+
+    qubits = height * length * width
+
+    if architecture == ALL_TO_ALL:
+        index = np.arange(qubits, dtype=np.int64)
+        adjacency = np.broadcast_to(index, (qubits, qubits))
+        return adjacency[~np.eye(qubits, dtype=bool)].reshape(qubits, max(qubits - 1, 0))
+
+    if architecture == LINEAR:
+        height, length, width = 1, 1, qubits
+
+    index = np.arange(qubits, dtype=np.int64).reshape(height, length, width)
+
+    list_offsets = [(-1, 0, 0), (1, 0, 0), (0, -1, 0), (0, 1, 0), (0, 0, -1), (0, 0, 1)]
+    if architecture == TRIANGULAR:
+        list_offsets.extend([(-1, 0, -1), (1, 0, 1)])
+
+    return np.stack([shift_indices(index, offset).ravel() for offset in list_offsets], axis=1)
+
+
+def generate_qchip(layout_size, **kwargs):
+    """
+        function to generate a quantum chip of a regular qubit layout (in memory)
+        the chip can be given to ftsynthesis.synthesize as it is
+
+        args:
+            layout_size: {"height": .., "width": ..} (and "length" for 3-d layout) or tuple
+            architecture: 0, 1, 2, 23 or 3 (see above, default: 2)
+
+        return:
+            {"qubit_connectivity": {qubit: [neighbors]}, "device_name": .., "dimension": ..}
+    """
+    architecture = kwargs.get("architecture")
+    if architecture is None:
+        architecture = RECTANGULAR
+
+    layout_size = normalize_layout_size(layout_size)
+    height = layout_size["height"]
+    width = layout_size["width"]
+    length = layout_size.get("length", 1)
+
+    adjacency = generate_adjacency(layout_size, architecture=architecture)
+    qubit_connectivity = {qubit: row[row >= 0].tolist() for qubit, row in enumerate(adjacency)}
+
+    if architecture == CUBIC or "length" in layout_size:
+        device_name = f"file_qchip_{height}x{length}x{width}.json"
+        dimension = {"height": height, "length": length, "width": width}
+    else:
+        device_name = f"file_qchip_{height}x{width}.json"
+        dimension = {"height": height, "width": width}
+
+    return {"qubit_connectivity": qubit_connectivity,
+            "device_name": device_name,
+            "dimension": dimension}
+
+
+def tile_layouts(grid_mappings, layout_size):
+    """
+        function to place the layouts of logical-qubit patches on a grid of patches
+        and return the layout on the tiled chip
+
+        args:
+            grid_mappings: rows of patch layouts [[{qubit: position}, ..], ..]
+                           (None for an empty patch)
+            layout_size: size of a patch {"height": .., "width": ..}
+
+        return:
+            {qubit: position on the tiled chip (height x rows, width x columns)}
+    """
+    height = layout_size["height"]
+    width = layout_size["width"]
+    columns = max(len(row) for row in grid_mappings)
+
+    tiled_layout = {}
+    for patch_row, row in enumerate(grid_mappings):
+        for patch_column, mapping in enumerate(row):
+            if not mapping:
+                continue
+
+            list_qubits = list(mapping.keys())
+            positions = np.fromiter((int(mapping[qubit]) for qubit in list_qubits),
+                                    dtype=np.int64, count=len(list_qubits))
+
+            cell_row, cell_column = np.divmod(positions, width)
+            tiled = (patch_row * height + cell_row) * (columns * width) +\
+                patch_column * width + cell_column
+
+            tiled_layout.update(zip(list_qubits, tiled.tolist()))
+
+    return tiled_layout
+
+
+def merge_layouts(mapping1, mapping2, direction, layout_size):
+    """
+        function to merge the layouts of two patches, the second patch is placed
+        below (vertical) or to the right of (horizon) the first patch
+    """
+    if direction == "vertical":
+        return tile_layouts([[mapping1], [mapping2]], layout_size)
+
+    if direction == "horizon":
+        return tile_layouts([[mapping1, mapping2]], layout_size)
+
+    raise Exception(f"Error ! Direction {direction} is not supported.")
+
+
+def generate_tiled_qchip(layout_size, grid_shape, **kwargs):
+    """
+        function to generate the quantum chip for a grid (rows, columns) of patches
+        kwargs are passed to generate_qchip (e.g., architecture)
+    """
+    rows, columns = grid_shape
+    layout_size = normalize_layout_size(layout_size)
+
+    return generate_qchip(dict(layout_size, height=layout_size["height"] * rows,
+                               width=layout_size["width"] * columns), **kwargs)
+
+
+def write_qchip(qchip, parent_dir, **kwargs):
+    """
+        function to write a quantum chip into a json file and return the path of the file
+        kwargs:
+            file_name: name of the file (default : device name of the chip)
+    """
+    file_name = kwargs.get("file_name")
+    if file_name is None:
+        file_name = qchip["device_name"]
+
+    path_qchip = os.path.join(parent_dir, file_name)
+
+    # written to a temporary file first, so that a process reading the same chip
+    # never sees a partially written file
+    path_temporary = f"{path_qchip}.{os.getpid()}.tmp"
+    with open(path_temporary, "w", encoding="utf-8") as out:
+        json.dump(qchip, out, sort_keys=True, indent=4, separators=(',', ':'))
+
+    os.replace(path_temporary, path_qchip)
+
+    return path_qchip
@@ -0,0 +1,290 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module to synthesize a protocol over many quantum chips (layout sizes x architectures)
+    in parallel and rank the results
+'''
+
+import os
+import math
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import networkx as nx
+
+import DirectedAcyclicGraph
+import ftsynthesis
+import layoutbuilder
+
+# protocol analyzed by the parent process, shared with the workers at their start
+WORKER_PROTOCOL = None
+
+# best KQ found so far, shared with the workers for pruning (None : no pruning)
+WORKER_INCUMBENT = None
+
+# time budget of a job (seconds, synthesis_option "time_budget"), so that a job on a chip
+# with too little room for routing fails instead of blocking its worker
+JOB_TIME_BUDGET = 120
+
+# criteria for ranking the results : key of the row in the table
+RANK_CRITERIA = {"kq": "KQ", "depth": "Circuit Depth", "gates": "Gates"}
+
+
+def initialize_worker(protocol, incumbent=None):
+    """
+        function to set the analyzed protocol (and the shared incumbent KQ) in a worker process
+    """
+    global WORKER_PROTOCOL, WORKER_INCUMBENT
+    WORKER_PROTOCOL = protocol
+    WORKER_INCUMBENT = incumbent
+
+
+def compute_lower_bounds(critical_path_depth, qchip):
+    """
+        function to compute cheap bounds of a candidate quantum chip for the protocol
+            depth : critical path depth of the protocol DAG (routing only adds time steps)
+            KQ : depth bound x the number of qubits of the chip (KQ counts all the chip qubits)
+            diameter : diameter of the chip (for reference)
+
+        the bounds hold before the cancellation of the redundant gates of the synthesized
+        circuit (formatconversion.cancel_redundancy), which may lower the depth below them,
+        so that the pruning by the bounds is a heuristic
+    """
+    qchip_size = len(qchip["qubit_connectivity"])
+
+    graph = nx.Graph()
+    graph.add_nodes_from(qchip["qubit_connectivity"].keys())
+    graph.add_edges_from((qubit, neighbor)
+                         for qubit, neighbors in qchip["qubit_connectivity"].items()
+                         for neighbor in neighbors)
+
+    diameter = nx.diameter(graph) if nx.is_connected(graph) else math.inf
+
+    return {"Depth": critical_path_depth,
+            "KQ": critical_path_depth * qchip_size,
+            "Diameter": diameter}
+
+
+def update_incumbent(kq):
+    """
+        function to lower the shared incumbent KQ
+    """
+    if WORKER_INCUMBENT is None:
+        return
+
+    with WORKER_INCUMBENT.get_lock():
+        if kq < WORKER_INCUMBENT.value:
+            WORKER_INCUMBENT.value = kq
+
+
+def is_pruned(row):
+    """
+        function to check whether the lower bound of a job already reaches the incumbent KQ
+    """
+    return WORKER_INCUMBENT is not None and\
+        row["KQ lower bound"] >= WORKER_INCUMBENT.value
+
+
+def new_row(job):
+    """
+        function to form a row of the table for a job
+    """
+    return {"layout_size": job["layout_size"],
+            "architecture": job["architecture"],
+            "qchip": job["qchip"]["device_name"],
+            "KQ lower bound": job["bounds"]["KQ"],
+            "Diameter": job["bounds"]["Diameter"]}
+
+
+def run_sweep_job(job):
+    """
+        function to synthesize the protocol on a quantum chip of the job
+        and return a row of the table
+        an infeasible job (e.g., too small chip, no trial succeeded within the time budget)
+        is reported with its error
+    """
+    row = new_row(job)
+
+    protocol_size = len(set(WORKER_PROTOCOL["algorithm_qubits"]))
+    if job["qchip_size"] < protocol_size:
+        row["error"] = f"The quantum chip ({job['qchip_size']} qubits) is smaller than "\
+            f"the protocol ({protocol_size} qubits)."
+        return row
+
+    # checked again at the start of the job, since the incumbent may have been updated
+    # after the job was submitted
+    if is_pruned(row):
+        row["pruned"] = True
+        return row
+
+    try:
+        # the workers run in parallel, so that no progress is shown on the console
+        result = ftsynthesis.synthesize(WORKER_PROTOCOL, job["qchip"],
+                                        synthesis_option=job["synthesis_option"],
+                                        qubit_table=job["qubit_table"],
+                                        listeners=[])
+
+    except Exception as error:
+        row["error"] = str(error)
+        return row
+
+    analysis = result["analysis"]
+    row["KQ"] = analysis["KQ"]
+    row["Circuit Depth"] = analysis["Circuit Depth"]
+    row["Gates"] = sum(analysis["Function List"].values())
+    row["Qubit"] = analysis["Qubit"]["Qubit"]
+
+    update_incumbent(row["KQ"])
+
+    if job["keep_result"]:
+        row["result"] = result
+
+    return row
+
+
+def rank_rows(rows, criterion):
+    """
+        function to sort the rows of the table by the criterion (kq, depth, gates)
+        ties are broken by the other criteria, pruned and failed jobs come last
+    """
+    list_keys = [RANK_CRITERIA[criterion]] +\
+        [key for name, key in RANK_CRITERIA.items() if name != criterion]
+
+    def key_function(row):
+        if "error" in row:
+            return (2, math.inf) + (math.inf,) * len(list_keys)
+        if row.get("pruned"):
+            return (1, row["KQ lower bound"]) + (math.inf,) * len(list_keys)
+        return (0, 0) + tuple(row[key] for key in list_keys)
+
+    return sorted(rows, key=key_function)
+
+
+def sweep_layouts(path_qasm, list_layout_sizes, **kwargs):
+    """
+        function to synthesize a protocol over the quantum chips of the given layout sizes
+        and architectures in parallel
+
+        the protocol is analyzed once in this process and shared with the workers
+        each worker runs an independent synthesis (which spawns its own traversal processes)
+
+        args:
+            path_qasm: path to the protocol (qasm) or the protocol prepared in advance
+            list_layout_sizes: [(height, width), (height, length, width), {"height": .., ..}, ..]
+
+        kwargs:
+            synthesis_option: options for the synthesis (required)
+            architectures: list of architectures (default : [2], see layoutbuilder)
+            qubit_table: initial mapping shared by all jobs
+            workers: number of worker processes (default : os.cpu_count(), 1 : no pool)
+            rank_by: kq, depth or gates (default : kq)
+            keep_result: keep the synthesis result in each row (default : True)
+            prune: skip the candidates whose KQ lower bound reaches the best KQ found
+                   (default : False, only with rank_by kq), a heuristic since the bound
+                   does not account for the cancelled gates (see compute_lower_bounds)
+                   the candidates are run in the increasing order of their bounds,
+                   the pending ones are cancelled, the started ones check the bound first
+            time_budget: time budget of a job in seconds (default : JOB_TIME_BUDGET,
+                         unless given by the synthesis option, see ftsynthesis.synthesize)
+
+        return:
+            the ranked table [{"layout_size", "architecture", "qchip", "KQ lower bound",
+                               "Diameter", "KQ", "Circuit Depth", "Gates", "Qubit", "result"}
+                              or {.., "pruned"} or {.., "error"}]
+    """
+    synthesis_option = kwargs.get("synthesis_option")
+    if synthesis_option is None:
+        raise Exception("Error ! Synthesis option is not provided.")
+
+    list_architectures = kwargs.get("architectures")
+    if list_architectures is None:
+        list_architectures = [layoutbuilder.RECTANGULAR]
+
+    qubit_table = kwargs.get("qubit_table")
+
+    workers = kwargs.get("workers")
+    if workers is None:
+        workers = os.cpu_count()
+
+    criterion = kwargs.get("rank_by")
+    if criterion is None:
+        criterion = "kq"
+
+    if criterion not in RANK_CRITERIA:
+        raise Exception(f"Error ! Rank criterion {criterion} is not supported.")
+
+    flag_keep_result = kwargs.get("keep_result")
+    if flag_keep_result is None:
+        flag_keep_result = True
+
+    flag_prune = kwargs.get("prune")
+    if flag_prune is None:
+        flag_prune = False
+
+    if flag_prune and criterion != "kq":
+        raise Exception("Error ! Pruning is supported only for the rank criterion kq.")
+
+    # the jobs are bounded in time, since the smallest chips (run first with pruning)
+    # may not be routed at all
+    time_budget = kwargs.get("time_budget")
+    if time_budget is None:
+        time_budget = JOB_TIME_BUDGET
+
+    if synthesis_option.get("time_budget") is None:
+        synthesis_option = dict(synthesis_option, time_budget=time_budget)
+
+    protocol = ftsynthesis.prepare_protocol(path_qasm)
+
+    critical_path_depth = DirectedAcyclicGraph.get_critical_path_depth(
+        DirectedAcyclicGraph.createDAG(protocol["qasm_commands"])["DAG"])
+
+    list_jobs = []
+    for layout_size, architecture in itertools.product(list_layout_sizes, list_architectures):
+        qchip = layoutbuilder.generate_qchip(layout_size, architecture=architecture)
+
+        list_jobs.append({"qchip": qchip,
+                          "layout_size": qchip["dimension"],
+                          "qchip_size": len(qchip["qubit_connectivity"]),
+                          "bounds": compute_lower_bounds(critical_path_depth, qchip),
+                          "architecture": architecture,
+                          "synthesis_option": synthesis_option,
+                          "qubit_table": qubit_table,
+                          "keep_result": flag_keep_result})
+
+    incumbent = None
+    if flag_prune:
+        list_jobs.sort(key=lambda job: job["bounds"]["KQ"])
+        incumbent = multiprocessing.Value("d", math.inf)
+
+    if workers == 1:
+        initialize_worker(protocol, incumbent)
+        rows = [run_sweep_job(job) for job in list_jobs]
+
+    else:
+        rows = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(list_jobs)) or 1,
+                                 initializer=initialize_worker,
+                                 initargs=(protocol, incumbent)) as executor:
+            futures = {executor.submit(run_sweep_job, job): job for job in list_jobs}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+
+                rows.append(future.result())
+
+                # cancel the pending candidates that cannot beat the incumbent
+                if flag_prune:
+                    for pending, job in futures.items():
+                        if not pending.done() and job["bounds"]["KQ"] >= incumbent.value\
+                                and pending.cancel():
+                            rows.append(dict(new_row(job), pruned=True))
+
+    return rank_rows(rows, criterion)
@@ -0,0 +1,309 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module to run a pipeline of protocol syntheses (e.g., a FTQC library) declared as a DAG
+
+    a stage is declared as a dictionary
+        protocol : path to the protocol (qasm)
+        layout_size : size of the quantum chip (see layoutbuilder)
+        architecture : architecture of the quantum chip (default : 2)
+        synthesis_option : options for the synthesis
+        qubit_table : initial mapping (optional)
+        depends : names of the stages that the stage depends on (optional)
+        prepare : function (results of the dependencies) -> items to update the stage (optional)
+                  e.g., the qubit table from the data qubit layout of a dependency
+
+    the stages whose dependencies are done are synthesized concurrently, and the result of
+    each stage is cached by the hash of its inputs (protocol, chip, options, qubit table)
+'''
+
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import networkx as nx
+import simplejson as json
+
+import ftsynthesis
+import layoutbuilder
+import streamexport
+
+
+def create_stage_graph(stages):
+    """
+        function to create the DAG of the stages from their dependencies
+    """
+    stage_graph = nx.DiGraph()
+    stage_graph.add_nodes_from(stages.keys())
+
+    for name, stage in stages.items():
+        for dependency in stage.get("depends", []):
+            if dependency not in stages:
+                raise Exception(f"Error ! The stage {name} depends on an unknown stage {dependency}.")
+            stage_graph.add_edge(dependency, name)
+
+    if not nx.is_directed_acyclic_graph(stage_graph):
+        raise Exception("Error ! The dependencies of the stages have a cycle.")
+
+    return stage_graph
+
+
+def resolve_stage(stage, results):
+    """
+        function to resolve the inputs of a stage from the results of its dependencies
+    """
+    resolved = {key: value for key, value in stage.items() if key not in ["prepare", "depends"]}
+
+    prepare = stage.get("prepare")
+    if prepare is not None:
+        resolved.update(prepare({dependency: results[dependency]
+                                 for dependency in stage.get("depends", [])}))
+
+    if resolved.get("architecture") is None:
+        resolved["architecture"] = layoutbuilder.RECTANGULAR
+
+    return resolved
+
+
+def hash_stage(resolved, qchip):
+    """
+        function to compute the cache key of a stage from its inputs
+    """
+    with open(resolved["protocol"], "rb") as infile:
+        protocol_digest = hashlib.sha256(infile.read()).hexdigest()
+
+    qubit_table = resolved.get("qubit_table")
+    if qubit_table is not None:
+        qubit_table = {str(qubit): int(position) for qubit, position in qubit_table.items()}
+
+    canonical = json.dumps({"protocol": protocol_digest,
+                            "qchip": streamexport.fingerprint_qchip(qchip),
+                            "synthesis_option": resolved.get("synthesis_option"),
+                            "qubit_table": qubit_table},
+                           sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def run_stage(job):
+    """
+        function to synthesize a stage and write its result into the cache
+    """
+    # the workers run in parallel, so that no progress is shown on the console
+    result = ftsynthesis.synthesize(job["protocol"], job["qchip"],
+                                    synthesis_option=job["synthesis_option"],
+                                    qubit_table=job["qubit_table"],
+                                    listeners=[])
+
+    with open(job["path_result"], "w", encoding="utf-8") as outfile:
+        json.dump(result, outfile, sort_keys=True, indent=4, separators=(',', ':'))
+
+    return job["name"]
+
+
+def load_stage_result(path_result):
+    """
+        function to load the result of a stage from the cache
+    """
+    with open(path_result, "r", encoding="utf-8") as infile:
+        return json.load(infile)
+
+
+def run_pipeline(stages, **kwargs):
+    """
+        function to run the stages of a pipeline
+
+        kwargs:
+            cache_dir: directory for the cached results (default : DB-Pipeline)
+            workers: number of worker processes (default : os.cpu_count())
+            force: names of the stages to be re-synthesized regardless of the cache
+
+        return:
+            {"results": {stage: result}, "keys": {stage: cache key},
+             "cached": [stages from the cache], "executed": [stages synthesized]}
+    """
+    cache_dir = kwargs.get("cache_dir")
+    if cache_dir is None:
+        cache_dir = "DB-Pipeline"
+
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    workers = kwargs.get("workers")
+    if workers is None:
+        workers = os.cpu_count()
+
+    list_forced = kwargs.get("force")
+    if list_forced is None:
+        list_forced = []
+
+    stage_graph = create_stage_graph(stages)
+
+    results = {}
+    keys = {}
+    list_cached = []
+    list_executed = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {}
+
+        while len(results) < len(stages):
+            # stages whose dependencies are all done
+            list_ready = [name for name in nx.topological_sort(stage_graph)
+                          if name not in results and name not in running.values()
+                          and all(dependency in results
+                                  for dependency in stage_graph.predecessors(name))]
+
+            for name in list_ready:
+                resolved = resolve_stage(stages[name], results)
+
+                qchip = layoutbuilder.generate_qchip(resolved["layout_size"],
+                                                     architecture=resolved["architecture"])
+
+                keys[name] = hash_stage(resolved, qchip)
+                path_result = os.path.join(cache_dir, f"{name}-{keys[name]}.json")
+
+                if os.path.exists(path_result) and name not in list_forced:
+                    results[name] = load_stage_result(path_result)
+                    list_cached.append(name)
+                    continue
+
+                job = {"name": name,
+                       "protocol": resolved["protocol"],
+                       "qchip": qchip,
+                       "synthesis_option": resolved["synthesis_option"],
+                       "qubit_table": resolved.get("qubit_table"),
+                       "path_result": path_result}
+
+                running[executor.submit(run_stage, job)] = name
+
+            # the stages from the cache may have made other stages ready
+            if not running:
+                continue
+
+            done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                future.result()
+
+                results[name] = load_stage_result(
+                    os.path.join(cache_dir, f"{name}-{keys[name]}.json"))
+                list_executed.append(name)
+
+    return {"results": results, "keys": keys,
+            "cached": list_cached, "executed": list_executed}
+
+
+def extract_data_layout(result):
+    """
+        function to extract the positions of the data qubits from a stage result
+    """
+    return {qubit: position
+            for qubit, position in result["system_code"]["initial_mapping"].items()
+            if "data" in qubit}
+
+
+def merge_logical_layouts(mapping1, mapping2, direction, layout_size, **kwargs):
+    """
+        function to merge the layouts of two logical qubits (LQ1, LQ2) into an extended layout
+
+        kwargs:
+            rename2: function to rename the qubits of the second layout (e.g., data -> magic)
+    """
+    rename2 = kwargs.get("rename2")
+    if rename2 is None:
+        rename2 = lambda qubit: qubit
+
+    return layoutbuilder.merge_layouts(
+        {f"LQ1-{qubit}": position for qubit, position in mapping1.items()},
+        {f"LQ2-{rename2(qubit)}": position for qubit, position in mapping2.items()},
+        direction, layout_size)
+
+
+def extend_layout_size(layout_size, direction):
+    """
+        function to double a layout size in the direction (vertical or horizon)
+    """
+    grid_shape = (2, 1) if direction == "vertical" else (1, 2)
+
+    return layoutbuilder.generate_tiled_qchip(layout_size, grid_shape)["dimension"]
+
+
+def build_ftqc_library_stages(ftqc_protocol, stabilizer_measure, layout_size, synthesis_option):
+    """
+        function to declare the stages of a FTQC library (see tests/test_steane.py)
+            stabilizer measurement -> PrepZ (with the data qubit layout), logical CNOT
+            Prepare_Magic_State (independent) -> logical T (with the data qubit layout)
+
+        args:
+            ftqc_protocol: {protocol name: path to the protocol}
+            stabilizer_measure: name of the stabilizer measurement protocol
+            layout_size: size of the layout for a logical qubit
+            synthesis_option: options for the synthesis (moveback is set per stage)
+    """
+    option_moveback = dict(synthesis_option, moveback=True)
+    option_no_moveback = dict(synthesis_option, moveback=False)
+
+    def rename_magic(qubit):
+        return qubit.replace("data", "magic")
+
+    stages = {stabilizer_measure: {"protocol": ftqc_protocol[stabilizer_measure],
+                                   "layout_size": layout_size,
+                                   "synthesis_option": synthesis_option},
+
+              "PrepZ": {"protocol": ftqc_protocol["PrepZ"],
+                        "layout_size": layout_size,
+                        "synthesis_option": synthesis_option,
+                        "depends": [stabilizer_measure],
+                        "prepare": lambda results: {"qubit_table":
+                            extract_data_layout(results[stabilizer_measure])}},
+
+              "Prepare_Magic_State": {"protocol": ftqc_protocol["Prepare_Magic_State"],
+                                      "layout_size": layout_size,
+                                      "synthesis_option": option_no_moveback}}
+
+    for direction in ["vertical", "horizon"]:
+        extended_layout_size = extend_layout_size(layout_size, direction)
+
+        def prepare_cnot(results, direction=direction):
+            data_layout = results[stabilizer_measure]["system_code"]["initial_mapping"]
+            return {"qubit_table": merge_logical_layouts(data_layout, data_layout,
+                                                         direction, layout_size)}
+
+        def prepare_t(results, direction=direction, flag_d2m=True):
+            data_layout = results[stabilizer_measure]["system_code"]["initial_mapping"]
+            magic_layout = results["Prepare_Magic_State"]["system_code"]["final_mapping"]
+            if flag_d2m:
+                qubit_table = merge_logical_layouts(data_layout, magic_layout, direction,
+                                                    layout_size, rename2=rename_magic)
+            else:
+                qubit_table = layoutbuilder.merge_layouts(
+                    {f"LQ2-{rename_magic(qubit)}": position
+                     for qubit, position in magic_layout.items()},
+                    {f"LQ1-{qubit}": position for qubit, position in data_layout.items()},
+                    direction, layout_size)
+            return {"qubit_table": qubit_table}
+
+        stages[f"CNOT-{direction}"] = {"protocol": ftqc_protocol["CNOT"],
+                                       "layout_size": extended_layout_size,
+                                       "synthesis_option": option_moveback,
+                                       "depends": [stabilizer_measure],
+                                       "prepare": prepare_cnot}
+
+        for suffix, flag_d2m in [("d2m", True), ("m2d", False)]:
+            stages[f"T-{direction}-{suffix}"] = {
+                "protocol": ftqc_protocol["T"],
+                "layout_size": extended_layout_size,
+                "synthesis_option": option_moveback,
+                "depends": [stabilizer_measure, "Prepare_Magic_State"],
+                "prepare": lambda results, prepare=prepare_t, flag=flag_d2m:
+                    prepare(results, flag_d2m=flag)}
+
+    return stages
@@ -0,0 +1,224 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module to optimize the initial qubit placement before the synthesis trials
+    (synthesis_option "initial_mapping_option": "annealing")
+
+    a placement is scored by the sum of the distances between the qubits of the 2-qubit gates
+    of the protocol weighted by the number of the gates (interaction graph), and the scores of
+    all the chains are evaluated at once with numpy over the distance matrix
+
+    the chains of the simulated annealing run together at the temperatures in a geometric
+    ladder (parallel tempering) : a chain proposes to exchange the positions of an algorithm
+    qubit and another qubit (an algorithm qubit or an empty position), and the neighboring
+    chains exchange their placements from time to time, so that the cold chains refine
+    the placements found by the hot chains
+
+    the distinct placements of the least score are handed to the trials as initial mappings,
+    the unused positions are taken by the dummy qubits as qubitmapping.initialize_qubit_mapping
+'''
+
+import collections
+
+import numpy as np
+
+import globalVariable as g
+
+
+def build_interaction_graph(list_qasm_commands, list_algorithm_qubits):
+    """
+        function to build the interaction graph of the protocol
+        an edge is a pair of the qubits acting together in 2-qubit gates (CNOT, CZ, SWAP)
+        and its weight is the number of the gates
+
+        return: {"first", "second" (indices into list_algorithm_qubits), "weights"}
+    """
+    g.ensure_globals()
+
+    table_index = {qubit: index for index, qubit in enumerate(list_algorithm_qubits)}
+
+    interactions = collections.defaultdict(int)
+    for command in list_qasm_commands:
+        if command[0] not in [g.str_gate_cnot, g.str_gate_cz, g.str_gate_swap]:
+            continue
+
+        pair = tuple(sorted([table_index[command[1]], table_index[command[2]]]))
+        interactions[pair] += 1
+
+    return {"first": np.array([pair[0] for pair in interactions], dtype=np.int64),
+            "second": np.array([pair[1] for pair in interactions], dtype=np.int64),
+            "weights": np.array(list(interactions.values()), dtype=np.float64)}
+
+
+def score_placements(placements, interaction_graph, distance):
+    """
+        function to score the placements (rows : the positions of the algorithm qubits)
+        by the distances of the interaction graph weighted by the number of the gates
+    """
+    return (distance[placements[:, interaction_graph["first"]],
+                     placements[:, interaction_graph["second"]]]
+            * interaction_graph["weights"]).sum(axis=1)
+
+
+def anneal_placements(list_qasm_commands, list_algorithm_qubits, distance_matrix, **kwargs):
+    """
+        function to search the initial placements by the parallel tempering
+
+        args:
+            list_qasm_commands: the qasm commands of the protocol (ftsynthesis.prepare_protocol)
+            list_algorithm_qubits: the qubits of the protocol
+            distance_matrix: distance matrix of the quantum chip
+
+        kwargs:
+            top_k: the number of the placements returned (default : 10)
+            chains: the number of the chains (default : 8)
+            steps: the number of the steps of a chain (default : 2000)
+            exchange_interval: the steps between the exchanges of the chains (default : 10)
+            fixed_qubits: the qubits fixed at their positions (default : None)
+            seed: seed of the random number generator (default : None)
+
+        return: list of the placements {qubit: position} (the least score first)
+                including the dummy qubits, and the list of their scores
+    """
+    top_k = kwargs.get("top_k")
+    if top_k is None:
+        top_k = 10
+
+    number_chains = kwargs.get("chains")
+    if number_chains is None:
+        number_chains = 8
+
+    number_steps = kwargs.get("steps")
+    if number_steps is None:
+        number_steps = 2000
+
+    exchange_interval = kwargs.get("exchange_interval")
+    if exchange_interval is None:
+        exchange_interval = 10
+
+    fixed_qubits = kwargs.get("fixed_qubits")
+    if fixed_qubits is None:
+        fixed_qubits = {}
+
+    generator = np.random.default_rng(kwargs.get("seed"))
+
+    distance = np.asarray(distance_matrix, dtype=np.float64)
+    qchip_size = len(distance)
+    number_qubits = len(list_algorithm_qubits)
+
+    if number_qubits > qchip_size:
+        raise Exception(f"Error ! The number of the qubits ({number_qubits}) exceeds the size "
+                        f"of the quantum chip ({qchip_size}).")
+
+    interaction_graph = build_interaction_graph(list_qasm_commands, list_algorithm_qubits)
+
+    # a chain is a permutation of the physical positions :
+    #   the columns [0, number_qubits) are the positions of the algorithm qubits
+    #   and the others are the empty positions
+    fixed_columns = [index for index, qubit in enumerate(list_algorithm_qubits)
+                     if qubit in fixed_qubits]
+    free_positions = sorted(set(range(qchip_size)) -
+                            set(fixed_qubits[list_algorithm_qubits[index]]
+                                for index in fixed_columns))
+
+    movable_columns = np.array([index for index in range(number_qubits)
+                                if index not in fixed_columns], dtype=np.int64)
+    other_columns = np.array([index for index in range(qchip_size)
+                              if index not in fixed_columns], dtype=np.int64)
+
+    permutations = np.empty((number_chains, qchip_size), dtype=np.int64)
+    for index in fixed_columns:
+        permutations[:, index] = fixed_qubits[list_algorithm_qubits[index]]
+
+    for chain in range(number_chains):
+        permutations[chain, other_columns] = generator.permutation(free_positions)
+
+    scores = score_placements(permutations[:, :number_qubits], interaction_graph, distance)
+
+    # the placements of the least score found so far (distinct placements)
+    table_best = {}
+
+    def record(permutations, scores):
+        for chain in range(number_chains):
+            key = tuple(permutations[chain, :number_qubits].tolist())
+            table_best[key] = scores[chain]
+
+        if len(table_best) > 4 * top_k:
+            for key in sorted(table_best, key=table_best.get)[4 * top_k:]:
+                del table_best[key]
+
+    record(permutations, scores)
+
+    # nothing to optimize : no interaction, or no qubit to move
+    if not len(interaction_graph["weights"]) or not len(movable_columns):
+        number_steps = 0
+
+    def propose(permutations):
+        # a movable algorithm qubit exchanges its position with another qubit or an empty one
+        # (the same column leaves the placement as it is)
+        rows = np.arange(number_chains)
+        first = movable_columns[generator.integers(len(movable_columns), size=number_chains)]
+        second = other_columns[generator.integers(len(other_columns), size=number_chains)]
+
+        proposals = permutations.copy()
+        proposals[rows, first] = permutations[rows, second]
+        proposals[rows, second] = permutations[rows, first]
+
+        return proposals
+
+    # the temperatures span from the mean change of the score by a random move
+    # down to a hundredth of it
+    if number_steps:
+        sample = score_placements(propose(permutations)[:, :number_qubits], interaction_graph,
+                                  distance)
+        temperature_high = max(float(np.abs(sample - scores).mean()), 1.0)
+        temperatures = temperature_high * np.geomspace(1.0, 0.01, number_chains)
+
+    for step in range(number_steps):
+        proposals = propose(permutations)
+        proposal_scores = score_placements(proposals[:, :number_qubits], interaction_graph,
+                                           distance)
+
+        # Metropolis acceptance per chain
+        accepted = generator.random(number_chains) <\
+            np.exp(np.minimum(0.0, (scores - proposal_scores) / temperatures))
+
+        permutations[accepted] = proposals[accepted]
+        scores = np.where(accepted, proposal_scores, scores)
+
+        # exchange of the placements between the neighboring temperatures
+        # (the even pairs and the odd pairs in turn)
+        if (step + 1) % exchange_interval == 0:
+            record(permutations, scores)
+
+            for lower in range((step // exchange_interval) % 2, number_chains - 1, 2):
+                upper = lower + 1
+                exponent = (scores[lower] - scores[upper]) *\
+                    (1 / temperatures[lower] - 1 / temperatures[upper])
+
+                if generator.random() < np.exp(min(0.0, exponent)):
+                    permutations[[lower, upper]] = permutations[[upper, lower]]
+                    scores[[lower, upper]] = scores[[upper, lower]]
+
+    record(permutations, scores)
+
+    list_placements = []
+    list_scores = []
+    for key in sorted(table_best, key=table_best.get)[:top_k]:
+        placement = dict(zip(list_algorithm_qubits, key))
+
+        # the empty positions are taken by the dummy qubits
+        list_empty = sorted(set(range(qchip_size)) - set(key))
+        placement.update({f"dummy{i}": position for i, position in enumerate(list_empty)})
+
+        list_placements.append(placement)
+        list_scores.append(float(table_best[key]))
+
+    return list_placements, list_scores
@@ -0,0 +1,274 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module to generate synthetic fault-tolerant protocols (qasm) of a configurable scale
+    for stress tests and benchmarks
+
+    a protocol has logical blocks (LQ1, LQ2, ..) of a CSS code (steane or golay) and
+    repeats rounds of Steane-style syndrome extraction :
+        the ancilla block is encoded (H on the pivots, CNOT from the pivots) and verified
+        by a checkup qubit, Barrier-All, the data block and the ancilla block interact
+        transversally, the ancilla block is measured, Barrier-All
+    the Z and X syndromes alternate, and the rounds may have a transversal logical CNOT
+    between two random blocks
+
+    the data qubits return to their homebase by the moveback of the synthesis
+    (synthesis_option "moveback"), as the protocols in tests/DB-QASM
+
+    the lines are yielded one by one, so that a protocol of millions of gates is written
+    without holding it in memory
+'''
+
+import sys
+import random
+import argparse
+
+import globalVariable as g
+
+# generators (rows of the parity check matrix) of the CSS codes
+#   steane : [7, 4] Hamming code
+#   golay : cyclic shifts of the generator polynomial of the [23, 12] Golay code
+GOLAY_POLYNOMIAL = [1, 0, 1, 0, 1, 1, 1, 0, 0, 0, 1, 1]
+
+CODES = {"steane": {"size": 7,
+                    "generators": [[1, 0, 1, 0, 1, 0, 1],
+                                   [0, 1, 1, 0, 0, 1, 1],
+                                   [0, 0, 0, 1, 1, 1, 1]]},
+         "golay": {"size": 23,
+                   "generators": [[0] * shift + GOLAY_POLYNOMIAL + [0] * (11 - shift)
+                                  for shift in range(11)]}}
+
+
+def reduce_generators(generators):
+    """
+        function to reduce the generators into the systematic form over GF(2)
+        return: [(pivot, [the other qubits of the support])] (the pivots appear only once)
+    """
+    rows = [list(row) for row in generators]
+    size = len(rows[0])
+
+    list_pivots = []
+    rank = 0
+    for column in range(size):
+        pivot_row = next((idx for idx in range(rank, len(rows)) if rows[idx][column]), None)
+        if pivot_row is None:
+            continue
+
+        rows[rank], rows[pivot_row] = rows[pivot_row], rows[rank]
+        for idx in range(len(rows)):
+            if idx != rank and rows[idx][column]:
+                rows[idx] = [a ^ b for a, b in zip(rows[idx], rows[rank])]
+
+        list_pivots.append(column)
+        rank += 1
+        if rank == len(rows):
+            break
+
+    return [(pivot, [column for column in range(size) if rows[idx][column] and column != pivot])
+            for idx, pivot in enumerate(list_pivots)]
+
+
+def get_block_qubits(block, code_size):
+    """
+        function to name the qubits of a logical block (LQ1, LQ2, ..)
+    """
+    prefix = f"LQ{block + 1}-"
+    return {"data": [f"{prefix}data{idx}" for idx in range(code_size)],
+            "syndrome": [f"{prefix}syndrome{idx}" for idx in range(code_size)],
+            "checkup": f"{prefix}checkup0",
+            "bits": [f"{prefix}bit{idx}" for idx in range(code_size)],
+            "checkbit": f"{prefix}checkbit0"}
+
+
+def iterate_round_lines(qubits, encoder, basis):
+    """
+        generator of the lines of a syndrome extraction round of a block
+        basis : "Z" (CNOT data -> syndrome) or "X" (CNOT syndrome -> data, measured in X)
+    """
+    for qubit in qubits["syndrome"] + [qubits["checkup"]]:
+        yield f"{g.str_gate_prepz} {qubit}"
+
+    # encoding of the ancilla block
+    for pivot, _ in encoder:
+        yield f"{g.str_gate_h} {qubits['syndrome'][pivot]}"
+
+    for pivot, targets in encoder:
+        for target in targets:
+            yield f"{g.str_gate_cnot} {qubits['syndrome'][pivot]},{qubits['syndrome'][target]}"
+
+    # verification of the ancilla block by the checkup qubit
+    yield f"{g.str_gate_h} {qubits['checkup']}"
+    for pivot, _ in encoder:
+        yield f"{g.str_gate_cnot} {qubits['checkup']},{qubits['syndrome'][pivot]}"
+    yield f"{g.str_gate_h} {qubits['checkup']}"
+    yield f"{g.str_gate_measz} {qubits['checkup']} -> {qubits['checkbit']}"
+
+    yield g.str_barrier_all
+
+    for data, syndrome in zip(qubits["data"], qubits["syndrome"]):
+        if basis == "Z":
+            yield f"{g.str_gate_cnot} {data},{syndrome}"
+        else:
+            yield f"{g.str_gate_cnot} {syndrome},{data}"
+
+    for syndrome, bit in zip(qubits["syndrome"], qubits["bits"]):
+        if basis == "X":
+            yield f"{g.str_gate_h} {syndrome}"
+        yield f"{g.str_gate_measz} {syndrome} -> {bit}"
+
+    yield g.str_barrier_all
+
+
+def iterate_protocol_lines(**kwargs):
+    """
+        generator of the lines of a synthetic protocol
+
+        kwargs:
+            code: steane or golay (default : steane)
+            blocks: number of the logical blocks (default : 1)
+            rounds: number of the syndrome extraction rounds (default : 1)
+            logical_cnot: probability of a transversal CNOT between two blocks per round
+                          (default : 0.5, with 2 blocks or more)
+            seed: seed of the random choices (default : 0)
+    """
+    code = kwargs.get("code")
+    if code is None:
+        code = "steane"
+
+    if code not in CODES:
+        raise Exception(f"Error ! Code {code} is not supported.")
+
+    blocks = kwargs.get("blocks")
+    if blocks is None:
+        blocks = 1
+
+    rounds = kwargs.get("rounds")
+    if rounds is None:
+        rounds = 1
+
+    logical_cnot = kwargs.get("logical_cnot")
+    if logical_cnot is None:
+        logical_cnot = 0.5
+
+    seed = kwargs.get("seed")
+    if seed is None:
+        seed = 0
+
+    generator = random.Random(seed)
+    code_size = CODES[code]["size"]
+    encoder = reduce_generators(CODES[code]["generators"])
+    list_blocks = [get_block_qubits(block, code_size) for block in range(blocks)]
+
+    for qubits in list_blocks:
+        for qubit in qubits["data"] + qubits["syndrome"] + [qubits["checkup"]]:
+            yield f"Qubit {qubit}"
+
+    for qubits in list_blocks:
+        for bit in qubits["bits"] + [qubits["checkbit"]]:
+            yield f"Cbit {bit}"
+
+    # the data blocks are prepared in the logical zero state
+    for qubits in list_blocks:
+        for qubit in qubits["data"]:
+            yield f"{g.str_gate_prepz} {qubit}"
+
+    for round_index in range(rounds):
+        basis = "Z" if round_index % 2 == 0 else "X"
+        for qubits in list_blocks:
+            yield from iterate_round_lines(qubits, encoder, basis)
+
+        if blocks > 1 and generator.random() < logical_cnot:
+            control, target = generator.sample(range(blocks), 2)
+            for data_control, data_target in zip(list_blocks[control]["data"],
+                                                 list_blocks[target]["data"]):
+                yield f"{g.str_gate_cnot} {data_control},{data_target}"
+
+            yield g.str_barrier_all
+
+
+def count_round_gates(code):
+    """
+        function to count the gates of a syndrome extraction round of a block
+    """
+    code_size = CODES[code]["size"]
+    encoder = reduce_generators(CODES[code]["generators"])
+
+    return sum(1 for line in iterate_round_lines(get_block_qubits(0, code_size), encoder, "X")
+               if line != g.str_barrier_all)
+
+
+def get_rounds_for_gates(gates, **kwargs):
+    """
+        function to compute the number of the rounds for about the given number of gates
+        kwargs:
+            code, blocks : see iterate_protocol_lines
+    """
+    code = kwargs.get("code")
+    if code is None:
+        code = "steane"
+
+    blocks = kwargs.get("blocks")
+    if blocks is None:
+        blocks = 1
+
+    return max(gates // (count_round_gates(code) * blocks), 1)
+
+
+def write_protocol(path_qasm, **kwargs):
+    """
+        function to write a synthetic protocol into a file
+        kwargs are passed to iterate_protocol_lines
+
+        return:
+            {"path", "lines", "gates", "qubits"}
+    """
+    lines = 0
+    gates = 0
+    qubits = 0
+
+    with open(path_qasm, "w", encoding="utf-8") as outfile:
+        for line in iterate_protocol_lines(**kwargs):
+            outfile.write(line + "\n")
+            lines += 1
+
+            if line.startswith("Qubit "):
+                qubits += 1
+            elif not line.startswith("Cbit ") and line != g.str_barrier_all:
+                gates += 1
+
+    return {"path": path_qasm, "lines": lines, "gates": gates, "qubits": qubits}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="synthetic fault-tolerant protocol (qasm)")
+    parser.add_argument("output", help="path to the protocol (.qasmf)")
+    parser.add_argument("--code", choices=list(CODES.keys()), default="steane")
+    parser.add_argument("--blocks", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=None)
+    parser.add_argument("--gates", type=int, default=None,
+                        help="about the number of the gates (instead of --rounds)")
+    parser.add_argument("--logical-cnot", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    number_rounds = arguments.rounds
+    if number_rounds is None:
+        if arguments.gates is not None:
+            number_rounds = get_rounds_for_gates(arguments.gates, code=arguments.code,
+                                                 blocks=arguments.blocks)
+        else:
+            number_rounds = 1
+
+    protocol_info = write_protocol(arguments.output, code=arguments.code,
+                                   blocks=arguments.blocks, rounds=number_rounds,
+                                   logical_cnot=arguments.logical_cnot, seed=arguments.seed)
+
+    print(f"{protocol_info['path']} : {protocol_info['qubits']} qubits, "
+          f"{protocol_info['gates']} gates, {protocol_info['lines']} lines", file=sys.stderr)
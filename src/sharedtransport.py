@@ -0,0 +1,158 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module for the transport of the read-only data of a synthesis to the traversal processes
+    through shared memory blocks (synthesis_option "transport" : "shared_memory")
+
+    the distance matrix (float64, row major) and the edge arrays of a compact DAG
+    (DirectedAcyclicGraph.CompactDAG) are copied once into the blocks, and a process attaches
+    them by their names and reads them in place (memoryviews) instead of receiving a copy
+
+    the owner (synthesize) keeps the blocks and releases them at the end (release_blocks),
+    a process detaches its views before it returns (detach_arguments)
+'''
+
+import array
+from multiprocessing import shared_memory
+
+import DirectedAcyclicGraph
+
+# arrays of a compact DAG placed in the blocks
+DAG_ARRAYS = ["successor_offsets", "successor_ids", "predecessor_offsets", "predecessor_ids"]
+
+
+def create_block(values, typecode, blocks):
+    """
+        function to copy the values into a new shared memory block (appended to blocks)
+        return: handle {"name", "typecode", "length"} to attach the block
+    """
+    if not isinstance(values, array.array) or values.typecode != typecode:
+        values = array.array(typecode, values)
+
+    size = len(values) * values.itemsize
+
+    # a block can not be empty
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    block.buf[:size] = memoryview(values).cast("B")
+    blocks.append(block)
+
+    return {"name": block.name, "typecode": typecode, "length": len(values)}
+
+
+def attach_block(handle, attachment):
+    """
+        function to attach a block and return its values as a memoryview
+        the block and the view are recorded in the attachment to detach them later
+    """
+    block = shared_memory.SharedMemory(name=handle["name"])
+
+    # the block may be larger than the values (an empty array has a block of 1 byte)
+    itemsize = array.array(handle["typecode"]).itemsize
+    view = block.buf[:handle["length"] * itemsize].cast(handle["typecode"])
+
+    attachment["blocks"].append(block)
+    attachment["views"].append(view)
+
+    return view
+
+
+def share_distance_matrix(matrix, blocks):
+    """
+        function to place a distance matrix (list of rows) into a shared memory block
+    """
+    size = len(matrix)
+    values = array.array("d", (value for row in matrix for value in row))
+
+    return {"shared": "distance_matrix", "size": size,
+            "values": create_block(values, "d", blocks)}
+
+
+def share_compact_dag(dag, blocks):
+    """
+        function to place the edge arrays of a compact DAG into shared memory blocks
+        the nodes are passed with the handles (they are read and updated as objects)
+    """
+    return {"shared": "dag", "nodes": dag.nodes,
+            "arrays": {key: create_block(getattr(dag, key), "l", blocks) for key in DAG_ARRAYS}}
+
+
+def is_shared(value):
+    """
+        function to check a value is a handle of the data in shared memory blocks
+    """
+    return isinstance(value, dict) and "shared" in value
+
+
+def attach_arguments(args):
+    """
+        function to attach the data in shared memory blocks of the arguments of a traversal
+        ("DM", "DAG") : the distance matrix as rows of memoryviews and the DAG as a CompactDAG
+        on the memoryviews
+
+        return: attachment {"arguments" (a copy with the attached data), "blocks", "views"}
+    """
+    attachment = {"arguments": args, "blocks": [], "views": []}
+
+    if not any(is_shared(args.get(key)) for key in ["DM", "DAG"]):
+        return attachment
+
+    arguments = dict(args)
+
+    shared_matrix = args.get("DM")
+    if is_shared(shared_matrix):
+        size = shared_matrix["size"]
+        values = attach_block(shared_matrix["values"], attachment)
+
+        # each row is a view on the block (distance[i][j] as the list of rows)
+        rows = [values[i * size:(i + 1) * size] for i in range(size)]
+        attachment["views"].extend(rows)
+        arguments["DM"] = rows
+
+    shared_dag = args.get("DAG")
+    if is_shared(shared_dag):
+        dag = DirectedAcyclicGraph.CompactDAG(shared_dag["nodes"])
+        dag.edge_parents = dag.edge_children = None
+
+        for key, handle in shared_dag["arrays"].items():
+            setattr(dag, key, attach_block(handle, attachment))
+
+        arguments["DAG"] = dag
+
+    attachment["arguments"] = arguments
+
+    return attachment
+
+
+def detach_arguments(attachment):
+    """
+        function to release the views and close the blocks attached by attach_arguments
+    """
+    attachment["arguments"] = None
+
+    # the rows (slices) are released before the views they are taken from
+    for view in reversed(attachment["views"]):
+        view.release()
+
+    for block in attachment["blocks"]:
+        block.close()
+
+    attachment["views"] = []
+    attachment["blocks"] = []
+
+
+def release_blocks(blocks):
+    """
+        function to close and remove the blocks created by the owner
+    """
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+    del blocks[:]
@@ -0,0 +1,144 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module to export a synthesis result by streaming the time ordered circuit
+'''
+
+import hashlib
+import os
+
+import simplejson as json
+
+import formatconversion
+
+# number of time steps written at once (default)
+CHUNK_SIZE = 256
+
+
+def fingerprint_qchip(qchip):
+    """
+        function to compute the fingerprint of a quantum chip from its qubit connectivity
+        and dimension, the connectivity is canonicalized (int keys, sorted neighbors)
+    """
+    connectivity = {int(qubit): sorted(int(neighbor) for neighbor in neighbors)
+                    for qubit, neighbors in qchip["qubit_connectivity"].items()}
+
+    canonical = json.dumps({"qubit_connectivity": [connectivity[qubit]
+                                                   for qubit in sorted(connectivity)],
+                            "dimension": qchip.get("dimension")},
+                           sort_keys=True, separators=(',', ':'))
+
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def reference_qchip(qchip):
+    """
+        function to form the reference of a quantum chip written instead of the chip itself
+    """
+    return {"fingerprint": fingerprint_qchip(qchip),
+            "device_name": qchip.get("device_name"),
+            "dimension": qchip.get("dimension")}
+
+
+def iterate_rendered_steps(circuit):
+    """
+        generator to yield (time index, [instructions in string]) step by step
+        a step of the columnar form is rendered only when it is written
+    """
+    if isinstance(circuit, dict) and "opcodes" in circuit:
+        for time_index, instructions in formatconversion.iterate_ordered_syscode(circuit):
+            yield time_index, [formatconversion.render_instruction(inst)
+                               for inst in instructions]
+    else:
+        for time_index in sorted(circuit.keys(), key=int):
+            yield time_index, circuit[time_index]
+
+
+def flush_sink(sink):
+    """
+        function to flush a sink if it supports flush
+    """
+    flush = getattr(sink, "flush", None)
+    if flush is not None:
+        flush()
+
+
+def write_circuit(circuit, outfile, chunk_size):
+    """
+        function to write a circuit as a json object, chunk_size time steps at a time
+    """
+    outfile.write("{")
+
+    chunk = []
+    separator = ""
+    for time_index, instructions in iterate_rendered_steps(circuit):
+        chunk.append(f"{separator}\n{json.dumps(str(time_index))}:{json.dumps(instructions)}")
+        separator = ","
+
+        if len(chunk) >= chunk_size:
+            outfile.write("".join(chunk))
+            flush_sink(outfile)
+            chunk = []
+
+    outfile.write("".join(chunk))
+    outfile.write("\n}")
+
+
+def export_result(result, sink, **kwargs):
+    """
+        function to write a synthesis result into a file path or a file-like sink (text mode)
+        the time steps of the circuit are streamed to the sink in chunks, and the quantum chip
+        is referenced by its fingerprint instead of being embedded
+
+        kwargs:
+            chunk_size: number of time steps written at once (default : 256)
+            embed_qchip: embed the quantum chip as it is (default : False)
+    """
+    chunk_size = kwargs.get("chunk_size")
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+
+    flag_embed_qchip = kwargs.get("embed_qchip")
+    if flag_embed_qchip is None:
+        flag_embed_qchip = False
+
+    if isinstance(sink, (str, os.PathLike)):
+        with open(sink, "w", encoding="utf-8") as outfile:
+            export_result(result, outfile, chunk_size=chunk_size,
+                          embed_qchip=flag_embed_qchip)
+        return
+
+    outfile = sink
+    outfile.write("{")
+
+    for idx, key in enumerate(sorted(result.keys())):
+        value = result[key]
+        outfile.write(f"{',' if idx else ''}\n{json.dumps(key)}:")
+
+        if key == "qchip" and not flag_embed_qchip:
+            outfile.write(json.dumps(reference_qchip(value), sort_keys=True))
+
+        elif key == "system_code":
+            outfile.write("{")
+            for sub_idx, sub_key in enumerate(sorted(value.keys())):
+                outfile.write(f"{',' if sub_idx else ''}\n{json.dumps(sub_key)}:")
+
+                if sub_key == "circuit":
+                    write_circuit(value[sub_key], outfile, chunk_size)
+                else:
+                    outfile.write(json.dumps(value[sub_key], sort_keys=True))
+
+            outfile.write("\n}")
+
+        else:
+            outfile.write(json.dumps(value, sort_keys=True))
+
+    outfile.write("\n}\n")
+    flush_sink(outfile)
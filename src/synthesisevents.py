@@ -0,0 +1,213 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module for the events of a synthesis, delivered to listeners (callables)
+
+    a listener is called with an event dictionary {"event": name, "time": .., ..}
+    the events of ftsynthesis.synthesize :
+        synthesis_start : {"iteration"}
+        parse, distance_matrix, dag : {"wall", "cpu"}
+        annealing : {"placements", "scores", "wall", "cpu"} the initial placements optimized
+                    in advance (initial_mapping_option "annealing")
+        moveback : {"qubits"} the data qubits moved back at the end of the circuit
+        trial_start : {"trial"}
+        forward, backward, forward_write : {"trial", "wall", "cpu"}
+                                           (the traversals run in child processes,
+                                            "cpu" includes the cpu time of the children)
+        trial_killed : {"trial", "phase", "time_limit", "wall", "cpu"}
+        rounds : {"trial", "rounds", "cost", "converged"} the SABRE rounds of a trial
+                 (synthesis_option "sabre_rounds"), the traversals of the next rounds and
+                 their trial_killed have "round"
+        traversal_cache : {"trial", "hit"} the lookup of the memo table of the traversals
+                          (synthesis_option "traversal_cache")
+        scoring : {"trial", "wall", "cpu", "cost", "best_cost", "improved"}
+        trial_done : {"trial", "wall", "cpu"}
+        checkup : {"wall", "cpu", "violations"}
+        synthesis_done : {"wall", "cpu", "trials", "killed", "best_cost"}
+    in the segmented synthesis (synthesis_option "segmented"), synthesis_start has "windows",
+    the traversal events and trial_killed have "window", trial_done is sent for each candidate
+    (without the time) and the end of a window is :
+        window_done : {"window", "windows", "candidates", "best_cost", "wall", "cpu"}
+
+    console_listener (the progress bar and the messages on the console) is the default
+    listener, and collect_metrics builds a listener that aggregates the events into metrics
+'''
+
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_cpu_time():
+    """
+        function to return the cpu time of this process and its terminated children
+    """
+    cpu_time = time.process_time()
+
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu_time += usage.ru_utime + usage.ru_stime
+
+    return cpu_time
+
+
+def get_peak_memory(previous=None):
+    """
+        function to return the peak resident set size (MB) of this process and of
+        the largest terminated child (e.g., a graph traversal) since the start of the process
+
+        the peaks are process-wide high-water marks (ru_maxrss cannot be reset), so that
+        with the peaks read before (previous), "raised" tells whether each peak has been
+        raised since then (otherwise the peak of that period is not known, it is lower)
+    """
+    if resource is None:
+        peak_memory = {"process": None, "children": None}
+
+    else:
+        # ru_maxrss is in kilobytes (bytes on macOS)
+        unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+        peak_memory = {"process": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+                       "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit}
+
+    if previous is not None:
+        peak_memory["raised"] = {key: peak_memory[key] is not None and
+                                 peak_memory[key] > previous[key]
+                                 for key in ["process", "children"]}
+
+    return peak_memory
+
+
+def start_stopwatch():
+    """
+        function to start a stopwatch of the wall and cpu time
+    """
+    return {"wall": time.perf_counter(), "cpu": get_cpu_time()}
+
+
+def read_stopwatch(stopwatch):
+    """
+        function to read the wall and cpu time elapsed from the start of a stopwatch
+    """
+    return {"wall": time.perf_counter() - stopwatch["wall"],
+            "cpu": get_cpu_time() - stopwatch["cpu"]}
+
+
+def emit(listeners, event, **kwargs):
+    """
+        function to deliver an event to the listeners
+    """
+    if not listeners:
+        return
+
+    message = {"event": event, "time": time.time()}
+    message.update(kwargs)
+
+    for listener in listeners:
+        listener(message)
+
+
+def console_listener(**kwargs):
+    """
+        function to create the console listener : the progress bar of the trials and
+        the messages of the synthesis (move-back qubits, time limit)
+
+        kwargs:
+            stream: stream for the messages (default : sys.stdout)
+    """
+    stream = kwargs.get("stream")
+    if stream is None:
+        stream = sys.stdout
+
+    state = {"bar": None}
+
+    def listener(message):
+        event = message["event"]
+
+        if event == "synthesis_start":
+            from progress.bar import Bar
+
+            # the progress of the segmented synthesis is counted by the windows
+            if message.get("windows") is not None:
+                state["bar"] = Bar('Progress', max=message["windows"])
+                state["step"] = "window_done"
+            else:
+                state["bar"] = Bar('Progress', max=message["iteration"])
+                state["step"] = "trial_done"
+
+        elif event == "moveback":
+            print("list of the qubits for move-back : ", message["qubits"], file=stream)
+
+        elif event == "trial_killed":
+            print(" time limit !", file=stream)
+
+        elif event == state.get("step") and state["bar"] is not None:
+            state["bar"].next()
+
+        elif event == "synthesis_done" and state["bar"] is not None:
+            state["bar"].finish()
+
+    return listener
+
+
+def new_metrics():
+    """
+        function to create the metrics aggregated by collect_metrics
+    """
+    return {"trials": 0,
+            "killed": 0,
+            "killed_phases": {},
+            "phases": {},
+            "best_cost": [],
+            "wall": None,
+            "cpu": None}
+
+
+def collect_metrics(metrics):
+    """
+        function to create a listener that aggregates the events into the metrics
+            trials, killed (per phase), time per phase {"count", "wall", "cpu"},
+            best cost over time [(seconds from the start, cost)], total wall and cpu time
+    """
+    state = {"start": None}
+
+    def listener(message):
+        event = message["event"]
+
+        if event == "synthesis_start":
+            state["start"] = message["time"]
+
+        elif event == "trial_done":
+            metrics["trials"] += 1
+
+        elif event == "trial_killed":
+            metrics["killed"] += 1
+            metrics["killed_phases"][message["phase"]] =\
+                metrics["killed_phases"].get(message["phase"], 0) + 1
+
+        elif event == "synthesis_done":
+            metrics["wall"] = message["wall"]
+            metrics["cpu"] = message["cpu"]
+
+        if event == "scoring" and message["improved"]:
+            metrics["best_cost"].append((message["time"] - (state["start"] or message["time"]),
+                                         message["cost"]))
+
+        if "wall" in message and event not in ["trial_done", "window_done", "synthesis_done"]:
+            phase = metrics["phases"].setdefault(event, {"count": 0, "wall": 0.0, "cpu": 0.0})
+            phase["count"] += 1
+            phase["wall"] += message["wall"]
+            phase["cpu"] += message["cpu"]
+
+    return listener
@@ -0,0 +1,348 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module for a long-running local synthesis server (unix domain socket)
+
+    the server keeps the prepared quantum chips (with their distance matrices) and
+    the prepared protocols in LRU caches, so that a job pays only for the synthesis itself
+
+    the server is multithreaded (a thread per connection, the jobs in a thread pool), so that
+    the traversal processes of the jobs are started by the "forkserver" start method
+    (synthesis_option "start_method", unless given by the job) instead of being forked
+    from the threads, which may hold locks (e.g., the lock of a connection, the import lock)
+
+    protocol : one json object per line
+        request  {"type": "synthesize", "jobs": [job, ..]}
+                 {"type": "stats"}
+                 {"type": "shutdown"}
+
+        job      {"id": .., "synthesis_option": {..}, "qubit_table": {..} (optional),
+                  "protocol": path or "qasm": text,
+                  "qchip": path or chip object, or "layout_size" (+ "architecture")}
+
+        response (streamed) {"id": .., "event": "queued" | "started" | "result" | "error", ..}
+                            {"id": .., "event": "progress", "progress": event of the synthesis, ..}
+                            (see synthesisevents)
+                            {"event": "done"} at the end of a batch
+'''
+
+import os
+import sys
+import time
+import hashlib
+import socket
+import argparse
+import threading
+import collections
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+
+import simplejson as json
+
+import ftsynthesis
+import layoutbuilder
+import streamexport
+
+# default capacities of the caches
+QCHIP_CACHE_SIZE = 16
+PROTOCOL_CACHE_SIZE = 64
+
+# start method of the traversal processes of the jobs
+START_METHOD = "forkserver"
+
+
+def new_lru_cache(capacity):
+    """
+        function to create a LRU cache
+    """
+    return {"capacity": capacity,
+            "items": collections.OrderedDict(),
+            "hits": 0,
+            "misses": 0,
+            "lock": threading.Lock()}
+
+
+def lookup_cache(cache, key, build):
+    """
+        function to return the item of the key from the cache,
+        the item is built by build() and stored if it is not in the cache
+    """
+    with cache["lock"]:
+        if key in cache["items"]:
+            cache["items"].move_to_end(key)
+            cache["hits"] += 1
+            return cache["items"][key]
+
+        cache["misses"] += 1
+
+    # built outside the lock, since it may take long (e.g., distance matrix)
+    item = build()
+
+    with cache["lock"]:
+        cache["items"][key] = item
+        cache["items"].move_to_end(key)
+        while len(cache["items"]) > cache["capacity"]:
+            cache["items"].popitem(last=False)
+
+    return item
+
+
+def summarize_cache(cache):
+    """
+        function to summarize the usage of a cache
+    """
+    with cache["lock"]:
+        return {"size": len(cache["items"]), "capacity": cache["capacity"],
+                "hits": cache["hits"], "misses": cache["misses"]}
+
+
+def get_file_key(path):
+    """
+        function to form the cache key of a file (the file is reloaded when it is modified)
+    """
+    status = os.stat(path)
+    return ("file", os.path.abspath(path), status.st_mtime_ns, status.st_size)
+
+
+def get_qchip(state, job):
+    """
+        function to get the prepared quantum chip of a job from the cache
+    """
+    qchip = job.get("qchip")
+
+    if qchip is None:
+        layout_size = layoutbuilder.normalize_layout_size(job["layout_size"])
+        architecture = job.get("architecture")
+        if architecture is None:
+            architecture = layoutbuilder.RECTANGULAR
+
+        key = ("layout", architecture, tuple(sorted(layout_size.items())))
+        return lookup_cache(state["qchips"], key,
+                            lambda: ftsynthesis.prepare_qchip(
+                                layoutbuilder.generate_qchip(layout_size,
+                                                             architecture=architecture)))
+
+    if isinstance(qchip, dict):
+        key = ("object", streamexport.fingerprint_qchip(qchip))
+    else:
+        key = get_file_key(qchip)
+
+    return lookup_cache(state["qchips"], key, lambda: ftsynthesis.prepare_qchip(qchip))
+
+
+def get_protocol(state, job):
+    """
+        function to get the prepared protocol of a job from the cache
+    """
+    qasm = job.get("qasm")
+
+    if qasm is not None:
+        if not isinstance(qasm, str):
+            qasm = "\n".join(qasm)
+        key = ("text", hashlib.sha256(qasm.encode("utf-8")).hexdigest())
+        return lookup_cache(state["protocols"], key,
+                            lambda: ftsynthesis.prepare_protocol(qasm.splitlines()))
+
+    path_qasm = job["protocol"]
+    return lookup_cache(state["protocols"], get_file_key(path_qasm),
+                        lambda: ftsynthesis.prepare_protocol(path_qasm))
+
+
+def run_job(state, job, send):
+    """
+        function to run a job and send its events
+    """
+    job_id = job.get("id")
+    send({"id": job_id, "event": "started"})
+
+    start_time = time.time()
+    try:
+        qchip = get_qchip(state, job)
+        protocol = get_protocol(state, job)
+
+        # the circuit is sent in the string form
+        synthesis_option = {k: v for k, v in job["synthesis_option"].items()
+                            if k != "circuit_format"}
+
+        # the traversal processes are not forked from the threads of the server
+        if synthesis_option.get("start_method") is None:
+            synthesis_option["start_method"] = START_METHOD
+
+        # the events of the synthesis are forwarded to the client
+        def forward_event(message):
+            send(dict(message, id=job_id, event="progress", progress=message["event"]))
+
+        result = ftsynthesis.synthesize(protocol, qchip,
+                                        synthesis_option=synthesis_option,
+                                        qubit_table=job.get("qubit_table"),
+                                        listeners=[forward_event])
+
+    except Exception as error:
+        send({"id": job_id, "event": "error", "error": str(error)})
+        return
+
+    send({"id": job_id, "event": "result", "elapsed": time.time() - start_time,
+          "result": result})
+
+
+def handle_request(state, request, send):
+    """
+        function to handle a request and send the responses
+        return False to stop the server
+    """
+    request_type = request.get("type")
+
+    if request_type == "synthesize":
+        list_jobs = request.get("jobs", [])
+        for job in list_jobs:
+            send({"id": job.get("id"), "event": "queued"})
+
+        futures = [state["executor"].submit(run_job, state, job, send) for job in list_jobs]
+        for future in futures:
+            future.result()
+
+        send({"event": "done"})
+
+    elif request_type == "stats":
+        send({"event": "stats",
+              "qchips": summarize_cache(state["qchips"]),
+              "protocols": summarize_cache(state["protocols"])})
+
+    elif request_type == "shutdown":
+        send({"event": "shutdown"})
+        return False
+
+    else:
+        send({"event": "error", "error": f"Request type {request_type} is not supported."})
+
+    return True
+
+
+class SynthesisRequestHandler(socketserver.StreamRequestHandler):
+    """
+        handler of a connection : json requests (one per line) and streamed responses
+    """
+    def handle(self):
+        state = self.server.state
+        lock_send = threading.Lock()
+
+        def send(message):
+            data = (json.dumps(message) + "\n").encode("utf-8")
+            with lock_send:
+                self.wfile.write(data)
+                self.wfile.flush()
+
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as error:
+                send({"event": "error", "error": f"Invalid request : {error}"})
+                continue
+
+            if not handle_request(state, request, send):
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class SynthesisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+        unix domain socket server, a thread per connection
+    """
+    daemon_threads = True
+
+
+def create_server(path_socket, **kwargs):
+    """
+        function to create a synthesis server listening on the unix domain socket
+
+        kwargs:
+            workers: number of jobs synthesized at the same time (default : 1)
+            qchip_cache_size: capacity of the chip cache (default : 16)
+            protocol_cache_size: capacity of the protocol cache (default : 64)
+    """
+    workers = kwargs.get("workers")
+    if workers is None:
+        workers = 1
+
+    qchip_cache_size = kwargs.get("qchip_cache_size")
+    if qchip_cache_size is None:
+        qchip_cache_size = QCHIP_CACHE_SIZE
+
+    protocol_cache_size = kwargs.get("protocol_cache_size")
+    if protocol_cache_size is None:
+        protocol_cache_size = PROTOCOL_CACHE_SIZE
+
+    if os.path.exists(path_socket):
+        os.remove(path_socket)
+
+    server = SynthesisServer(path_socket, SynthesisRequestHandler)
+    server.state = {"qchips": new_lru_cache(qchip_cache_size),
+                    "protocols": new_lru_cache(protocol_cache_size),
+                    "executor": ThreadPoolExecutor(max_workers=workers)}
+
+    return server
+
+
+def serve(path_socket, **kwargs):
+    """
+        function to run a synthesis server until it receives a shutdown request
+        kwargs are passed to create_server
+    """
+    server = create_server(path_socket, **kwargs)
+
+    try:
+        server.serve_forever()
+    finally:
+        server.state["executor"].shutdown()
+        server.server_close()
+        if os.path.exists(path_socket):
+            os.remove(path_socket)
+
+
+def submit_jobs(path_socket, list_jobs):
+    """
+        generator to submit a batch of jobs to the server and yield the streamed events
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path_socket)
+        client.sendall((json.dumps({"type": "synthesize", "jobs": list_jobs}) + "\n")
+                       .encode("utf-8"))
+
+        with client.makefile("r", encoding="utf-8") as infile:
+            for line in infile:
+                message = json.loads(line)
+                yield message
+                if message.get("event") == "done":
+                    return
+
+
+def send_request(path_socket, request):
+    """
+        function to send a request (stats, shutdown) and return the response
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path_socket)
+        client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+
+        with client.makefile("r", encoding="utf-8") as infile:
+            return json.loads(infile.readline())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="local synthesis server")
+    parser.add_argument("socket", help="path to the unix domain socket")
+    parser.add_argument("--workers", type=int, default=1)
+    arguments = parser.parse_args()
+
+    print(f"synthesis server : {arguments.socket}", file=sys.stderr)
+    serve(arguments.socket, workers=arguments.workers)
@@ -0,0 +1,162 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    module for the memo table of the traversals of the synthesis trials
+    (synthesis_option "traversal_cache")
+
+    the backward traversal (with the next SABRE rounds) and the final forward traversal of
+    a trial only depend on the protocol, the quantum chip, the qubit mapping after the first
+    forward traversal and the options of the traversals, so that a trial reaching a mapping
+    seen before (e.g., repeated runs of a protocol, layout sweeps over the same chips) reuses
+    the mapping of the backward traversal and the syscode of the final forward traversal
+
+    the key of an entry is the sha256 of the canonical json of the inputs (hash_traversal_inputs)
+    and an entry is {"initial_mapping", "final_mapping", "syscode", "interactions"}
+
+    the table keeps the entries in LRU order and evicts the least recently used entries
+    beyond its capacity, it is saved into a json file and loaded back from it (the file is
+    replaced at once, so that the processes sharing a file keep the table of the last writer)
+'''
+
+import os
+import hashlib
+import collections
+
+import simplejson as json
+
+import streamexport
+
+# default capacity of the table (the number of the entries)
+TRAVERSAL_CACHE_SIZE = 256
+
+
+def new_traversal_cache(capacity=None, path=None):
+    """
+        function to create a memo table of the traversals,
+        the entries are loaded from the file of the path if it exists
+    """
+    if capacity is None:
+        capacity = TRAVERSAL_CACHE_SIZE
+
+    cache = {"capacity": int(capacity),
+             "path": path,
+             "items": collections.OrderedDict(),
+             "hits": 0,
+             "misses": 0}
+
+    if path is not None and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as infile:
+            items = json.load(infile)["items"]
+
+        # the most recently used entries are at the end of the file
+        if cache["capacity"] > 0:
+            items = items[max(len(items) - cache["capacity"], 0):]
+        else:
+            items = []
+
+        for key, entry in items:
+            cache["items"][key] = entry
+
+    return cache
+
+
+def fingerprint_inputs(list_qasm_commands, qchip, options):
+    """
+        function to compute the digest of the inputs shared by the trials of a synthesis :
+        the protocol (qasm commands), the quantum chip and the options of the traversals
+    """
+    canonical = json.dumps({"protocol": [[str(token) for token in command]
+                                         for command in list_qasm_commands],
+                            "qchip": streamexport.fingerprint_qchip(qchip),
+                            "options": options},
+                           sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def hash_traversal_inputs(fingerprint, qubit_mapping):
+    """
+        function to compute the key of an entry from the digest of the shared inputs
+        (fingerprint_inputs) and the qubit mapping after the first forward traversal
+    """
+    canonical = json.dumps({"inputs": fingerprint,
+                            "qubit_mapping": {str(qubit): int(position)
+                                              for qubit, position in qubit_mapping.items()}},
+                           sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def lookup_traversal(cache, key):
+    """
+        function to return the entry of the key (None if it is not in the table)
+        the entry is {"initial_mapping", "final_mapping", "syscode", "interactions"}
+        with the interactions keyed by the pairs of the qubits as the traversals
+    """
+    if key not in cache["items"]:
+        cache["misses"] += 1
+        return None
+
+    cache["items"].move_to_end(key)
+    cache["hits"] += 1
+
+    entry = cache["items"][key]
+    return {"initial_mapping": dict(entry["initial_mapping"]),
+            "final_mapping": dict(entry["final_mapping"]),
+            "syscode": [list(inst) for inst in entry["syscode"]],
+            "interactions": {(first, second): count
+                             for first, second, count in entry["interactions"]}}
+
+
+def store_traversal(cache, key, initial_mapping, final_mapping, syscode, interactions):
+    """
+        function to store the result of the traversals of a trial (syscode in the list form)
+        the least recently used entries beyond the capacity are evicted
+    """
+    cache["items"][key] = {
+        "initial_mapping": {qubit: int(position) for qubit, position in initial_mapping.items()},
+        "final_mapping": {qubit: int(position) for qubit, position in final_mapping.items()},
+        "syscode": [list(inst) for inst in syscode],
+        "interactions": [[pair[0], pair[1], int(count)]
+                         for pair, count in interactions.items()]}
+    cache["items"].move_to_end(key)
+
+    while len(cache["items"]) > cache["capacity"]:
+        cache["items"].popitem(last=False)
+
+
+def save_traversal_cache(cache, path=None):
+    """
+        function to save the entries of the table into the json file (default : its path)
+    """
+    if path is None:
+        path = cache["path"]
+
+    if path is None:
+        raise Exception("Error ! The path of the traversal cache is not provided.")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    path_temporary = f"{path}.{os.getpid()}.tmp"
+    with open(path_temporary, "w", encoding="utf-8") as outfile:
+        json.dump({"capacity": cache["capacity"], "items": list(cache["items"].items())},
+                  outfile, separators=(',', ':'))
+
+    os.replace(path_temporary, path)
+
+
+def summarize_traversal_cache(cache):
+    """
+        function to summarize the usage of the table
+    """
+    return {"size": len(cache["items"]), "capacity": cache["capacity"],
+            "hits": cache["hits"], "misses": cache["misses"]}
@@ -12,7 +12,7 @@
     module for checkup functions
 '''
 
-import pandas
+import formatconversion
 import globalVariable as g
 
 
@@ -20,6 +20,8 @@ def display_qubit_movements(system_code, lattice_size, **kwargs):
     """
         function to display the qubit move on the 2d array of size "lattice_size"
     """
+    import pandas
+
     # initial mapping
     qubit_mapping = system_code["initial_mapping"]
     inverse_mapping = {v: k for k, v in qubit_mapping.items()}
@@ -39,32 +41,26 @@ def display_qubit_movements(system_code, lattice_size, **kwargs):
     print(pandas.DataFrame(layout).to_string())
     print(" =====================================================  ")
 
-    circuit_depth = max(list(system_code["circuit"].keys())) + 1
     # circuit
-
-    for idx in range(circuit_depth):
-        instructions = system_code["circuit"][idx]
-
+    for idx, instructions in formatconversion.iterate_ordered_syscode(system_code["circuit"]):
         flag_swap = False
         print(" =====================================================")
         print(f"instructions at {idx}-th index : {instructions}")
         print(" -----------------------------------------------------")
 
         for inst in instructions:
-            tokens = inst.split(" ")
+            if inst[0] in ["CNOT"]:
+                qubits = inst[1:3]
 
-            if tokens[0] in ["CNOT"]:
-                qubits = list(map(int, tokens[1].split(",")))
-
-                print(f"""{tokens[0]} qubits ({qubits[0]}, {qubits[1]})
+                print(f"""{inst[0]} qubits ({qubits[0]}, {qubits[1]})
                        -> ({inverse_mapping[qubits[0]]}, {inverse_mapping[qubits[1]]})""")
 
                 flag_swap = False
 
-            elif tokens[0] in ["SWAP"]:
-                qubits = list(map(int, tokens[1].split(",")))
+            elif inst[0] in ["SWAP"]:
+                qubits = inst[1:3]
 
-                print(f"""{tokens[0]} qubits ({qubits[0]}, {qubits[1]})
+                print(f"""{inst[0]} qubits ({qubits[0]}, {qubits[1]})
                       -> ({inverse_mapping[qubits[0]]}, {inverse_mapping[qubits[1]]})""")
 
                 inverse_mapping[qubits[0]], inverse_mapping[qubits[1]] =\
@@ -72,13 +68,13 @@ def display_qubit_movements(system_code, lattice_size, **kwargs):
 
                 flag_swap = True
 
-            elif tokens[0] in [g.str_barrier_all]:
-                print(f" {tokens[0]}")
+            elif inst[0] in [g.str_barrier_all]:
+                print(f" {inst[0]}")
                 flag_swap = False
 
             else:
-                qubit = int(tokens[1])
-                print(f" {tokens[0]} ({qubit}) -> {inverse_mapping[qubit]}")
+                qubit = inst[1]
+                print(f" {inst[0]} ({qubit}) -> {inverse_mapping[qubit]}")
                 flag_swap = False
 
         if flag_swap:
@@ -97,6 +93,8 @@ def display_qubit_mapping(qubit_mapping, layout_size):
     """
         function to display the qubit mapping
     """
+    import pandas
+
     layout = [[0. for i in range(layout_size["width"])]
                  for j in range(layout_size["height"])]
 
@@ -114,36 +112,13 @@ def display_qubit_mapping(qubit_mapping, layout_size):
 
 def merge_qubit_layout(mapping1, mapping2, direction, layout_size):
     """
-        function to merge both qubit layouts
+        function to merge both qubit layouts ({position: qubit}) into an extended layout
+        {qubit: position}, the second layout is placed below (vertical) or to the right of
+        (horizon) the first layout
     """
+    import layoutbuilder
 
-    extended_qubit_layout = {}
-
-    if direction == "horizon":
-        for key, value in mapping1.items():
-            x_coord = int(key/layout_size["width"])
-            z_coord = int(key%layout_size["width"])
-
-            extended_index = x_coord * 2 * layout_size["width"] + z_coord
-            extended_qubit_layout[extended_index] = value
-
-        for key, value in mapping2.items():
-            x_coord = int(key/layout_size["width"])
-            z_coord = int(key%layout_size["width"])
-
-            extended_index = x_coord * 2 * layout_size["width"] + z_coord + \
-                             layout_size["width"]
-            extended_qubit_layout[extended_index] = value
-
-    elif direction == "vertical":
-        extended_qubit_layout = mapping1
-        for key, value in mapping2.items():
-            x_coord = int(key/layout_size["width"])
-            z_coord = int(key%layout_size["width"])
-
-            index_in_extended_layout = (layout_size["height"] + x_coord) * \
-                                       layout_size["width"] + z_coord
-            extended_qubit_layout[index_in_extended_layout] = value
-
-    return {v: int(k) for k, v in extended_qubit_layout.items()}
+    return layoutbuilder.merge_layouts({qubit: position for position, qubit in mapping1.items()},
+                                       {qubit: position for position, qubit in mapping2.items()},
+                                       direction, layout_size)
     
\ No newline at end of file
@@ -0,0 +1,29 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    configuration of the regression tests (pytest)
+
+    the modules import each other by their plain names (e.g., import formatconversion),
+    so the directory of the modules (src) and of the test helpers (tests) are added
+    to the module search path
+'''
+
+import os
+import sys
+
+path_tests = os.path.dirname(os.path.abspath(__file__))
+
+for path in [os.path.join(path_tests, "../src"), path_tests]:
+    path = os.path.normpath(path)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# the sample scripts run from this directory (python test_steane.py), not by pytest
+collect_ignore = ["test_golay.py", "test_steane.py"]
@@ -0,0 +1,113 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the binary container of the synthesis results (binaryformat) :
+    a result is saved and loaded back the same, raw and compressed (zlib),
+    eagerly (load_result) and lazily from the memory-mapped file (open_result)
+'''
+
+import os
+import array
+
+import pytest
+
+import binaryformat
+import formatconversion
+import ftsynthesis
+import layoutbuilder
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+
+
+@pytest.fixture(scope="module")
+def synthesis_result():
+    """
+        function to synthesize a protocol for the round trips
+    """
+    return ftsynthesis.synthesize(os.path.join(path_db_qasm, "steane", "T.qasmf"),
+                                  layoutbuilder.generate_qchip((6, 6)),
+                                  synthesis_option={"iteration": 1, "moveback": True,
+                                                    "seed": 0},
+                                  listeners=[])
+
+
+@pytest.mark.parametrize("flag_compress", [False, True])
+def test_round_trip(synthesis_result, tmp_path, flag_compress):
+    """
+        function to check a result loaded back from the container in both circuit formats
+    """
+    path_binary = str(tmp_path / "result.ftcb")
+    binaryformat.save_result(synthesis_result, path_binary, compress=flag_compress)
+
+    # the circuit in the original layout
+    loaded = binaryformat.load_result(path_binary, circuit="string")
+
+    assert dict(loaded["system_code"]["circuit"]) ==\
+        dict(synthesis_result["system_code"]["circuit"])
+
+    for key in ["initial_mapping", "final_mapping"]:
+        assert loaded["system_code"][key] == synthesis_result["system_code"][key]
+
+    assert loaded["analysis"]["Circuit Depth"] ==\
+        synthesis_result["analysis"]["Circuit Depth"]
+
+    # the circuit in the columnar form : array.array columns, not tied to the file
+    loaded = binaryformat.load_result(path_binary)
+    columnar_syscode = loaded["system_code"]["circuit"]
+
+    for column in ["time", "opcode", "qubit0", "qubit1"]:
+        assert isinstance(columnar_syscode[column], array.array)
+
+    os.remove(path_binary)
+
+    assert dict(formatconversion.render_ordered_syscode(columnar_syscode)) ==\
+        dict(synthesis_result["system_code"]["circuit"])
+
+
+@pytest.mark.parametrize("flag_compress", [False, True])
+def test_lazy_loading(synthesis_result, tmp_path, flag_compress):
+    """
+        function to check the circuit read lazily from the mapped file within the context
+    """
+    path_binary = str(tmp_path / "result.ftcb")
+    binaryformat.save_result(synthesis_result, path_binary, compress=flag_compress)
+
+    with binaryformat.open_result(path_binary) as loaded:
+        columnar_syscode = loaded["system_code"]["circuit"]
+
+        for column in ["time", "opcode", "qubit0", "qubit1"]:
+            assert isinstance(columnar_syscode[column], memoryview)
+
+        assert dict(formatconversion.render_ordered_syscode(columnar_syscode)) ==\
+            dict(synthesis_result["system_code"]["circuit"])
+
+        for key in ["initial_mapping", "final_mapping"]:
+            assert loaded["system_code"][key] == synthesis_result["system_code"][key]
+
+    # the views are released with the mapped file
+    with pytest.raises(ValueError):
+        len(columnar_syscode["time"])
+
+
+def test_irregular_instruction_in_string(tmp_path):
+    """
+        function to check a circuit with an instruction not restored exactly from the columns
+        is loaded back in string (the columnar form would drop it)
+    """
+    result = {"system_code": {"circuit": {"0": ["PrepZ 0", "PrepZ  1"], "1": ["CNOT 0,1"]},
+                              "initial_mapping": {"data0": 0, "data1": 1}}}
+
+    path_binary = str(tmp_path / "result.ftcb")
+    binaryformat.save_result(result, path_binary)
+
+    assert binaryformat.load_result(path_binary) == result
+
+    with binaryformat.open_result(path_binary) as loaded:
+        assert loaded == result
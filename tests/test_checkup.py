@@ -0,0 +1,140 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the checkup passes (checkup) :
+    the connectivity violations are found in every form of the system code, and the SWAPs
+    between activated qubits are found by the fault tolerance checkup
+'''
+
+import os
+
+import pytest
+
+import checkup
+import formatconversion
+import ftsynthesis
+import globalVariable as g
+import layoutbuilder
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+
+# system code on a 2x2 chip (0-1, 0-2, 1-3, 2-3) with a CNOT on the non-adjacent qubits 0 and 3
+SYSCODE = [["PrepZ", 0], ["CNOT", 0, 1], ["CNOT", 0, 3]]
+
+# the same circuit in the time ordered form
+ORDERED_SYSCODE = {0: ["PrepZ 0"], 1: ["CNOT 0,1"], 2: ["CNOT 0,3"]}
+
+# qubit mapping of the fault tolerance checkup
+INITIAL_MAPPING = {"data0": 0, "data1": 1, "ancilla0": 2, "magic0": 3}
+
+
+@pytest.mark.parametrize("form", ["columnar", "dict", "list"])
+def test_connectivity_violation(form):
+    """
+        function to check the violating CNOT is reported with its time index in a form
+    """
+    g.ensure_globals()
+    qchip = layoutbuilder.generate_qchip((2, 2))
+
+    if form == "columnar":
+        system_code = formatconversion.transform_columnar_syscode(
+            [list(inst) for inst in SYSCODE])
+    elif form == "dict":
+        system_code = ORDERED_SYSCODE
+    else:
+        system_code = [list(inst) for inst in SYSCODE]
+
+    violations = checkup.find_connectivity_violations(system_code, qchip)
+
+    assert violations == [{"time": 2, "instruction": ["CNOT", 0, 3]}]
+    assert not checkup.checkup_system_code(system_code, qchip)
+
+    # the same circuit without the violating CNOT
+    assert checkup.find_connectivity_violations(
+        [list(inst) for inst in SYSCODE[:-1]], qchip,
+        adjacency=checkup.generate_adjacency_bitset(qchip)) == []
+
+
+def check_fault_tolerance(circuit):
+    """
+        function to return the pairs of the qubits of the violations of a circuit (list form)
+    """
+    g.ensure_globals()
+
+    violations = checkup.checkup_fault_tolerance({"circuit": circuit,
+                                                  "initial_mapping": INITIAL_MAPPING})
+    return [violation["qubits"] for violation in violations["violations"]]
+
+
+def test_swap_between_active_qubits():
+    """
+        function to check a SWAP between two data qubits is reported
+    """
+    assert check_fault_tolerance([["SWAP", 0, 1]]) == [("data0", "data1")]
+
+
+def test_measured_qubit_is_free():
+    """
+        function to check a measured qubit is freed, so that a SWAP with it is allowed
+    """
+    assert check_fault_tolerance([["MeasZ", 1, 0], ["SWAP", 0, 1]]) == []
+
+
+def test_magic_qubit_starts_active():
+    """
+        function to check a magic qubit is active from the beginning, and an ancilla qubit
+        is active only once it is prepared
+    """
+    assert check_fault_tolerance([["SWAP", 0, 3]]) == [("data0", "magic0")]
+    assert check_fault_tolerance([["SWAP", 0, 2]]) == []
+
+    # after the SWAP, the ancilla qubit is at 0 and the data qubit at 2
+    assert check_fault_tolerance([["SWAP", 0, 2], ["PrepZ", 0], ["SWAP", 0, 2]]) ==\
+        [("ancilla0", "data0")]
+
+
+def test_snapshots():
+    """
+        function to check the layouts are recorded at the requested steps only
+    """
+    g.ensure_globals()
+
+    ret = checkup.checkup_fault_tolerance({"circuit": [["SWAP", 0, 2], ["H", 0]],
+                                           "initial_mapping": INITIAL_MAPPING},
+                                          snapshot_steps=[0],
+                                          lattice_size={"height": 2, "width": 2})
+
+    assert ret["snapshots"] == {0: [["ancilla0", "data1"], ["data0", "magic0"]]}
+
+
+@pytest.mark.parametrize("flag_verify", [False, True])
+def test_verify_fault_tolerance(monkeypatch, flag_verify):
+    """
+        function to check synthesize raises on the violations with verify_fault_tolerance
+        only, and reports their number otherwise
+    """
+    violation = {"time": 0, "instruction": ["SWAP", 0, 1], "qubits": ("data0", "data1")}
+    monkeypatch.setattr(checkup, "checkup_fault_tolerance",
+                        lambda system_code, **kwargs: {"violations": [violation],
+                                                       "snapshots": {}})
+
+    def synthesize():
+        return ftsynthesis.synthesize(os.path.join(path_db_qasm, "steane", "T.qasmf"),
+                                      layoutbuilder.generate_qchip((6, 6)),
+                                      synthesis_option={"iteration": 1, "moveback": True,
+                                                        "seed": 0,
+                                                        "verify_fault_tolerance": flag_verify},
+                                      listeners=[])
+
+    if flag_verify:
+        with pytest.raises(Exception, match="NOT fault-tolerant"):
+            synthesize()
+    else:
+        assert synthesize()["analysis"]["Fault Tolerance Violations"] == 1
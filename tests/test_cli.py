@@ -0,0 +1,88 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the command line entry point (cli) :
+    the plural keys of a job expand into every combination, and the names stay unique
+'''
+
+import os
+
+import pytest
+import simplejson as json
+
+import cli
+
+# named options of the job files
+SYNTHESIS_OPTIONS = {"nightly": {"iteration": 1, "moveback": True}}
+
+
+def write_job_file(tmp_path, jobs):
+    """
+        function to write a job file with the jobs
+    """
+    path_job_file = str(tmp_path / "jobs.json")
+
+    with open(path_job_file, "w", encoding="utf-8") as outfile:
+        json.dump({"synthesis_options": SYNTHESIS_OPTIONS, "jobs": jobs}, outfile)
+
+    return path_job_file
+
+
+def test_expand_plural_keys(tmp_path):
+    """
+        function to check the plural keys expand into the product, with the paths
+        relative to the job file
+    """
+    path_job_file = write_job_file(tmp_path, [
+        {"protocols": ["steane/PrepZ.qasmf", "steane/T.qasmf"],
+         "layout_sizes": [[6, 6], [7, 7]],
+         "architectures": [2, 23],
+         "synthesis_option": "nightly"}])
+
+    expanded = cli.expand_jobs(path_job_file)
+
+    assert [job["name"] for job in expanded["jobs"]] ==\
+        [f"{protocol}_{architecture}_{size}x{size}_nightly"
+         for protocol in ["PrepZ", "T"] for size in [6, 7] for architecture in [2, 23]]
+
+    assert {job["protocol"] for job in expanded["jobs"]} ==\
+        {os.path.join(str(tmp_path), "steane", protocol) for protocol in ["PrepZ.qasmf",
+                                                                          "T.qasmf"]}
+
+    for job in expanded["jobs"]:
+        assert job["qchip"][0] == "layout"
+        assert job["synthesis_option"] == SYNTHESIS_OPTIONS["nightly"]
+
+
+def test_reject_duplicate_names(tmp_path):
+    """
+        function to check the jobs expanding into the same name are rejected
+    """
+    job = {"protocol": "steane/T.qasmf", "layout_size": [6, 6], "synthesis_option": "nightly"}
+    path_job_file = write_job_file(tmp_path, [job, dict(job)])
+
+    with pytest.raises(Exception, match="same names"):
+        cli.expand_jobs(path_job_file)
+
+    # the name of a job tells them apart
+    path_job_file = write_job_file(tmp_path, [job, dict(job, name="T-second")])
+    assert len(cli.expand_jobs(path_job_file)["jobs"]) == 2
+
+
+def test_reject_undeclared_option(tmp_path):
+    """
+        function to check a job with an undeclared option name is rejected
+    """
+    path_job_file = write_job_file(tmp_path, [{"protocol": "steane/T.qasmf",
+                                               "layout_size": [6, 6],
+                                               "synthesis_option": "weekly"}])
+
+    with pytest.raises(Exception, match="is not declared"):
+        cli.expand_jobs(path_job_file)
@@ -0,0 +1,154 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the columnar system code (formatconversion) :
+    the rendered circuit is the same as the former transform_ordered_syscode
+    (kept below as the reference) formatted the instructions in string at once
+'''
+
+import os
+import collections
+
+import formatconversion
+import ftsynthesis
+import globalVariable as g
+import layoutbuilder
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+
+# system code with every kind of the instructions
+SYSCODE = [["Qubit", 0], ["Qubit", 1, 7], ["PrepZ", 0], ["PrepX", 1], ["PrepZ", 2], ["H", 1],
+           ["CNOT", 1, 0], ["CNOT", 1, 2], ["SWAP", 2, 3], ["Rz", "pi/4", 0],
+           ["U", "pi", "0", "pi/2", 3], ["Barrier", [0, 1]], ["CZ", 0, 1], ["T", 2],
+           ["Tdag", 3], ["Barrier-All"], ["MeasZ", 0, 0], ["MeasX", 1, 1], ["S", 2],
+           ["Rx", "pi/8", 3], ["P", "pi/16", 2], ["CNOT", 3, 2], ["MeasZ", 2, 2],
+           ["MeasX", 3, 3]]
+
+# the circuit of SYSCODE rendered by the former transform_ordered_syscode
+ORDERED_SYSCODE = {0: ["PrepZ 0", "PrepX 1", "PrepZ 2"],
+                   1: ["H 1"],
+                   2: ["CNOT 1,0"],
+                   3: ["CNOT 1,2", "Rz(pi/4) 0", "Barrier [0, 1]"],
+                   4: ["SWAP 2,3", "CZ 0,1"],
+                   5: ["U(pi,0,pi/2) 3", "T 2"],
+                   6: ["Tdag 3", "Barrier-All"],
+                   7: ["MeasZ 0 -> 0", "MeasX 1 -> 1", "S 2", "Rx(pi/8) 3"],
+                   8: ["P(pi/16) 2"],
+                   9: ["CNOT 3,2"],
+                   10: ["MeasZ 2 -> 2", "MeasX 3 -> 3"]}
+
+
+def reference_ordered_syscode(syscode):
+    """
+        function of the former transform_ordered_syscode (the instructions in string)
+    """
+    time_index = collections.defaultdict(int)
+    ordered_syscode = collections.defaultdict(list)
+
+    for inst in syscode:
+        flag_barrier = False
+
+        if inst[0] in [g.str_gate_cnot, g.str_gate_cz, g.str_gate_swap]:
+            ctrl, trgt = inst[1:]
+
+            applying_index = max(time_index[ctrl], time_index[trgt])
+            time_index[ctrl] = time_index[trgt] = applying_index+1
+            list_command = f"{inst[0]} {ctrl},{trgt}"
+
+        elif inst[0] in ["Qubit", "Cbit"]:
+            continue
+
+        else:
+            if inst[0] in [g.str_gate_rz, g.str_gate_rx, g.str_gate_ry, g.str_gate_phase]:
+                angle, qubit = inst[1:]
+                list_command = f"{inst[0]}({angle}) {qubit}"
+                applying_index = time_index[qubit]
+                time_index[qubit] += 1
+
+            elif inst[0] in [g.str_gate_u]:
+                *angle, qubit = inst[1:]
+                list_command = f"{inst[0]}({angle[0]},{angle[1]},{angle[2]}) {qubit}"
+                applying_index = time_index[qubit]
+                time_index[qubit] += 1
+
+            elif inst[0] in [g.str_gate_measz, g.str_gate_measx]:
+                qubit, cbit, *arguments = inst[1:]
+                list_str_command = [inst[0], str(qubit), "->", str(cbit)]
+
+                if len(arguments):
+                    list_str_command.append("()")
+
+                list_command = " ".join(list_str_command)
+                applying_index = time_index[qubit]
+                time_index[qubit] += 1
+
+            elif inst[0] == g.str_barrier_all:
+                flag_barrier = True
+                list_command = g.str_barrier_all
+                applying_index = max(list(time_index.values()))
+
+                for qubit in time_index.keys():
+                    time_index[qubit] = applying_index
+
+            elif inst[0] == g.str_barrier:
+                flag_barrier = True
+                list_command = f"{g.str_barrier} {inst[1]}"
+                applying_index = max(time_index[qubit] for qubit in inst[1])
+
+                for qubit in inst[1]:
+                    time_index[qubit] = applying_index
+
+            else:
+                qubit = inst[1]
+                list_command = f"{inst[0]} {qubit}"
+                applying_index = time_index[qubit]
+                time_index[qubit] += 1
+
+        if flag_barrier:
+            applying_index -= 1
+
+        ordered_syscode[applying_index].append(list_command)
+
+    return ordered_syscode
+
+
+def test_render_matches_former_output():
+    """
+        function to check the rendered columnar circuit against the recorded former output
+    """
+    g.ensure_globals()
+
+    columnar_syscode = formatconversion.transform_columnar_syscode(
+        [list(inst) for inst in SYSCODE])
+
+    assert dict(formatconversion.render_ordered_syscode(columnar_syscode)) == ORDERED_SYSCODE
+    assert dict(formatconversion.transform_ordered_syscode(
+        [list(inst) for inst in SYSCODE])) == ORDERED_SYSCODE
+    assert dict(reference_ordered_syscode(SYSCODE)) == ORDERED_SYSCODE
+
+
+def test_render_matches_reference_on_synthesized_circuit():
+    """
+        function to check the rendered columnar circuit against the reference
+        on the system code of a synthesized protocol
+    """
+    g.ensure_globals()
+
+    result = ftsynthesis.synthesize(os.path.join(path_db_qasm, "steane", "T.qasmf"),
+                                    layoutbuilder.generate_qchip((6, 6)),
+                                    synthesis_option={"iteration": 1, "moveback": True,
+                                                      "seed": 0, "circuit_format": "columnar"},
+                                    listeners=[])
+
+    syscode = formatconversion.restore_syscode(result["system_code"]["circuit"])
+    columnar_syscode = formatconversion.transform_columnar_syscode(syscode)
+
+    assert dict(formatconversion.render_ordered_syscode(columnar_syscode)) ==\
+        dict(reference_ordered_syscode(syscode))
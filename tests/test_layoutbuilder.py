@@ -0,0 +1,66 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the quantum chips built in memory (layoutbuilder) :
+    the chips of the results shipped in Circuits are reproduced exactly
+'''
+
+import os
+import glob
+
+import pytest
+import simplejson as json
+
+import layoutbuilder
+
+path_circuits = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../Circuits")
+
+# architecture of the chips per directory of the raw data
+ARCHITECTURES = {"2D-Rectangular": layoutbuilder.RECTANGULAR,
+                 "2D-Triangular": layoutbuilder.TRIANGULAR,
+                 "3D-Cube": layoutbuilder.CUBIC}
+
+
+def collect_shipped_qchips():
+    """
+        function to collect the distinct chips of the shipped results
+        [(architecture, layout size, qchip), ..]
+    """
+    shipped_qchips = {}
+
+    for directory, architecture in ARCHITECTURES.items():
+        for path_result in sorted(glob.glob(os.path.join(path_circuits, "*", "Raw Data",
+                                                         directory, "*.json"))):
+            with open(path_result, "r", encoding="utf-8") as infile:
+                qchip = json.load(infile)["result"]["qchip"]
+
+            layout_size = dict(qchip["dimension"])
+            if architecture != layoutbuilder.CUBIC:
+                del layout_size["length"]
+
+            key = (architecture, tuple(sorted(layout_size.items())))
+            shipped_qchips.setdefault(key, (architecture, layout_size, qchip))
+
+    return list(shipped_qchips.values())
+
+
+@pytest.mark.parametrize("architecture, layout_size, qchip", collect_shipped_qchips())
+def test_shipped_qchip(architecture, layout_size, qchip):
+    """
+        function to check a generated chip is the same as the shipped one
+        (the connectivity with the order of the neighbors, and the device name)
+    """
+    generated = layoutbuilder.generate_qchip(layout_size, architecture=architecture)
+
+    assert {int(qubit): list(neighbors) for qubit, neighbors
+            in generated["qubit_connectivity"].items()} ==\
+        {int(qubit): neighbors for qubit, neighbors in qchip["qubit_connectivity"].items()}
+
+    assert generated["device_name"] == qchip["device_name"]
@@ -0,0 +1,95 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the layout sweep (layoutsweep) :
+    the bounds of the candidates, the ranking, and the pruning by the KQ lower bounds
+'''
+
+import os
+
+import DirectedAcyclicGraph
+import ftsynthesis
+import layoutbuilder
+import layoutsweep
+
+path_protocol = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "DB-QASM", "steane", "PrepZ.qasmf")
+
+# options of the synthesis of the candidates
+SYNTHESIS_OPTION = {"iteration": 1, "moveback": True, "seed": 0}
+
+# candidates : a chip smaller than the protocol, three feasible chips and a large chip
+LAYOUT_SIZES = [(2, 2), (4, 4), (5, 5), (6, 6), (12, 12)]
+
+
+def sweep(**kwargs):
+    """
+        function to sweep the candidates, the rows keyed by their chips
+    """
+    table = layoutsweep.sweep_layouts(path_protocol, LAYOUT_SIZES,
+                                      synthesis_option=SYNTHESIS_OPTION,
+                                      keep_result=False, **kwargs)
+
+    return table, {row["qchip"]: row for row in table}
+
+
+def test_lower_bounds():
+    """
+        function to check the bounds of a chip from the critical path depth of the protocol
+    """
+    protocol = ftsynthesis.prepare_protocol(path_protocol)
+    critical_path_depth = DirectedAcyclicGraph.get_critical_path_depth(
+        DirectedAcyclicGraph.createDAG(protocol["qasm_commands"])["DAG"])
+
+    bounds = layoutsweep.compute_lower_bounds(critical_path_depth,
+                                              layoutbuilder.generate_qchip((3, 4)))
+
+    assert bounds == {"Depth": critical_path_depth, "KQ": critical_path_depth * 12,
+                      "Diameter": 5}
+
+
+def test_sweep_without_pruning():
+    """
+        function to check every feasible candidate is synthesized above its bound and ranked,
+        the same with a pool of workers
+    """
+    table, rows = sweep(workers=1)
+
+    assert "error" in rows["file_qchip_2x2.json"]
+    assert table[-1] is rows["file_qchip_2x2.json"]
+
+    feasible = [row for row in table if "error" not in row]
+    assert len(feasible) == 4
+    assert [row["KQ"] for row in feasible] == sorted(row["KQ"] for row in feasible)
+
+    for row in feasible:
+        assert row["KQ"] >= row["KQ lower bound"]
+
+    _, rows_parallel = sweep(workers=2)
+    for name, row in rows.items():
+        assert rows_parallel[name].get("KQ") == row.get("KQ")
+
+
+def test_sweep_with_pruning():
+    """
+        function to check the candidates whose bound reaches the best KQ are pruned,
+        and the best candidate is the same as without pruning
+    """
+    table, rows = sweep(workers=1, prune=True)
+    table_full, _ = sweep(workers=1)
+
+    assert table[0]["qchip"] == table_full[0]["qchip"]
+    assert table[0]["KQ"] == table_full[0]["KQ"]
+
+    assert rows["file_qchip_12x12.json"].get("pruned")
+
+    for row in table:
+        if row.get("pruned"):
+            assert row["KQ lower bound"] >= table[0]["KQ"]
@@ -0,0 +1,82 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the pipeline of the protocol syntheses (pipeline) :
+    the cache key of a stage follows its inputs, and a second run reuses the cached stages
+'''
+
+import os
+import shutil
+
+import layoutbuilder
+import pipeline
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+
+# options of the synthesis of the stages
+SYNTHESIS_OPTION = {"iteration": 1, "moveback": True, "seed": 0}
+
+
+def test_hash_stage(tmp_path):
+    """
+        function to check the cache key changes with the options and the protocol
+    """
+    path_protocol = str(tmp_path / "T.qasmf")
+    shutil.copyfile(os.path.join(path_db_qasm, "steane", "T.qasmf"), path_protocol)
+
+    qchip = layoutbuilder.generate_qchip((6, 6))
+    resolved = {"protocol": path_protocol, "synthesis_option": dict(SYNTHESIS_OPTION)}
+
+    key = pipeline.hash_stage(resolved, qchip)
+    assert pipeline.hash_stage(dict(resolved), qchip) == key
+
+    # another option
+    assert pipeline.hash_stage(dict(resolved, synthesis_option=dict(SYNTHESIS_OPTION, seed=1)),
+                               qchip) != key
+
+    # another chip
+    assert pipeline.hash_stage(resolved, layoutbuilder.generate_qchip((7, 7))) != key
+
+    # another protocol
+    with open(path_protocol, "a", encoding="utf-8") as outfile:
+        outfile.write("\n")
+
+    assert pipeline.hash_stage(resolved, qchip) != key
+
+
+def test_second_run_from_cache(tmp_path):
+    """
+        function to check the second run of a pipeline takes the stages from the cache
+    """
+    stages = {"PrepZ": {"protocol": os.path.join(path_db_qasm, "steane", "PrepZ.qasmf"),
+                        "layout_size": {"height": 6, "width": 6},
+                        "synthesis_option": SYNTHESIS_OPTION},
+              "T": {"protocol": os.path.join(path_db_qasm, "steane", "T.qasmf"),
+                    "layout_size": {"height": 6, "width": 6},
+                    "synthesis_option": SYNTHESIS_OPTION,
+                    "depends": ["PrepZ"]}}
+
+    cache_dir = str(tmp_path / "cache")
+
+    first = pipeline.run_pipeline(stages, cache_dir=cache_dir, workers=2)
+    assert first["executed"] == ["PrepZ", "T"]
+    assert first["cached"] == []
+
+    second = pipeline.run_pipeline(stages, cache_dir=cache_dir, workers=2)
+    assert second["executed"] == []
+    assert sorted(second["cached"]) == ["PrepZ", "T"]
+
+    assert second["keys"] == first["keys"]
+    assert second["results"] == first["results"]
+
+    # a forced stage is synthesized again
+    third = pipeline.run_pipeline(stages, cache_dir=cache_dir, workers=2, force=["T"])
+    assert third["executed"] == ["T"]
+    assert third["cached"] == ["PrepZ"]
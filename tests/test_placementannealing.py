@@ -0,0 +1,105 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the annealing of the initial placements (placementannealing) :
+    the fixed qubits stay in place, the placements are distinct permutations of the chip
+    ranked by their scores, and the synthesis starts its trials from them
+'''
+
+import os
+
+import numpy as np
+
+import ftsynthesis
+import layoutbuilder
+import placementannealing
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+path_protocol = os.path.join(path_db_qasm, "steane", "Stabilizer_Measure_steaneEC.qasmf")
+
+# the qubits fixed at the corners of the chip
+FIXED_QUBITS = {"data0": 0, "data6": 35}
+
+
+def anneal(**kwargs):
+    """
+        function to anneal the placements of the protocol on a 6x6 chip
+    """
+    protocol = ftsynthesis.prepare_protocol(path_protocol)
+    list_algorithm_qubits = sorted(set(protocol["algorithm_qubits"]))
+    distance_matrix = ftsynthesis.prepare_qchip(
+        layoutbuilder.generate_qchip((6, 6)))["distance_matrix"]
+
+    list_placements, list_scores = placementannealing.anneal_placements(
+        protocol["qasm_commands"], list_algorithm_qubits, distance_matrix,
+        top_k=5, steps=500, seed=0, **kwargs)
+
+    return protocol, list_algorithm_qubits, distance_matrix, list_placements, list_scores
+
+
+def test_placements():
+    """
+        function to check the placements are distinct permutations of the chip positions,
+        the empty positions taken by the dummy qubits, ranked by their scores
+    """
+    protocol, list_algorithm_qubits, distance_matrix, list_placements, list_scores =\
+        anneal(fixed_qubits=FIXED_QUBITS)
+
+    assert len(list_placements) == 5
+    assert list_scores == sorted(list_scores)
+
+    number_dummies = 36 - len(list_algorithm_qubits)
+    for placement in list_placements:
+        assert sorted(placement.values()) == list(range(36))
+        assert set(placement) == set(list_algorithm_qubits) |\
+            {f"dummy{i}" for i in range(number_dummies)}
+
+        for qubit, position in FIXED_QUBITS.items():
+            assert placement[qubit] == position
+
+    assert len({tuple(placement[qubit] for qubit in list_algorithm_qubits)
+                for placement in list_placements}) == len(list_placements)
+
+    # the scores are those of the placements
+    interaction_graph = placementannealing.build_interaction_graph(protocol["qasm_commands"],
+                                                                   list_algorithm_qubits)
+    rows = np.array([[placement[qubit] for qubit in list_algorithm_qubits]
+                     for placement in list_placements])
+    assert placementannealing.score_placements(
+        rows, interaction_graph, np.asarray(distance_matrix, dtype=np.float64)).tolist() ==\
+        list_scores
+
+
+def test_same_placements_with_seed():
+    """
+        function to check the placements are reproducible with a seed
+    """
+    assert anneal()[3:] == anneal()[3:]
+
+
+def test_synthesize_with_annealing():
+    """
+        function to check the synthesis starts its trials from the annealed placements
+    """
+    list_messages = []
+    result = ftsynthesis.synthesize(os.path.join(path_db_qasm, "steane", "T.qasmf"),
+                                    layoutbuilder.generate_qchip((9, 9)),
+                                    synthesis_option={"iteration": 2, "moveback": True,
+                                                      "seed": 0,
+                                                      "initial_mapping_option": "annealing",
+                                                      "annealing_steps": 200},
+                                    listeners=[list_messages.append])
+
+    list_annealing = [message for message in list_messages if message["event"] == "annealing"]
+    assert len(list_annealing) == 1
+    assert list_annealing[0]["placements"] == 2
+    assert list_annealing[0]["scores"] == sorted(list_annealing[0]["scores"])
+
+    assert result["analysis"]["Circuit Depth"] > 0
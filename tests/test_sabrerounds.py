@@ -0,0 +1,106 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the SABRE rounds (refine_sabre_rounds) : the rounds stop when the
+    mapping repeats or the swaps of a round do not decrease, and the mapping of the least
+    swaps is kept (the traversals give scripted messages [mapping, swaps])
+'''
+
+import pytest
+
+import ftsynthesis
+
+# the mapping after the first round, with its swaps
+MAPPING = {"data0": 0, "data1": 1}
+COST = 10
+
+
+def refine(monkeypatch, list_messages, rounds):
+    """
+        function to run the rounds over the scripted messages of the traversals
+        (forward, backward, forward, ..) and return the result and the events
+    """
+    list_phases = []
+    list_messages = list(list_messages)
+
+    def run_traversal(target, args, **kwargs):
+        list_phases.append(args["direction"])
+        return list_messages.pop(0)
+
+    monkeypatch.setattr(ftsynthesis, "run_traversal_process", run_traversal)
+
+    list_events = []
+    best = ftsynthesis.refine_sabre_rounds(MAPPING, COST,
+                                           {"direction": "forward"}, {"direction": "backward"},
+                                           rounds=rounds, listeners=[list_events.append],
+                                           trial=0)
+
+    assert not list_messages
+
+    # a round is a forward and a backward traversal
+    assert list_phases == ["forward", "backward"] * (len(list_phases) // 2) +\
+        ["forward"] * (len(list_phases) % 2)
+
+    return best, [event for event in list_events if event["event"] == "rounds"]
+
+
+def test_stop_at_repeated_mapping(monkeypatch):
+    """
+        function to check the rounds stop when a round returns to a mapping seen before
+    """
+    best, list_rounds = refine(monkeypatch, [[{"data0": 1, "data1": 0}, 2],
+                                             [dict(MAPPING), 3]], rounds=4)
+
+    assert best == {"mapping": MAPPING, "cost": COST, "rounds": 1, "killed": 0}
+    assert [(event["rounds"], event["converged"]) for event in list_rounds] == [(1, True)]
+
+
+def test_stop_at_swaps_not_decreasing(monkeypatch):
+    """
+        function to check the rounds stop when the swaps of a round do not decrease,
+        keeping the mapping of the least swaps
+    """
+    second = {"data0": 2, "data1": 1}
+    best, list_rounds = refine(monkeypatch, [[{"data0": 1, "data1": 0}, 4],
+                                             [second, 4],
+                                             [{"data0": 3, "data1": 1}, 5],
+                                             [{"data0": 2, "data1": 3}, 3]], rounds=4)
+
+    assert best == {"mapping": second, "cost": 8, "rounds": 2, "killed": 0}
+    assert [(event["rounds"], event["cost"], event["converged"]) for event in list_rounds] ==\
+        [(2, 8, True)]
+
+
+@pytest.mark.parametrize("rounds", [1, 3])
+def test_all_rounds(monkeypatch, rounds):
+    """
+        function to check the rounds run up to the given number while the swaps decrease
+    """
+    # the swaps of the round r : 2 + (COST - 2r - 2)
+    list_messages = []
+    for index in range(1, rounds):
+        list_messages.extend([[{"data0": index + 1, "data1": 0}, 2],
+                              [{"data0": 0, "data1": index + 1}, COST - 2 * index - 2]])
+
+    best, list_rounds = refine(monkeypatch, list_messages, rounds=rounds)
+
+    assert best["rounds"] == rounds
+    assert best["cost"] == COST - 2 * (rounds - 1)
+    assert [(event["rounds"], event["converged"]) for event in list_rounds] == [(rounds, False)]
+
+
+def test_killed_round(monkeypatch):
+    """
+        function to check a round killed by the time limit ends the rounds with the best mapping
+    """
+    best, list_rounds = refine(monkeypatch, [[{"data0": 1, "data1": 0}, 2], None], rounds=3)
+
+    assert best == {"mapping": MAPPING, "cost": COST, "rounds": 1, "killed": 1}
+    assert [(event["rounds"], event["converged"]) for event in list_rounds] == [(1, False)]
@@ -0,0 +1,65 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the segmented synthesis (synthesize_windows) :
+    the swaps of the stitched circuit carry the initial mapping to the final mapping,
+    and the windows stop at the time budget
+'''
+
+import os
+
+import pytest
+
+import ftsynthesis
+import layoutbuilder
+
+path_protocol = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "DB-QASM", "steane", "Stabilizer_Measure_steaneEC.qasmf")
+
+# options of the segmented synthesis (the protocol is split at Barrier-All)
+SYNTHESIS_OPTION = {"iteration": 2, "moveback": True, "seed": 0, "segmented": True}
+
+
+def synthesize_protocol(**kwargs):
+    """
+        function to synthesize the protocol in the segmented mode
+    """
+    return ftsynthesis.synthesize(path_protocol, layoutbuilder.generate_qchip((7, 7)),
+                                  synthesis_option=dict(SYNTHESIS_OPTION, **kwargs),
+                                  listeners=[])
+
+
+def test_mapping_replayed_through_swaps():
+    """
+        function to check the swaps of the circuit over the windows move the qubits
+        from the initial mapping to the final mapping
+    """
+    system_code = synthesize_protocol()["system_code"]
+
+    circuit = system_code["circuit"]
+    assert any(inst == "Barrier-All" for time in circuit for inst in circuit[time])
+
+    occupants = {position: qubit for qubit, position in system_code["initial_mapping"].items()}
+    for time in sorted(circuit):
+        for inst in circuit[time]:
+            if inst.startswith("SWAP "):
+                a, b = map(int, inst.split()[1].split(","))
+                occupants[a], occupants[b] = occupants.get(b), occupants.get(a)
+
+    assert {qubit: position for position, qubit in occupants.items() if qubit is not None} ==\
+        system_code["final_mapping"]
+
+
+def test_time_budget():
+    """
+        function to check no window is routed after the time budget
+    """
+    with pytest.raises(Exception, match="within the time budget"):
+        synthesize_protocol(time_budget=0)
@@ -0,0 +1,83 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the streamed export of the synthesis results (streamexport) :
+    the exported file loads back to the same circuit, in chunks of any size
+'''
+
+import io
+import os
+
+import pytest
+import simplejson as json
+
+import formatconversion
+import ftsynthesis
+import layoutbuilder
+import streamexport
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+
+# options of the synthesis (the circuit in the columnar form, rendered by the export)
+SYNTHESIS_OPTION = {"iteration": 1, "moveback": True, "seed": 0, "circuit_format": "columnar"}
+
+
+@pytest.fixture(scope="module")
+def synthesis_result():
+    """
+        function to synthesize a protocol for the exports
+    """
+    return ftsynthesis.synthesize(os.path.join(path_db_qasm, "steane", "T.qasmf"),
+                                  layoutbuilder.generate_qchip((6, 6)),
+                                  synthesis_option=SYNTHESIS_OPTION,
+                                  listeners=[])
+
+
+def check_exported_result(exported, result):
+    """
+        function to check an exported result against the result of the synthesis
+    """
+    circuit = formatconversion.render_ordered_syscode(result["system_code"]["circuit"])
+
+    assert {int(time_index): instructions for time_index, instructions
+            in exported["system_code"]["circuit"].items()} == dict(circuit)
+
+    for key in ["initial_mapping", "final_mapping"]:
+        assert exported["system_code"][key] == result["system_code"][key]
+
+    assert exported["qchip"]["fingerprint"] == streamexport.fingerprint_qchip(result["qchip"])
+    assert exported["analysis"]["Circuit Depth"] == result["analysis"]["Circuit Depth"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 256])
+def test_export_loads_back(synthesis_result, chunk_size):
+    """
+        function to check the exported result loads back to the same circuit
+    """
+    sink = io.StringIO()
+    streamexport.export_result(synthesis_result, sink, chunk_size=chunk_size)
+
+    check_exported_result(json.loads(sink.getvalue()), synthesis_result)
+
+
+def test_synthesize_into_sink(tmp_path):
+    """
+        function to check the result streamed by synthesize into a file
+    """
+    path_result = str(tmp_path / "result.json")
+
+    result = ftsynthesis.synthesize(os.path.join(path_db_qasm, "steane", "T.qasmf"),
+                                    layoutbuilder.generate_qchip((6, 6)),
+                                    synthesis_option=SYNTHESIS_OPTION,
+                                    sink=path_result,
+                                    listeners=[])
+
+    with open(path_result, "r", encoding="utf-8") as infile:
+        check_exported_result(json.load(infile), result)
@@ -0,0 +1,87 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the synthesis modes : with a fixed seed, the memory-lean mode and
+    the shared-memory transport synthesize the same circuit as the default mode
+    (the order of the qubits depends on the hash seed, which is the same in a process),
+    and the shared memory blocks are released when the synthesis fails
+'''
+
+import os
+from multiprocessing import shared_memory
+
+import pytest
+
+import ftsynthesis
+import layoutbuilder
+import sharedtransport
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+
+# options of the synthesis shared by the modes
+SYNTHESIS_OPTION = {"iteration": 2, "moveback": True, "seed": 0,
+                    "initial_mapping_option": "periodic_random"}
+
+
+def synthesize_protocol(protocol, **kwargs):
+    """
+        function to synthesize a protocol of the steane code with the options of a mode
+        (on a chip with room for routing, so that no trial is killed by the time limit)
+    """
+    return ftsynthesis.synthesize(os.path.join(path_db_qasm, "steane", f"{protocol}.qasmf"),
+                                  layoutbuilder.generate_qchip((9, 9)),
+                                  synthesis_option=dict(SYNTHESIS_OPTION, **kwargs),
+                                  listeners=[])
+
+
+@pytest.mark.parametrize("protocol", ["T", "CNOT"])
+@pytest.mark.parametrize("mode", [{"memory_lean": True},
+                                  {"transport": "shared_memory"},
+                                  {"memory_lean": True, "transport": "shared_memory"}])
+def test_same_circuit_as_default_mode(protocol, mode):
+    """
+        function to check a mode synthesizes the same circuit as the default mode
+    """
+    default = synthesize_protocol(protocol)
+    result = synthesize_protocol(protocol, **mode)
+
+    for key in ["circuit", "initial_mapping", "final_mapping"]:
+        assert result["system_code"][key] == default["system_code"][key]
+
+    assert result["analysis"]["Circuit Depth"] == default["analysis"]["Circuit Depth"]
+
+
+def test_shared_blocks_released_on_failure(monkeypatch):
+    """
+        function to check the shared memory blocks are released when the synthesis fails
+        during the traversals (here, the synthesis of the windows)
+    """
+    list_handles = []
+    create_block = sharedtransport.create_block
+
+    def record_block(values, typecode, blocks):
+        handle = create_block(values, typecode, blocks)
+        list_handles.append(handle)
+        return handle
+
+    def fail_windows(list_windows, arguments, **kwargs):
+        raise Exception("Error ! The window 0 is not routed.")
+
+    monkeypatch.setattr(sharedtransport, "create_block", record_block)
+    monkeypatch.setattr(ftsynthesis, "synthesize_windows", fail_windows)
+
+    with pytest.raises(Exception, match="is not routed"):
+        synthesize_protocol("T", transport="shared_memory", memory_lean=True, segmented=True)
+
+    assert len(list_handles) == 9
+
+    for handle in list_handles:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=handle["name"])
@@ -0,0 +1,70 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the local synthesis server (synthesisserver) :
+    a batch of jobs streams its events in order, and the chips are reused from the cache
+'''
+
+import os
+import threading
+
+import pytest
+
+import synthesisserver
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+
+
+@pytest.fixture
+def path_socket(tmp_path):
+    """
+        function to run a server in a thread of this process on a temporary socket
+    """
+    path_socket = str(tmp_path / "ftsynthesis.sock")
+
+    server = synthesisserver.create_server(path_socket, workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield path_socket
+
+    server.shutdown()
+    thread.join()
+    server.state["executor"].shutdown()
+    server.server_close()
+
+
+def test_batch_on_same_chip(path_socket):
+    """
+        function to check the order of the events of two jobs on the same chip
+        and the chip cache hit of the second job
+    """
+    jobs = [{"id": job_id, "protocol": os.path.join(path_db_qasm, "steane", protocol),
+             "layout_size": {"height": 6, "width": 6},
+             "synthesis_option": {"iteration": 1, "moveback": True, "seed": 0}}
+            for job_id, protocol in [(1, "PrepZ.qasmf"), (2, "T.qasmf")]]
+
+    events = [message for message in synthesisserver.submit_jobs(path_socket, jobs)
+              if message["event"] != "progress"]
+
+    assert [(message.get("id"), message["event"]) for message in events] ==\
+        [(1, "queued"), (2, "queued"),
+         (1, "started"), (1, "result"),
+         (2, "started"), (2, "result"),
+         (None, "done")]
+
+    for message in events:
+        if message["event"] == "result":
+            assert message["result"]["analysis"]["Circuit Depth"] > 0
+
+    stats = synthesisserver.send_request(path_socket, {"type": "stats"})
+    assert stats["qchips"]["misses"] == 1
+    assert stats["qchips"]["hits"] == 1
+    assert stats["protocols"]["misses"] == 2
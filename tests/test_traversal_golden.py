@@ -0,0 +1,83 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    golden test of the greedy traversal (graph_traversal) : the circuit, the depth and the
+    final mapping of a steane protocol are the same as recorded from the baseline
+    (golden_traversal.json)
+
+    the whole chip is given by the qubit table (the dummy qubits included), so that the
+    traversal writing the circuit runs from a fixed mapping, and the synthesis runs in
+    a separate interpreter with the hash seed of the recording (the order of the qubits
+    in the sets depends on it)
+'''
+
+import os
+import subprocess
+import sys
+
+import simplejson as json
+
+import layoutbuilder
+
+path_tests = os.path.dirname(os.path.abspath(__file__))
+path_protocol = os.path.join(path_tests, "DB-QASM", "steane", "Stabilizer_Measure_steaneEC.qasmf")
+path_golden = os.path.join(path_tests, "golden_traversal.json")
+
+# hash seed of the recording
+PYTHONHASHSEED = "0"
+
+# the synthesis run in the separate interpreter : path_src, path_qchip, path_output
+RUNNER = '''
+import sys
+import simplejson as json
+
+sys.path.insert(0, sys.argv[1])
+import ftsynthesis
+
+if __name__ == "__main__":
+    qubits = ["checkup0"] + [f"data{i}" for i in range(7)] + [f"syndrome{i}" for i in range(7)]
+    qubit_table = {qubit: index * 3 for index, qubit in enumerate(qubits)}
+    positions = [position for position in range(49) if position not in qubit_table.values()]
+    qubit_table.update({f"dummy{i}": position for i, position in enumerate(positions)})
+
+    result = ftsynthesis.synthesize(sys.argv[2], sys.argv[3], qubit_table=qubit_table,
+                                    synthesis_option={"iteration": 1, "moveback": True,
+                                                      "seed": 0})
+
+    with open(sys.argv[4], "w", encoding="utf-8") as outfile:
+        json.dump({"circuit": result["system_code"]["circuit"],
+                   "final_mapping": result["system_code"]["final_mapping"],
+                   "depth": result["analysis"]["Circuit Depth"]}, outfile)
+'''
+
+
+def test_same_as_baseline(tmp_path):
+    """
+        function to check the traversal synthesizes the circuit recorded from the baseline
+    """
+    path_qchip = str(tmp_path / "file_qchip_7x7.json")
+    with open(path_qchip, "w", encoding="utf-8") as outfile:
+        json.dump(layoutbuilder.generate_qchip((7, 7)), outfile)
+
+    path_output = str(tmp_path / "result.json")
+    subprocess.run([sys.executable, "-c", RUNNER, os.path.join(path_tests, "..", "src"),
+                    path_protocol, path_qchip, path_output],
+                   env=dict(os.environ, PYTHONHASHSEED=PYTHONHASHSEED),
+                   stdout=subprocess.DEVNULL, check=True)
+
+    with open(path_output, "r", encoding="utf-8") as infile:
+        result = json.load(infile)
+
+    with open(path_golden, "r", encoding="utf-8") as infile:
+        golden = json.load(infile)
+
+    assert result["circuit"] == golden["circuit"]
+    assert result["depth"] == golden["depth"]
+    assert result["final_mapping"] == golden["final_mapping"]
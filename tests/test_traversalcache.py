@@ -0,0 +1,102 @@
+# -*-coding:utf-8-*-
+
+# This code is part of ftsynthesis
+# (fault-tolerant quantum circuit synthesis for fault-tolerant quantum protocols)
+#
+# Copyright 2022 ETRI
+#
+# This code is licensed under the BSD-3-Clause.
+
+'''
+    regression tests of the memo table of the traversals (traversalcache) :
+    a second run with the table returns the same result as the first one from the table,
+    and the table keeps its capacity in LRU order when it is saved and loaded back
+'''
+
+import os
+
+import ftsynthesis
+import layoutbuilder
+import traversalcache
+
+path_db_qasm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DB-QASM")
+
+# options of the synthesis (a fixed seed, so that the trials reach the same mappings)
+SYNTHESIS_OPTION = {"iteration": 3, "moveback": True, "seed": 0,
+                    "initial_mapping_option": "periodic_random"}
+
+
+def synthesize_protocol(**kwargs):
+    """
+        function to synthesize the T protocol of the steane code with the memo table
+    """
+    return ftsynthesis.synthesize(os.path.join(path_db_qasm, "steane", "T.qasmf"),
+                                  layoutbuilder.generate_qchip((9, 9)),
+                                  synthesis_option=dict(SYNTHESIS_OPTION,
+                                                        **kwargs.get("option", {})),
+                                  traversal_cache=kwargs.get("traversal_cache"),
+                                  listeners=[])
+
+
+def check_same_result(first, second):
+    """
+        function to check two results have the same circuit and mappings
+    """
+    for key in ["circuit", "initial_mapping", "final_mapping"]:
+        assert second["system_code"][key] == first["system_code"][key]
+
+    for key in ["Circuit Depth", "Interaction", "Data Qubit Move"]:
+        assert second["analysis"][key] == first["analysis"][key]
+
+
+def test_second_run_from_file(tmp_path):
+    """
+        function to check the second run reuses the traversals saved by the first run
+    """
+    path_cache = str(tmp_path / "traversal_cache.json")
+
+    first = synthesize_protocol(option={"traversal_cache": path_cache})
+    assert first["analysis"]["Traversal Cache"]["hits"] == 0
+    assert os.path.exists(path_cache)
+
+    second = synthesize_protocol(option={"traversal_cache": path_cache})
+    assert second["analysis"]["Traversal Cache"]["hits"] == SYNTHESIS_OPTION["iteration"]
+    assert second["analysis"]["Traversal Cache"]["misses"] == 0
+
+    check_same_result(first, second)
+
+
+def test_second_run_shared_table():
+    """
+        function to check the runs sharing a table in a process
+    """
+    cache = traversalcache.new_traversal_cache()
+
+    first = synthesize_protocol(traversal_cache=cache)
+    second = synthesize_protocol(traversal_cache=cache)
+
+    assert cache["hits"] == SYNTHESIS_OPTION["iteration"]
+    check_same_result(first, second)
+
+
+def test_capacity(tmp_path):
+    """
+        function to check the eviction in LRU order and the capacity of the loaded table
+    """
+    path_cache = str(tmp_path / "traversal_cache.json")
+
+    cache = traversalcache.new_traversal_cache(2, path_cache)
+    for key in ["a", "b"]:
+        traversalcache.store_traversal(cache, key, {"q": 0}, {"q": 1}, [["H", 0]],
+                                       {("q", "r"): 1})
+
+    # "a" is used, so that "b" is the least recently used one
+    assert traversalcache.lookup_traversal(cache, "a")["interactions"] == {("q", "r"): 1}
+    traversalcache.store_traversal(cache, "c", {"q": 0}, {"q": 1}, [["H", 0]], {})
+    assert list(cache["items"]) == ["a", "c"]
+
+    traversalcache.save_traversal_cache(cache)
+
+    assert list(traversalcache.new_traversal_cache(2, path_cache)["items"]) == ["a", "c"]
+    assert list(traversalcache.new_traversal_cache(1, path_cache)["items"]) == ["c"]
+    assert not traversalcache.new_traversal_cache(0, path_cache)["items"]
@@ -12,9 +12,16 @@
     module for checkup functions
 '''
 
+import os
+import sys
+
 import pandas
 from icecream import ic
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+import formatconversion
+import layoutbuilder
+
 
 def checkup_fault_tolerance(system_code, lattice_size, **kwargs):
     '''
@@ -40,54 +47,49 @@ def checkup_fault_tolerance(system_code, lattice_size, **kwargs):
     print(pandas.DataFrame(layout).to_string())
     print(" =====================================================  ")
 
-    circuit_depth = max(list(system_code["circuit"].keys())) + 1
-
     qubit_usage_status = {k: True if "data" in k else False for k in qubit_mapping.keys()}
 
     ic(qubit_usage_status)
 
     # circuit
-    for idx in range(circuit_depth):
-        instructions = system_code["circuit"][idx]
-
+    for idx, instructions in formatconversion.iterate_ordered_syscode(system_code["circuit"]):
         flag_swap = False
         print(" =====================================================")
         print(f"instructions at {idx}-th index : {instructions}")
         print(" -----------------------------------------------------")
 
         for inst in instructions:
-            tokens = inst.split(" ")
 
-            if tokens[0] in ["PrepZ"]:
-                physical_qubit = int(tokens[1])
+            if inst[0] in ["PrepZ"]:
+                physical_qubit = inst[1]
                 logical_qubit = inverse_mapping[physical_qubit]
 
-                print(f" {tokens[0]} {physical_qubit} ({logical_qubit})")
+                print(f" {inst[0]} {physical_qubit} ({logical_qubit})")
 
                 qubit_usage_status[logical_qubit] = True
 
-            elif tokens[0] in ["MeasZ"]:
-                physical_qubit = int(tokens[1])
+            elif inst[0] in ["MeasZ"]:
+                physical_qubit = inst[1]
                 logical_qubit = inverse_mapping[physical_qubit]
 
-                print(f" {tokens[0]} {physical_qubit} ({logical_qubit})")
+                print(f" {inst[0]} {physical_qubit} ({logical_qubit})")
 
                 qubit_usage_status[logical_qubit] = False
 
-            elif tokens[0] in ["CNOT"]:
-                qubits = list(map(int, tokens[1].split(",")))
+            elif inst[0] in ["CNOT"]:
+                qubits = inst[1:3]
 
-                print(f""" {tokens[0]} {qubits[0]}, {qubits[1]}
+                print(f""" {inst[0]} {qubits[0]}, {qubits[1]}
                        ({inverse_mapping[qubits[0]]}, {inverse_mapping[qubits[1]]})""")
 
                 flag_swap = False
 
-            elif tokens[0] in ["SWAP"]:
-                qubits = list(map(int, tokens[1].split(",")))
+            elif inst[0] in ["SWAP"]:
+                qubits = inst[1:3]
                 logical_qubit0 = inverse_mapping[qubits[0]]
                 logical_qubit1 = inverse_mapping[qubits[1]]
 
-                print(f""" {tokens[0]} {qubits[0]}, {qubits[1]}
+                print(f""" {inst[0]} {qubits[0]}, {qubits[1]}
                        ({logical_qubit0}, {logical_qubit1})""")
 
                 inverse_mapping[qubits[0]], inverse_mapping[qubits[1]] =\
@@ -99,13 +101,13 @@ def checkup_fault_tolerance(system_code, lattice_size, **kwargs):
                 if qubit_usage_status[logical_qubit0] and qubit_usage_status[logical_qubit1]:
                     raise Exception("Stop: SWAP between activated qubits")
 
-            elif tokens[0] in ["Barrier-All"]:
-                print(f" {tokens[0]}")
+            elif inst[0] in ["Barrier-All"]:
+                print(f" {inst[0]}")
                 flag_swap = False
 
             else:
-                qubit = int(tokens[1])
-                print(f" {tokens[0]} {qubit} ({inverse_mapping[qubit]})")
+                qubit = inst[1]
+                print(f" {inst[0]} {qubit} ({inverse_mapping[qubit]})")
                 flag_swap = False
 
         if flag_swap:
@@ -145,54 +147,49 @@ def display_qubit_movements(system_code, lattice_size, **kwargs):
     print(pandas.DataFrame(layout).to_string())
     print(" =====================================================  ")
 
-    circuit_depth = max(list(system_code["circuit"].keys())) + 1
-
     qubit_usage_status = {k: True if "data" in k else False for k in qubit_mapping.keys()}
 
     max_data_interaction = kwargs.get("allowable_data_interaction")
     count_data_interaction = 0
 
     # circuit
-    for idx in range(circuit_depth):
-        instructions = system_code["circuit"][idx]
-
+    for idx, instructions in formatconversion.iterate_ordered_syscode(system_code["circuit"]):
         flag_swap = False
         print(" =====================================================  ")
         print(f"instructions at {idx}-th index : {instructions}")
         print(" -----------------------------------------------------  ")
 
         for inst in instructions:
-            tokens = inst.split(" ")
 
-            if tokens[0] in ["PrepZ"]:
-                physical_qubit = int(tokens[1])
+            if inst[0] in ["PrepZ"]:
+                physical_qubit = inst[1]
                 logical_qubit = inverse_mapping[physical_qubit]
 
                 qubit_usage_status[logical_qubit] = True
-                print(f""" {tokens[0]} {physical_qubit} ({logical_qubit})
+                print(f""" {inst[0]} {physical_qubit} ({logical_qubit})
                        -> {qubit_usage_status[logical_qubit]}""")
 
-            elif tokens[0] in ["MeasZ"]:
-                physical_qubit = int(tokens[1])
+            elif inst[0] in ["MeasZ"]:
+                physical_qubit = inst[1]
                 logical_qubit = inverse_mapping[physical_qubit]
                 qubit_usage_status[logical_qubit] = False
 
-                print(f""" {tokens[0]} {physical_qubit} ({logical_qubit})
+                print(f""" {inst[0]} {physical_qubit} ({logical_qubit})
                        -> {qubit_usage_status[logical_qubit]}""")
 
-            elif tokens[0] in ["CNOT"]:
-                qubits = list(map(int, tokens[1].split(",")))
+            elif inst[0] in ["CNOT"]:
+                qubits = inst[1:3]
 
-                print(f""" {tokens[0]} {qubits[0]}, {qubits[1]}
+                print(f""" {inst[0]} {qubits[0]}, {qubits[1]}
                        ({inverse_mapping[qubits[0]]}, {inverse_mapping[qubits[1]]})""")
                 flag_swap = False
 
-            elif tokens[0] in ["SWAP"]:
-                qubits = list(map(int, tokens[1].split(",")))
+            elif inst[0] in ["SWAP"]:
+                qubits = inst[1:3]
                 logical_qubit0 = inverse_mapping[qubits[0]]
                 logical_qubit1 = inverse_mapping[qubits[1]]
 
-                print(f""" {tokens[0]} {qubits[0]}, {qubits[1]}
+                print(f""" {inst[0]} {qubits[0]}, {qubits[1]}
                         ({logical_qubit0}, {logical_qubit1}) 
                       -> {qubit_usage_status[logical_qubit0]}
                          {qubit_usage_status[logical_qubit1]}""")
@@ -209,13 +206,13 @@ def display_qubit_movements(system_code, lattice_size, **kwargs):
                     if count_data_interaction > max_data_interaction:
                         raise Exception("Stop: SWAP between activated qubits")
 
-            elif tokens[0] in ["Barrier-All"]:
-                print(f" {tokens[0]} ")
+            elif inst[0] in ["Barrier-All"]:
+                print(f" {inst[0]} ")
                 flag_swap = False
 
             else:
-                qubit = int(tokens[1])
-                print(f" {tokens[0]} {qubit} ({inverse_mapping[qubit]})")
+                qubit = inst[1]
+                print(f" {inst[0]} {qubit} ({inverse_mapping[qubit]})")
                 flag_swap = False
 
         if flag_swap:
@@ -251,36 +248,10 @@ def display_qubit_mapping(qubit_mapping, layout_size):
 
 def merge_qubit_layout(mapping1, mapping2, direction, layout_size):
     '''
-        function to merge two qubit layouts for an extended qubit layout
+        function to merge both qubit layouts ({position: qubit}) into an extended layout
+        {qubit: position}, the second layout is placed below (vertical) or to the right of
+        (horizon) the first layout
     '''
-    # function merge two blocks
-
-    extended_qubit_layout = {}
-
-    if direction == "horizon":
-        for key, value in mapping1.items():
-            x_coord = int(key/layout_size["width"])
-            z_coord = int(key%layout_size["width"])
-
-            extended_index = x_coord * 2 * layout_size["width"] + z_coord
-            extended_qubit_layout[extended_index] = value
-
-        for key, value in mapping2.items():
-            x_coord = int(key/layout_size["width"])
-            z_coord = int(key%layout_size["width"])
-
-            extended_index = x_coord * 2 * layout_size["width"]\
-                             + z_coord + layout_size["width"]
-            extended_qubit_layout[extended_index] = value
-
-    elif direction == "vertical":
-        extended_qubit_layout = mapping1
-        for key, value in mapping2.items():
-            x_coord = int(key/layout_size["width"])
-            z_coord = int(key%layout_size["width"])
-
-            index_in_extended_layout = (layout_size["height"] + x_coord)\
-                                       * layout_size["width"] + z_coord
-            extended_qubit_layout[index_in_extended_layout] = value
-
-    return {v: int(k) for k, v in extended_qubit_layout.items()}
+    return layoutbuilder.merge_layouts({qubit: position for position, qubit in mapping1.items()},
+                                       {qubit: position for position, qubit in mapping2.items()},
+                                       direction, layout_size)